@@ -59,12 +59,14 @@ from nvidia_rag.utils.embedding import get_embedding_model
 from nvidia_rag.utils.llm import get_llm, get_prompts
 from nvidia_rag.ingestor_server.nvingest import get_nv_ingest_client, get_nv_ingest_ingestor
 from nvidia_rag.utils.common import get_config
+from nvidia_rag.utils.cache import bump_collection_version
 from nvidia_rag.ingestor_server.task_handler import INGESTION_TASK_HANDLER
 from nv_ingest_client.util.file_processing.extract import EXTENSION_TO_DOCUMENT_TYPE
 from nvidia_rag.utils.minio_operator import (get_minio_operator,
                                       get_unique_thumbnail_id_collection_prefix,
                                       get_unique_thumbnail_id_file_name_prefix,
-                                      get_unique_thumbnail_id)
+                                      get_unique_thumbnail_id,
+                                      invalidate_thumbnail_cache)
 from nvidia_rag.utils.vectorstore import (
     get_vectorstore,
     get_docs_vectorstore_langchain,
@@ -291,6 +293,9 @@ class NvidiaRAGIngestor():
 
             logger.info("== Overall Ingestion completed successfully in %s seconds ==", time.time() - start_time)
 
+            # Invalidate cached query results derived from this collection
+            bump_collection_version(collection_name)
+
             # Get failed documents
             failed_documents = await self.__get_failed_documents(failures, filepaths, collection_name, vdb_endpoint)
             failures_filepaths = [failed_document.get("document_name") for failed_document in failed_documents]
@@ -512,11 +517,15 @@ class NvidiaRAGIngestor():
 
         try:
             response = delete_collections(vdb_endpoint, collection_names)
+            # Invalidate cached query results derived from the deleted collections
+            for collection in response.get("successful", []):
+                bump_collection_version(collection)
             # Delete citation metadata from Minio
             for collection in collection_names:
                 collection_prefix = get_unique_thumbnail_id_collection_prefix(collection)
                 delete_object_names = MINIO_OPERATOR.list_payloads(collection_prefix)
                 MINIO_OPERATOR.delete_payloads(delete_object_names)
+                invalidate_thumbnail_cache(collection_prefix)
 
             # Delete document summary from Minio
             for collection in collection_names:
@@ -633,6 +642,8 @@ class NvidiaRAGIngestor():
 
             # TODO: Delete based on document_ids if provided
             if del_docs_vectorstore_langchain(vs, document_names, collection_name, include_upload_path):
+                # Invalidate cached query results derived from this collection
+                bump_collection_version(collection_name)
                 # Generate response dictionary
                 documents = [
                     {
@@ -647,6 +658,7 @@ class NvidiaRAGIngestor():
                     filename_prefix = get_unique_thumbnail_id_file_name_prefix(collection_name, doc)
                     delete_object_names = MINIO_OPERATOR.list_payloads(filename_prefix)
                     MINIO_OPERATOR.delete_payloads(delete_object_names)
+                    invalidate_thumbnail_cache(filename_prefix)
 
                 # Delete document summary from Minio
                 for doc in document_names:
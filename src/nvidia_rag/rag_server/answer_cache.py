@@ -0,0 +1,252 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""This module contains the semantic answer caches used by the /generate API.
+1. CachedAnswer: A cached answer along with the context documents used to generate it.
+2. SemanticAnswerCache: Cache of generated answers looked up by query embedding similarity.
+3. get_answer_cache: Get the process-wide SemanticAnswerCache instance.
+4. CachedVLMAnswer: A cached VLM response to a similar question about the same images.
+5. VLMAnswerCache: Cache of VLM responses looked up by the cited images and question embedding similarity, and of the verdicts on using them.
+6. get_vlm_answer_cache: Get the process-wide VLMAnswerCache instance.
+"""
+
+import os
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Generator, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from nvidia_rag.utils.cache import TTLCache, get_collection_version, make_cache_key
+
+logger = logging.getLogger(__name__)
+
+# Answer cache configuration, disabled by default
+ENABLE_ANSWER_CACHE = os.getenv("ENABLE_ANSWER_CACHE", "False").lower() in ["true", "True"]
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", 1024))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", 3600))
+ANSWER_CACHE_SIMILARITY_THRESHOLD = float(os.getenv("ANSWER_CACHE_SIMILARITY_THRESHOLD", 0.95))
+
+# VLM answer cache configuration, disabled by default
+ENABLE_VLM_ANSWER_CACHE = os.getenv("ENABLE_VLM_ANSWER_CACHE", "False").lower() in ["true", "True"]
+VLM_ANSWER_CACHE_SIZE = int(os.getenv("VLM_ANSWER_CACHE_SIZE", 1024))
+VLM_ANSWER_CACHE_TTL = float(os.getenv("VLM_ANSWER_CACHE_TTL", 3600))
+VLM_ANSWER_CACHE_SIMILARITY_THRESHOLD = float(os.getenv("VLM_ANSWER_CACHE_SIMILARITY_THRESHOLD", 0.95))
+
+
+@dataclass
+class CachedAnswer:
+    """A cached answer along with the context documents used to generate it."""
+    answer: str
+    contexts: List[Document]
+    similarity: float = 1.0
+
+
+class SemanticAnswerCache:
+    """Cache of generated answers looked up by query embedding similarity.
+
+    Answers are grouped by a scope key built from the collection names and their versions, the filter
+    expression, the model and the generation parameters. Within a scope, a lookup returns the answer
+    whose query embedding has the highest cosine similarity with the incoming query, provided it is
+    above the similarity threshold. Bumping the version of a collection changes the scope key, which
+    invalidates every answer generated from that collection.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600,
+                 similarity_threshold: float = 0.95, max_answers_per_scope: int = 64, name: str = "answer"):
+        self.similarity_threshold = similarity_threshold
+        self.max_answers_per_scope = max_answers_per_scope
+        self._cache = TTLCache(name=name, maxsize=maxsize, ttl=ttl)
+
+    def scope_key(self, collection_names: List[str], **params: Any) -> str:
+        """Build the scope key for the given collections and generation parameters."""
+        collection_versions = [(name, get_collection_version(name)) for name in sorted(collection_names)]
+        return make_cache_key("answer", collection_versions, sorted(params.items()))
+
+    def lookup(self, scope_key: str, query_embedding: List[float]) -> Optional[CachedAnswer]:
+        """Get the most similar cached answer in the scope, if its similarity is above the threshold."""
+        entry = self._lookup_entry(scope_key, query_embedding)
+        if entry is None:
+            return None
+        cached_answer, similarity = entry
+        return CachedAnswer(answer=cached_answer.answer, contexts=cached_answer.contexts, similarity=similarity)
+
+    def store(self, scope_key: str, query_embedding: List[float], answer: str, contexts: List[Document]) -> None:
+        """Add an answer to the scope, dropping the oldest answers if the scope is full."""
+        if not answer.strip():
+            return
+        self._add_entry(scope_key, query_embedding, CachedAnswer(answer=answer, contexts=contexts))
+
+    def _lookup_entry(self, scope_key: str, query_embedding: List[float]) -> Optional[Tuple[Any, float]]:
+        """Get the most similar cached entry in the scope and its similarity, if it is above the threshold."""
+        entries = self._cache.get(scope_key)
+        if not entries:
+            return None
+
+        query_vector = self._normalize(query_embedding)
+        similarities = np.stack([vector for vector, _ in entries]) @ query_vector
+        best_index = int(np.argmax(similarities))
+        best_similarity = float(similarities[best_index])
+        if best_similarity < self.similarity_threshold:
+            logger.debug("Closest cached answer has similarity %.4f, below threshold %.4f",
+                         best_similarity, self.similarity_threshold)
+            return None
+
+        logger.info("Cache hit in the %s cache with similarity %.4f", self._cache.name, best_similarity)
+        return entries[best_index][1], best_similarity
+
+    def _add_entry(self, scope_key: str, query_embedding: List[float], value: Any) -> None:
+        """Add an entry to the scope, dropping the oldest entries if the scope is full."""
+        entries = list(self._cache.get(scope_key) or [])
+        entries.append((self._normalize(query_embedding), value))
+        self._cache.set(scope_key, entries[-self.max_answers_per_scope:])
+
+    def record_stream(
+        self,
+        generator: Iterable[str],
+        scope_key: str,
+        query_embedding: List[float],
+        contexts: List[Document]
+    ) -> Generator[str, None, None]:
+        """Pass through the chunks of a response stream and cache the answer once it completes."""
+        chunks = []
+        for chunk in generator:
+            chunks.append(chunk)
+            yield chunk
+        self.store(scope_key, query_embedding, "".join(chunks), contexts)
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+@lru_cache
+def get_answer_cache() -> SemanticAnswerCache:
+    """Get the process-wide SemanticAnswerCache instance."""
+    return SemanticAnswerCache(
+        maxsize=ANSWER_CACHE_SIZE,
+        ttl=ANSWER_CACHE_TTL,
+        similarity_threshold=ANSWER_CACHE_SIMILARITY_THRESHOLD
+    )
+
+
+@dataclass
+class CachedVLMAnswer:
+    """A cached VLM response to a similar question about the same images."""
+    response: str
+    similarity: float = 1.0
+
+
+class VLMAnswerCache(SemanticAnswerCache):
+    """Cache of VLM responses looked up by the cited images and question embedding similarity.
+
+    Responses are grouped by a scope key built from the sorted thumbnail ids of the cited images, the
+    versions of their collections and the VLM and LLM models. Within a scope, a lookup returns the
+    response to the most similar question, provided it is above the similarity threshold. The VLM only
+    sees the images and the question, while the verdict of the LLM on whether to use the response also
+    depends on the text context. Verdicts are cached separately per scope, response and text context, so
+    a hit skips both model calls for any text context already judged and only the VLM call otherwise.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600,
+                 similarity_threshold: float = 0.95, max_answers_per_scope: int = 64, name: str = "vlm_answer"):
+        super().__init__(maxsize=maxsize, ttl=ttl, similarity_threshold=similarity_threshold,
+                         max_answers_per_scope=max_answers_per_scope, name=name)
+        self._verdicts = TTLCache(name=f"{name}_verdict", maxsize=maxsize * max_answers_per_scope, ttl=ttl)
+
+    def scope_key(self, thumbnail_ids: List[str], **params: Any) -> str:
+        """Build the scope key for the given thumbnails and model parameters."""
+        thumbnail_ids = sorted(set(thumbnail_ids))
+        # Collection names can not contain ':', so the collection prefix of a thumbnail id is unambiguous
+        collection_names = sorted({thumbnail_id.split("_::", 1)[0] for thumbnail_id in thumbnail_ids})
+        collection_versions = [(name, get_collection_version(name)) for name in collection_names]
+        return make_cache_key("vlm_answer", thumbnail_ids, collection_versions, sorted(params.items()))
+
+    @staticmethod
+    def context_key(docs: List[Document]) -> str:
+        """Build the key of the text context a verdict was given for, from the ordered document contents."""
+        return make_cache_key("vlm_context", [doc.page_content for doc in docs])
+
+    def lookup(self, scope_key: str, query_embedding: List[float]) -> Optional[CachedVLMAnswer]:
+        """Get the VLM response to the most similar question in the scope, if its similarity is above the threshold."""
+        entry = self._lookup_entry(scope_key, query_embedding)
+        if entry is None:
+            return None
+        cached_answer, similarity = entry
+        return CachedVLMAnswer(response=cached_answer.response, similarity=similarity)
+
+    def store(self, scope_key: str, query_embedding: List[float], response: str) -> None:
+        """Add a VLM response to the scope, dropping the oldest responses if the scope is full."""
+        if not response.strip():
+            return
+        self._add_entry(scope_key, query_embedding, CachedVLMAnswer(response=response))
+
+    def lookup_verdict(self, scope_key: str, response: str, context_key: str) -> Optional[bool]:
+        """Get the verdict on whether to use a VLM response with the given text context, if it was judged."""
+        return self._verdicts.get(make_cache_key(scope_key, response, context_key))
+
+    def store_verdict(self, scope_key: str, response: str, context_key: str, use_response: bool) -> None:
+        """Cache the verdict on whether to use a VLM response with the given text context."""
+        if not response.strip():
+            return
+        self._verdicts.set(make_cache_key(scope_key, response, context_key), use_response)
+
+    def get_or_analyze(
+        self,
+        scope_key: str,
+        query_embedding: List[float],
+        context_key: str,
+        analyze: Callable[[], str],
+        judge: Callable[[str], bool]
+    ) -> Tuple[str, bool]:
+        """Get the VLM response and the verdict on whether to use it, calling the models only on cache misses.
+
+        Args:
+            scope_key: Scope key of the cited images and models
+            query_embedding: Embedding of the question
+            context_key: Key of the text context the verdict is given for
+            analyze: Calls the VLM on the cited images and returns its response
+            judge: Calls the LLM to decide whether to use a non-empty VLM response with the text context
+
+        Returns:
+            Tuple[str, bool]: The VLM response and whether to use it
+        """
+        cached_answer = self.lookup(scope_key, query_embedding)
+        if cached_answer is not None:
+            response = cached_answer.response
+        else:
+            response = analyze()
+            self.store(scope_key, query_embedding, response)
+
+        use_response = self.lookup_verdict(scope_key, response, context_key)
+        if use_response is None:
+            use_response = bool(response) and judge(response)
+            self.store_verdict(scope_key, response, context_key, use_response)
+        return response, use_response
+
+
+@lru_cache
+def get_vlm_answer_cache() -> VLMAnswerCache:
+    """Get the process-wide VLMAnswerCache instance."""
+    return VLMAnswerCache(
+        maxsize=VLM_ANSWER_CACHE_SIZE,
+        ttl=VLM_ANSWER_CACHE_TTL,
+        similarity_threshold=VLM_ANSWER_CACHE_SIMILARITY_THRESHOLD,
+        name="vlm_answer"
+    )
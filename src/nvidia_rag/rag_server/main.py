@@ -15,43 +15,60 @@
 
 """ This defines the main modules for RAG server which manages the core functionality.
     1. generate(): Generate a response using the RAG chain.
-    2. search(): Search for the most relevant documents for the given search parameters.
-    3. get_summary(): Get the summary of a document.
+    2. agenerate(): Async version of generate(), used by the /generate API.
+    3. search(): Search for the most relevant documents for the given search parameters.
+    4. asearch(): Async version of search(), used by the /search API.
+    5. get_summary(): Get the summary of a document.
+    6. get_citation_content(): Get the image bytes of a citation returned with lazy citations.
 
     Private methods:
     1. __llm_chain: Execute a simple LLM chain using the components defined above.
     2. __rag_chain: Execute a RAG chain using the components defined above.
-    3. __print_conversation_history: Print the conversation history.
-    4. __normalize_relevance_scores: Normalize the relevance scores of the documents.
-    5. __format_document_with_source: Format the document with the source.
+    3. __arag_chain: Async version of __rag_chain.
+    4. __generate_rag_response: Generate the response of the RAG chain from the retrieved context.
+    4a. __asearch: Search the relevant documents, shared by identical concurrent asearch() calls.
+    5. __retrieve_documents / __aretrieve_documents: Retrieve documents from all collections and rerank them.
+    5a. __accept_speculative_candidates: Decide whether speculatively retrieved candidates can be reused.
+    6. __print_conversation_history: Print the conversation history.
+    7. __normalize_relevance_scores: Normalize the relevance scores of the documents.
+    8. __format_document_with_source: Format the document with the source.
 
 """
 
+import asyncio
 import logging
 import os
 import time
 import requests
 import math
+import numpy as np
 from traceback import print_exc
-from typing import Any, Dict, Generator, List, Tuple, Optional
-from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncGenerator, Dict, Generator, List, Tuple, Optional
+from langchain_core.documents import Document
 from langchain_core.output_parsers.string import StrOutputParser
 from langchain_core.prompts import MessagesPlaceholder
 from langchain_core.prompts.chat import ChatPromptTemplate
-from langchain_core.runnables import RunnableAssign, RunnablePassthrough
+from langchain_core.runnables import RunnableAssign, RunnableLambda, RunnablePassthrough
 from requests import ConnectTimeout
 from opentelemetry import context as otel_context
 
-from nvidia_rag.utils.common import get_config, validate_filter_expr
+from nvidia_rag.utils.common import get_config, get_otel_metrics, validate_filter_expr
 from nvidia_rag.utils.embedding import get_embedding_model
-from nvidia_rag.rag_server.response_generator import prepare_llm_request, generate_answer, prepare_citations, Citations, retrieve_summary
-from nvidia_rag.utils.vectorstore import create_vectorstore_langchain, get_vectorstore, retreive_docs_from_retriever
+from nvidia_rag.rag_server.response_generator import prepare_llm_request, generate_answer, prepare_citations, Citations, retrieve_summary, retrieve_citation_content
+from nvidia_rag.rag_server.response_generator import STREAM_FLUSH_INTERVAL_MS, STREAM_FLUSH_CHARS
+from nvidia_rag.utils.vectorstore import create_vectorstore_langchain, get_vectorstore, retreive_docs_from_retriever, aretreive_docs_from_retriever, RETRIEVAL_EXECUTOR
 from nvidia_rag.utils.llm import get_llm, get_prompts, get_streaming_filter_think_parser
 from nvidia_rag.utils.reranker import get_ranking_model
+from nvidia_rag.utils.fusion import fuse_results, merge_candidates
+from nvidia_rag.utils.cache import make_cache_key
+from nvidia_rag.utils.singleflight import SingleFlight, StreamBroadcaster
 from nvidia_rag.rag_server.reflection import ReflectionCounter, check_context_relevance, check_response_groundedness
+from nvidia_rag.rag_server.reflection import ENABLE_BEST_OF_N_GENERATION, generate_best_grounded_response
 from nvidia_rag.rag_server.health import check_all_services_health
 from nvidia_rag.rag_server.vlm import VLM
 from nvidia_rag.rag_server.validation import validate_model_info, validate_use_knowledge_base, validate_temperature, validate_top_p, validate_reranker_k
+from nvidia_rag.rag_server.answer_cache import ENABLE_ANSWER_CACHE, CachedAnswer, get_answer_cache
+from nvidia_rag.rag_server.answer_cache import ENABLE_VLM_ANSWER_CACHE, get_vlm_answer_cache
 
 logger = logging.getLogger(__name__)
 CONFIG = get_config()
@@ -78,6 +95,20 @@ except Exception as ex:
 
 MAX_COLLECTION_NAMES = 5
 
+# Speculative retrieval with the combined query while the query rewriter runs, disabled by default
+ENABLE_SPECULATIVE_RETRIEVAL = os.getenv("ENABLE_SPECULATIVE_RETRIEVAL", "False").lower() in ["true", "True"]
+SPECULATIVE_RETRIEVAL_SIMILARITY_THRESHOLD = float(os.getenv("SPECULATIVE_RETRIEVAL_SIMILARITY_THRESHOLD", 0.95))
+
+# Coalescing of identical concurrent requests, /generate requests are only coalesced at temperature 0
+ENABLE_SEARCH_COALESCING = os.getenv("ENABLE_SEARCH_COALESCING", "False").lower() in ["true", "True"]
+ENABLE_GENERATE_COALESCING = os.getenv("ENABLE_GENERATE_COALESCING", "False").lower() in ["true", "True"]
+SEARCH_FLIGHTS = SingleFlight(name="search")
+GENERATE_BROADCASTS = StreamBroadcaster(name="generate")
+
+# Arguments of the RAG chain which also apply to the LLM chain
+LLM_CHAIN_ARGS = ("llm_settings", "query", "chat_history", "model", "collection_name", "enable_citations",
+                  "stream_flush_interval_ms", "stream_flush_chars")
+
 # Get a StreamingFilterThinkParser based on configuration
 StreamingFilterThinkParser = get_streaming_filter_think_parser()
 
@@ -121,6 +152,7 @@ class NvidiaRAG():
         enable_reranker: bool = CONFIG.ranking.enable_reranker,
         enable_guardrails: bool = CONFIG.enable_guardrails,
         enable_citations: bool = CONFIG.enable_citations,
+        lazy_citations: bool = CONFIG.lazy_citations,
         enable_vlm_inference: bool = CONFIG.enable_vlm_inference,
         model: str = CONFIG.llm.model_name,
         llm_endpoint: str = CONFIG.llm.server_url,
@@ -131,6 +163,8 @@ class NvidiaRAG():
         vlm_model: str = CONFIG.vlm.model_name,
         vlm_endpoint: str = CONFIG.vlm.server_url,
         filter_expr: Optional[str] = '',
+        stream_flush_interval_ms: int = STREAM_FLUSH_INTERVAL_MS,
+        stream_flush_chars: int = STREAM_FLUSH_CHARS,
     ) -> Generator[str, None, None]:
         """Execute a Retrieval Augmented Generation chain using the components defined above.
         It's called when the `/generate` API is invoked with `use_knowledge_base` set to `True` or `False`.
@@ -151,6 +185,8 @@ class NvidiaRAG():
             enable_reranker: Whether to enable reranking
             enable_guardrails: Whether to enable guardrails
             enable_citations: Whether to enable citations
+            lazy_citations: Whether citations carry thumbnail ids instead of their content, which is
+                served by the `/citations/content` API
             model: Name of the LLM model
             llm_endpoint: LLM server endpoint URL
             embedding_model: Name of the embedding model
@@ -158,8 +194,120 @@ class NvidiaRAG():
             reranker_model: Name of the reranker model
             reranker_endpoint: Reranker server endpoint URL
             filter_expr: Filter expression to filter document from vector DB
+            stream_flush_interval_ms: Merge response chunks arriving within this many milliseconds, 0 to disable
+            stream_flush_chars: Send merged response chunks once they reach this many characters, 0 to disable
+        """
+
+        use_knowledge_base, chain_kwargs = self.__prepare_generate_request(
+            messages=messages, use_knowledge_base=use_knowledge_base, temperature=temperature, top_p=top_p,
+            max_tokens=max_tokens, reranker_top_k=reranker_top_k, vdb_top_k=vdb_top_k, vdb_endpoint=vdb_endpoint,
+            collection_name=collection_name, collection_names=collection_names,
+            enable_query_rewriting=enable_query_rewriting, enable_reranker=enable_reranker,
+            enable_guardrails=enable_guardrails, enable_citations=enable_citations, lazy_citations=lazy_citations,
+            enable_vlm_inference=enable_vlm_inference, model=model, llm_endpoint=llm_endpoint,
+            embedding_model=embedding_model, embedding_endpoint=embedding_endpoint, reranker_model=reranker_model,
+            reranker_endpoint=reranker_endpoint, vlm_model=vlm_model, vlm_endpoint=vlm_endpoint, filter_expr=filter_expr,
+            stream_flush_interval_ms=stream_flush_interval_ms, stream_flush_chars=stream_flush_chars
+        )
+
+        if use_knowledge_base:
+            logger.info("Using knowledge base to generate response.")
+            return self.__rag_chain(**chain_kwargs)
+        else:
+            logger.info("Using LLM to generate response directly without knowledge base.")
+            return self.__llm_chain(**{key: chain_kwargs[key] for key in LLM_CHAIN_ARGS})
+
+
+    async def agenerate(
+        self,
+        messages: List[Dict[str, str]],
+        use_knowledge_base: bool = True,
+        temperature: float = default_temperature,
+        top_p: float = default_top_p,
+        max_tokens: int = default_max_tokens,
+        stop: List[str] = None,
+        reranker_top_k: int = int(CONFIG.retriever.top_k),
+        vdb_top_k: int = int(CONFIG.retriever.vdb_top_k),
+        vdb_endpoint: str = CONFIG.vector_store.url,
+        collection_name: str = "",
+        collection_names: List[str] = [CONFIG.vector_store.default_collection_name],
+        enable_query_rewriting: bool = CONFIG.query_rewriter.enable_query_rewriter,
+        enable_reranker: bool = CONFIG.ranking.enable_reranker,
+        enable_guardrails: bool = CONFIG.enable_guardrails,
+        enable_citations: bool = CONFIG.enable_citations,
+        lazy_citations: bool = CONFIG.lazy_citations,
+        enable_vlm_inference: bool = CONFIG.enable_vlm_inference,
+        model: str = CONFIG.llm.model_name,
+        llm_endpoint: str = CONFIG.llm.server_url,
+        embedding_model: str = CONFIG.embeddings.model_name,
+        embedding_endpoint: Optional[str] = CONFIG.embeddings.server_url,
+        reranker_model: str = CONFIG.ranking.model_name,
+        reranker_endpoint: str = CONFIG.ranking.server_url,
+        vlm_model: str = CONFIG.vlm.model_name,
+        vlm_endpoint: str = CONFIG.vlm.server_url,
+        filter_expr: Optional[str] = '',
+        stream_flush_interval_ms: int = STREAM_FLUSH_INTERVAL_MS,
+        stream_flush_chars: int = STREAM_FLUSH_CHARS,
+    ) -> AsyncGenerator[str, None]:
+        """Async version of generate(), used by the `/generate` API.
+
+        Query rewriting, embedding, retrieval from all collections and reranking are awaited on the
+        event loop instead of blocking it. Blocking steps without an async API, like reflection and VLM
+        inference, run in the default executor of the event loop. Accepts the same arguments as generate().
+
+        With ENABLE_GENERATE_COALESCING, identical concurrent requests at temperature 0 share one
+        response, which is streamed to all of them. Callers which stop reading the returned stream before
+        its end should aclose() it, so that a response no other request is reading is abandoned.
         """
 
+        use_knowledge_base, chain_kwargs = self.__prepare_generate_request(
+            messages=messages, use_knowledge_base=use_knowledge_base, temperature=temperature, top_p=top_p,
+            max_tokens=max_tokens, reranker_top_k=reranker_top_k, vdb_top_k=vdb_top_k, vdb_endpoint=vdb_endpoint,
+            collection_name=collection_name, collection_names=collection_names,
+            enable_query_rewriting=enable_query_rewriting, enable_reranker=enable_reranker,
+            enable_guardrails=enable_guardrails, enable_citations=enable_citations, lazy_citations=lazy_citations,
+            enable_vlm_inference=enable_vlm_inference, model=model, llm_endpoint=llm_endpoint,
+            embedding_model=embedding_model, embedding_endpoint=embedding_endpoint, reranker_model=reranker_model,
+            reranker_endpoint=reranker_endpoint, vlm_model=vlm_model, vlm_endpoint=vlm_endpoint, filter_expr=filter_expr,
+            stream_flush_interval_ms=stream_flush_interval_ms, stream_flush_chars=stream_flush_chars
+        )
+
+        async def open_stream():
+            if use_knowledge_base:
+                logger.info("Using knowledge base to generate response.")
+                return await self.__arag_chain(**chain_kwargs)
+            else:
+                logger.info("Using LLM to generate response directly without knowledge base.")
+                return self.__llm_chain(**{key: chain_kwargs[key] for key in LLM_CHAIN_ARGS})
+
+        if ENABLE_GENERATE_COALESCING and chain_kwargs["llm_settings"]["temperature"] == 0:
+            key = make_cache_key("generate", use_knowledge_base, sorted(chain_kwargs.items()))
+            return await GENERATE_BROADCASTS.subscribe(key, open_stream)
+        return await open_stream()
+
+
+    def __prepare_generate_request(
+        self,
+        messages: List[Dict[str, str]],
+        use_knowledge_base: bool,
+        temperature: float,
+        top_p: float,
+        max_tokens: int,
+        reranker_top_k: int,
+        vdb_top_k: int,
+        model: str,
+        llm_endpoint: str,
+        embedding_model: str,
+        embedding_endpoint: Optional[str],
+        reranker_model: str,
+        reranker_endpoint: str,
+        vlm_model: str,
+        vlm_endpoint: str,
+        enable_guardrails: bool,
+        **kwargs: Any
+    ) -> Tuple[bool, Dict[str, Any]]:
+        """Validate the generate() parameters and build the keyword arguments of the RAG chain."""
+
         # Validate boolean and float parameters
         use_knowledge_base = validate_use_knowledge_base(use_knowledge_base)
         temperature = validate_temperature(temperature)
@@ -193,40 +341,21 @@ class NvidiaRAG():
             "enable_guardrails": enable_guardrails,
         }
 
-        if use_knowledge_base:
-            logger.info("Using knowledge base to generate response.")
-            return self.__rag_chain(
-                llm_settings=llm_settings,
-                query=query,
-                chat_history=chat_history,
-                reranker_top_k=reranker_top_k,
-                vdb_top_k=vdb_top_k,
-                collection_name=collection_name,
-                collection_names=collection_names,
-                embedding_model=embedding_model,
-                embedding_endpoint=embedding_endpoint,
-                vdb_endpoint=vdb_endpoint,
-                enable_reranker=enable_reranker,
-                reranker_model=reranker_model,
-                reranker_endpoint=reranker_endpoint,
-                enable_vlm_inference=enable_vlm_inference,
-                vlm_model=vlm_model,
-                vlm_endpoint=vlm_endpoint,
-                model=model,
-                enable_query_rewriting=enable_query_rewriting,
-                enable_citations=enable_citations,
-                filter_expr=filter_expr
-            )
-        else:
-            logger.info("Using LLM to generate response directly without knowledge base.")
-            return self.__llm_chain(
-                llm_settings=llm_settings,
-                query=query,
-                chat_history=chat_history,
-                model=model,
-                collection_name=collection_name,
-                enable_citations=enable_citations
-            )
+        return use_knowledge_base, dict(
+            llm_settings=llm_settings,
+            query=query,
+            chat_history=chat_history,
+            reranker_top_k=reranker_top_k,
+            vdb_top_k=vdb_top_k,
+            embedding_model=embedding_model,
+            embedding_endpoint=embedding_endpoint,
+            reranker_model=reranker_model,
+            reranker_endpoint=reranker_endpoint,
+            vlm_model=vlm_model,
+            vlm_endpoint=vlm_endpoint,
+            model=model,
+            **kwargs
+        )
 
 
     def search(
@@ -270,6 +399,140 @@ class NvidiaRAG():
 
         logger.info("Searching relevant document for the query: %s", query)
 
+        reranker_top_k, embedding_model, embedding_endpoint, reranker_model, reranker_endpoint = self.__validate_search_params(
+            reranker_top_k, vdb_top_k, embedding_model, embedding_endpoint, reranker_model, reranker_endpoint
+        )
+
+        try:
+            collection_names, document_embedder, local_ranker, retrievers = self.__prepare_retrieval(
+                collection_name, collection_names, vdb_endpoint, filter_expr, reranker_top_k, vdb_top_k, enable_reranker,
+                embedding_model, embedding_endpoint, reranker_model, reranker_endpoint
+            )
+
+            rewritten_query = None
+            if messages and enable_query_rewriting:
+                q_prompt = self.__get_query_rewriter_chain()
+                rewritten_query = q_prompt.invoke({"input": query, "chat_history": self.__get_rewriter_history(messages)})
+            retriever_query = self.__get_retriever_query(query, messages, enable_query_rewriting, rewritten_query)
+            if retriever_query is None:
+                return Citations()
+
+            # Get relevant documents with optional reflection
+            reflection_counter = self.__get_reflection_counter()
+            if reflection_counter is not None:
+                docs = self.__reflect_on_context(query, retrievers, local_ranker, enable_reranker, filter_expr, reflection_counter)
+            else:
+                docs = self.__retrieve_documents(retrievers, local_ranker if enable_reranker else None, retriever_query, filter_expr)
+            return prepare_citations(retrieved_documents=docs,
+                                     force_citations=True)
+
+        except Exception as e:
+            raise APIError(f"Failed to search documents. {str(e)}") from e
+
+
+    async def asearch(
+        self,
+        query: str,
+        messages: List[Dict[str, str]] = [],
+        reranker_top_k: int = int(CONFIG.retriever.top_k),
+        vdb_top_k: int = int(CONFIG.retriever.vdb_top_k),
+        collection_name: str = "",
+        collection_names: List[str] = [CONFIG.vector_store.default_collection_name],
+        vdb_endpoint: str = CONFIG.vector_store.url,
+        enable_query_rewriting: bool = CONFIG.query_rewriter.enable_query_rewriter,
+        enable_reranker: bool = CONFIG.ranking.enable_reranker,
+        embedding_model: str = CONFIG.embeddings.model_name,
+        embedding_endpoint: Optional[str] = CONFIG.embeddings.server_url,
+        reranker_model: str = CONFIG.ranking.model_name,
+        reranker_endpoint: Optional[str] = CONFIG.ranking.server_url,
+        filter_expr: Optional[str] = '',
+    ) -> Citations:
+        """Async version of search(), used by the `/search` API.
+
+        Query rewriting, embedding, retrieval from all collections and reranking are awaited on the
+        event loop instead of blocking it. Accepts the same arguments as search().
+
+        With ENABLE_SEARCH_COALESCING, identical concurrent requests share one search.
+        """
+        search_kwargs = dict(
+            query=query, messages=messages, reranker_top_k=reranker_top_k, vdb_top_k=vdb_top_k,
+            collection_name=collection_name, collection_names=collection_names, vdb_endpoint=vdb_endpoint,
+            enable_query_rewriting=enable_query_rewriting, enable_reranker=enable_reranker,
+            embedding_model=embedding_model, embedding_endpoint=embedding_endpoint,
+            reranker_model=reranker_model, reranker_endpoint=reranker_endpoint, filter_expr=filter_expr
+        )
+        if ENABLE_SEARCH_COALESCING:
+            key = make_cache_key("search", sorted(search_kwargs.items()))
+            return await SEARCH_FLIGHTS.do(key, lambda: self.__asearch(**search_kwargs))
+        return await self.__asearch(**search_kwargs)
+
+
+    async def __asearch(
+        self,
+        query: str,
+        messages: List[Dict[str, str]] = [],
+        reranker_top_k: int = int(CONFIG.retriever.top_k),
+        vdb_top_k: int = int(CONFIG.retriever.vdb_top_k),
+        collection_name: str = "",
+        collection_names: List[str] = [CONFIG.vector_store.default_collection_name],
+        vdb_endpoint: str = CONFIG.vector_store.url,
+        enable_query_rewriting: bool = CONFIG.query_rewriter.enable_query_rewriter,
+        enable_reranker: bool = CONFIG.ranking.enable_reranker,
+        embedding_model: str = CONFIG.embeddings.model_name,
+        embedding_endpoint: Optional[str] = CONFIG.embeddings.server_url,
+        reranker_model: str = CONFIG.ranking.model_name,
+        reranker_endpoint: Optional[str] = CONFIG.ranking.server_url,
+        filter_expr: Optional[str] = '',
+    ) -> Citations:
+        """Search the relevant documents, see asearch()."""
+
+        logger.info("Searching relevant document for the query: %s", query)
+
+        reranker_top_k, embedding_model, embedding_endpoint, reranker_model, reranker_endpoint = self.__validate_search_params(
+            reranker_top_k, vdb_top_k, embedding_model, embedding_endpoint, reranker_model, reranker_endpoint
+        )
+
+        try:
+            # Building or revalidating a vectorstore blocks on milvus, vectorstores are usually served from the registry
+            collection_names, document_embedder, local_ranker, retrievers = await asyncio.to_thread(
+                self.__prepare_retrieval,
+                collection_name, collection_names, vdb_endpoint, filter_expr, reranker_top_k, vdb_top_k, enable_reranker,
+                embedding_model, embedding_endpoint, reranker_model, reranker_endpoint
+            )
+
+            rewritten_query = None
+            if messages and enable_query_rewriting:
+                q_prompt = self.__get_query_rewriter_chain()
+                rewritten_query = await q_prompt.ainvoke({"input": query, "chat_history": self.__get_rewriter_history(messages)})
+            retriever_query = self.__get_retriever_query(query, messages, enable_query_rewriting, rewritten_query)
+            if retriever_query is None:
+                return Citations()
+
+            # Get relevant documents with optional reflection
+            reflection_counter = self.__get_reflection_counter()
+            if reflection_counter is not None:
+                docs = await asyncio.to_thread(
+                    self.__reflect_on_context, query, retrievers, local_ranker, enable_reranker, filter_expr, reflection_counter
+                )
+            else:
+                docs = await self.__aretrieve_documents(retrievers, local_ranker if enable_reranker else None, retriever_query, filter_expr)
+            return await asyncio.to_thread(prepare_citations, retrieved_documents=docs, force_citations=True)
+
+        except Exception as e:
+            raise APIError(f"Failed to search documents. {str(e)}") from e
+
+
+    def __validate_search_params(
+        self,
+        reranker_top_k: int,
+        vdb_top_k: int,
+        embedding_model: str,
+        embedding_endpoint: Optional[str],
+        reranker_model: str,
+        reranker_endpoint: Optional[str],
+    ) -> Tuple[int, str, Optional[str], str, Optional[str]]:
+        """Validate the top k parameters and normalize the model and endpoint values of a search."""
+
         # Validate top_k parameters
         reranker_top_k = validate_reranker_k(reranker_top_k, vdb_top_k)
 
@@ -283,137 +546,96 @@ class NvidiaRAG():
                 (reranker_endpoint, "reranker_endpoint"),
             ]
         )
+        return reranker_top_k, embedding_model, embedding_endpoint, reranker_model, reranker_endpoint
 
-        try:
-            if collection_name: # Would be deprecated in the future
-                logger.warning("'collection_name' parameter is provided. This will be deprecated in the future. Use 'collection_names' instead.")
-                collection_names = [collection_name]
-
-            if not collection_names:
-                raise APIError("Collection names are not provided.", 400)
-
-            if len(collection_names) > 1 and not enable_reranker:
-                raise APIError("Reranking is not enabled but multiple collection names are provided.", 400)
-            
-            if not validate_filter_expr(filter_expr):
-                raise APIError("Invalid filter expression.", 400)
-
-            if len(collection_names) > MAX_COLLECTION_NAMES:
-                raise APIError(f"Only {MAX_COLLECTION_NAMES} collections are supported at a time.", 400)
-
-            document_embedder = get_embedding_model(model=embedding_model, url=embedding_endpoint)
-            # Initialize vector stores for each collection name
-            vector_stores = []
-            for collection_name in collection_names:
-                vector_stores.append(get_vectorstore(document_embedder, collection_name, vdb_endpoint))
-
-            # Check if all vector stores are initialized properly
-            for vs in vector_stores:
-                if vs is None:
-                    raise APIError("Vector store not initialized properly. Please check if the vector DB is up and running.", 500)
-
-            docs = []
-            local_ranker = get_ranking_model(model=reranker_model, url=reranker_endpoint, top_n=reranker_top_k)
-            top_k = vdb_top_k if local_ranker and enable_reranker else reranker_top_k
-            logger.info("Setting top k as: %s.", top_k)
-            # Initialize retrievers for each vector store
-            retrievers = []
-            for vs in vector_stores:
-                retrievers.append(vs.as_retriever(search_kwargs={"k": top_k}))
-
-
-            retriever_query = query
-            if messages:
-                if enable_query_rewriting:
-                    # conversation is tuple so it should be multiple of two
-                    # -1 is to keep last k conversation
-                    history_count = int(os.environ.get("CONVERSATION_HISTORY", 15)) * 2 * -1
-                    messages = messages[history_count:]
-                    conversation_history = []
-
-                    for message in messages:
-                        if message.get("role") !=  "system":
-                            conversation_history.append((message.get("role"), message.get("content")))
-
-                    # Based on conversation history recreate query for better document retrieval
-                    contextualize_q_system_prompt = (
-                        "Given a chat history and the latest user question "
-                        "which might reference context in the chat history, "
-                        "formulate a standalone question which can be understood "
-                        "without the chat history. Do NOT answer the question, "
-                        "just reformulate it if needed and otherwise return it as is."
-                    )
-                    query_rewriter_prompt = prompts.get("query_rewriter_prompt", contextualize_q_system_prompt)
-                    contextualize_q_prompt = ChatPromptTemplate.from_messages(
-                        [("system", query_rewriter_prompt), MessagesPlaceholder("chat_history"), ("human", "{input}"),]
-                    )
-                    q_prompt = contextualize_q_prompt | query_rewriter_llm | StreamingFilterThinkParser | StrOutputParser()
-                    # query to be used for document retrieval
-                    logger.info("Query rewriter prompt: %s", contextualize_q_prompt)
-                    retriever_query = q_prompt.invoke({"input": query, "chat_history": conversation_history})
-                    logger.info("Rewritten Query: %s %s", retriever_query, len(retriever_query))
-                    if retriever_query.replace('"', "'") == "''" or len(retriever_query) == 0:
-                        return Citations()
-                else:
-                    # Use previous user queries and current query to form a single query for document retrieval
-                    user_queries = [msg.get("content") for msg in messages if msg.get("role") == "user"]
-                    retriever_query = ". ".join([*user_queries, query])
-                    logger.info("Combined retriever query: %s", retriever_query)
-            # Get relevant documents with optional reflection
-            otel_ctx = otel_context.get_current()
-            if os.environ.get("ENABLE_REFLECTION", "false").lower() == "true":
-                max_loops = int(os.environ.get("MAX_REFLECTION_LOOP", 3))
-                reflection_counter = ReflectionCounter(max_loops)
-                docs, is_relevant = check_context_relevance(query, retrievers, local_ranker, reflection_counter, enable_reranker, filter_expr=filter_expr)
-                # Normalize scores to 0-1 range (was missing!)
-                if local_ranker and enable_reranker:
-                    docs = self.__normalize_relevance_scores(docs)
-                if not is_relevant:
-                    logger.warning("Could not find sufficiently relevant context after maximum attempts")
-                return prepare_citations(retrieved_documents=docs,
-                                         force_citations=True)
-            else:
-                if local_ranker and enable_reranker:
-                    logger.info(
-                        "Narrowing the collection from %s results and further narrowing it to %s with the reranker for rag"
-                        " chain.",
-                        top_k,
-                        reranker_top_k)
-                    logger.info("Setting ranker top n as: %s.", reranker_top_k)
-                    # Update number of document to be retriever by ranker
-                    local_ranker.top_n = reranker_top_k
-
-                    context_reranker = RunnableAssign({
-                        "context":
-                            lambda input: local_ranker.compress_documents(query=input['question'],
-                                                                        documents=input['context'])
-                    })
-
-                    # Perform parallel retrieval from all vector stores
-                    docs = []
-                    with ThreadPoolExecutor() as executor:
-                        futures = [executor.submit(retreive_docs_from_retriever, retriever=retriever, retriever_query=retriever_query, expr=filter_expr, otel_ctx=otel_ctx) for retriever in retrievers]
-                        for future in futures:
-                            docs.extend(future.result())
-
-                    start_time = time.time()
-                    docs = context_reranker.invoke({"context": docs, "question": retriever_query}, config={'run_name':'context_reranker'})
-                    logger.info("    == Context reranker time: %.2f ms ==", (time.time() - start_time) * 1000)
-
-                    # Normalize scores to 0-1 range"
-                    docs = self.__normalize_relevance_scores(docs.get("context", []))
-
-                    return prepare_citations(retrieved_documents=docs,
-                                             force_citations=True)
-
-            # Multiple retrievers are not supported when reranking is disabled
-            docs = retreive_docs_from_retriever(retriever=retrievers[0], retriever_query=retriever_query, expr=filter_expr, otel_ctx=otel_ctx)
-            # TODO: Check how to get the relevance score from milvus
-            return prepare_citations(retrieved_documents=docs,
-                                     force_citations=True)
 
-        except Exception as e:
-            raise APIError(f"Failed to search documents. {str(e)}") from e
+    def __prepare_retrieval(
+        self,
+        collection_name: str,
+        collection_names: List[str],
+        vdb_endpoint: str,
+        filter_expr: Optional[str],
+        reranker_top_k: int,
+        vdb_top_k: int,
+        enable_reranker: bool,
+        embedding_model: str,
+        embedding_endpoint: Optional[str],
+        reranker_model: str,
+        reranker_endpoint: Optional[str],
+    ) -> Tuple[List[str], Any, Optional[Any], List[Any]]:
+        """Validate the collections of a request and get its embedding model, ranking model and retrievers.
+
+        Returns:
+            Tuple[List[str], Any, Optional[Any], List[Any]]: Collection names, embedding model, ranking model and retrievers
+        """
+        collection_names = self.__validate_collection_names(collection_name, collection_names, filter_expr)
+
+        document_embedder = get_embedding_model(model=embedding_model, url=embedding_endpoint)
+        logger.info("Ranker enabled: %s", enable_reranker)
+        ranker = get_ranking_model(model=reranker_model, url=reranker_endpoint, top_n=reranker_top_k)
+        top_k = vdb_top_k if ranker and enable_reranker else reranker_top_k
+        logger.info("Setting retriever top k as: %s.", top_k)
+        retrievers = self.__get_retrievers(document_embedder, collection_names, vdb_endpoint, top_k)
+        return collection_names, document_embedder, ranker, retrievers
+
+
+    def __get_retriever_query(
+        self,
+        query: str,
+        chat_history: List[Dict[str, str]],
+        enable_query_rewriting: bool,
+        rewritten_query: Optional[str] = None
+    ) -> Optional[str]:
+        """Get the query used for document retrieval, or None if the query rewriter returned an empty query.
+
+        Without chat history the query is used as is. Otherwise the query rewritten by the query rewriter is
+        used if query rewriting is enabled, and the previous user queries combined with the query if not.
+        """
+        if not chat_history:
+            return query
+        if enable_query_rewriting:
+            logger.info("Rewritten Query: %s %s", rewritten_query, len(rewritten_query))
+            if rewritten_query.replace('"', "'") == "''" or len(rewritten_query) == 0:
+                return None
+            return rewritten_query
+        return self.__get_combined_query(chat_history, query)
+
+
+    def __get_reflection_counter(self) -> Optional[ReflectionCounter]:
+        """Get the reflection counter of a request if reflection is enabled, otherwise None."""
+        if os.environ.get("ENABLE_REFLECTION", "false").lower() != "true":
+            return None
+        max_loops = int(os.environ.get("MAX_REFLECTION_LOOP", 3))
+        return ReflectionCounter(max_loops)
+
+
+    def __reflect_on_context(
+        self,
+        retriever_query: str,
+        retrievers: List[Any],
+        ranker: Optional[Any],
+        enable_reranker: bool,
+        filter_expr: Optional[str],
+        reflection_counter: ReflectionCounter
+    ) -> List["Document"]:
+        """Retrieve the most relevant context with the reflection context relevance check."""
+        docs, is_relevant = check_context_relevance(
+            retriever_query,
+            retrievers,
+            ranker,
+            reflection_counter,
+            enable_reranker,
+            filter_expr=filter_expr
+        )
+
+        # Normalize scores to 0-1 range
+        if ranker and enable_reranker:
+            docs = self.__normalize_relevance_scores(docs)
+
+        if not is_relevant:
+            logger.warning("Could not find sufficiently relevant context after %d attempts",
+                           reflection_counter.current_count)
+        return docs
 
 
     async def get_summary(
@@ -429,6 +651,12 @@ class NvidiaRAG():
         return summary_response
 
 
+    async def get_citation_content(self, document_id: str) -> Optional[bytes]:
+        """Get the image bytes of an image, table or chart citation returned with lazy citations."""
+
+        return await retrieve_citation_content(document_id=document_id)
+
+
     def __llm_chain(
         self,
         llm_settings: Dict[str, Any],
@@ -436,7 +664,9 @@ class NvidiaRAG():
         chat_history: List[Dict[str, str]],
         model: str = "",
         collection_name: str = "",
-        enable_citations: bool = True
+        enable_citations: bool = True,
+        stream_flush_interval_ms: int = 0,
+        stream_flush_chars: int = 0
     ) -> Generator[str, None, None]:
         """Execute a simple LLM chain using the components defined above.
         It's called when the `/generate` API is invoked with `use_knowledge_base` set to `False`.
@@ -448,6 +678,8 @@ class NvidiaRAG():
             model: Name of the model used for generation
             collection_name: Name of the collection used for retrieval
             enable_citations: Whether to enable citations in the response
+            stream_flush_interval_ms: Merge response chunks arriving within this many milliseconds, 0 to disable
+            stream_flush_chars: Send merged response chunks once they reach this many characters, 0 to disable
         """
         try:
             system_message = []
@@ -488,7 +720,8 @@ class NvidiaRAG():
             llm = get_llm(**llm_settings)
 
             chain = prompt_template | llm | StreamingFilterThinkParser | StrOutputParser()
-            return generate_answer(chain.stream({"question": query}, config={'run_name':'llm-stream'}), [], model=model, collection_name=collection_name, enable_citations=enable_citations)
+            return generate_answer(chain.stream({"question": query}, config={'run_name':'llm-stream'}), [], model=model, collection_name=collection_name, enable_citations=enable_citations,
+                                   stream_flush_interval_ms=stream_flush_interval_ms, stream_flush_chars=stream_flush_chars)
         except ConnectTimeout as e:
             logger.warning("Connection timed out while making a request to the LLM endpoint: %s", e)
             return generate_answer(iter([f"Connection timed out while making a request to the NIM endpoint. Verify if the NIM server is available."]), [], model=model, collection_name=collection_name, enable_citations=enable_citations)
@@ -527,7 +760,10 @@ class NvidiaRAG():
         model: str = "",
         enable_query_rewriting: bool = False,
         enable_citations: bool = True,
+        lazy_citations: bool = False,
         filter_expr: Optional[str] = '',
+        stream_flush_interval_ms: int = 0,
+        stream_flush_chars: int = 0,
     ) -> Tuple[Generator[str, None, None], List[Dict[str, Any]]]:
         """Execute a RAG chain using the components defined above.
         It's called when the `/generate` API is invoked with `use_knowledge_base` set to `True`.
@@ -549,230 +785,639 @@ class NvidiaRAG():
             model: Name of the LLM model
             enable_query_rewriting: Whether to enable query rewriting
             enable_citations: Whether to enable citations
+            lazy_citations: Whether citations carry thumbnail ids instead of their content
             filter_expr: Filter expression to filter document from vector DB
+            stream_flush_interval_ms: Merge response chunks arriving within this many milliseconds, 0 to disable
+            stream_flush_chars: Send merged response chunks once they reach this many characters, 0 to disable
         """
         logger.info("Using multiturn rag to generate response from document for the query: %s", query)
 
         try:
-            # If collection_name is provided, use it as the collection name, Otherwise, use the collection names from the kwargs
-            if collection_name: # Would be deprecated in the future
-                logger.warning("'collection_name' parameter is provided. This will be deprecated in the future. Use 'collection_names' instead.")
-                collection_names = [collection_name]
-            # Check if collection names are provided
-            if not collection_names:
-                raise APIError("Collection names are not provided.", 400)
-            if len(collection_names) > 1 and not enable_reranker:
-                raise APIError("Reranking is not enabled but multiple collection names are provided.", 400)
-            if len(collection_names) > MAX_COLLECTION_NAMES:
-                raise APIError(f"Only {MAX_COLLECTION_NAMES} collections are supported at a time.", 400)
-            if not validate_filter_expr(filter_expr):
-                raise APIError("Invalid filter expression.", 400)
-
-            document_embedder = get_embedding_model(model=embedding_model, url=embedding_endpoint)
-            # Initialize vector stores for each collection name
-            vector_stores = []
-            for collection_name in collection_names:
-                vector_stores.append(get_vectorstore(document_embedder, collection_name, vdb_endpoint))
-
-            # Check if all vector stores are initialized properly
-            for vs in vector_stores:
-                if vs is None:
-                    raise APIError("Vector store not initialized properly. Please check if the vector DB is up and running.", 500)
-
+            collection_names, document_embedder, ranker, retrievers = self.__prepare_retrieval(
+                collection_name, collection_names, vdb_endpoint, filter_expr, reranker_top_k, vdb_top_k, enable_reranker,
+                embedding_model, embedding_endpoint, reranker_model, reranker_endpoint
+            )
             llm = get_llm(**llm_settings)
-            logger.info("Ranker enabled: %s", enable_reranker)
-            ranker = get_ranking_model(model=reranker_model, url=reranker_endpoint, top_n=reranker_top_k)
-            top_k = vdb_top_k if ranker and enable_reranker else reranker_top_k
-            logger.info("Setting retriever top k as: %s.", top_k)
-            # Initialize retrievers for each vector store
-            retrievers = []
-            for vs in vector_stores:
-                retrievers.append(vs.as_retriever(search_kwargs={"k": top_k}))
-
-            # conversation is tuple so it should be multiple of two
-            # -1 is to keep last k conversation
-            history_count = int(os.environ.get("CONVERSATION_HISTORY", 15)) * 2 * -1
-            chat_history = chat_history[history_count:]
-            system_prompt = ""
-            conversation_history = []
-            system_prompt += prompts.get("rag_template", "")
-            user_message = []
 
-            if "llama-3.3-nemotron-super-49b" in str(model):
-                if os.environ.get("ENABLE_NEMOTRON_THINKING", "false").lower() == "true":
-                    logger.info("Setting system prompt as detailed thinking on")
-                    system_prompt = "detailed thinking on"
-                else:
-                    logger.info("Setting system prompt as detailed thinking off")
-                    system_prompt = "detailed thinking off"
-                user_message += [("user", prompts.get("rag_template", ""))]
+            chat_history, system_message, conversation_history, user_message = self.__get_rag_messages(chat_history, model)
+            reflection_counter = self.__get_reflection_counter()
+            rewritten_query = None
+            if chat_history and enable_query_rewriting:
+                q_prompt = self.__get_query_rewriter_chain()
+                rewritten_query = q_prompt.invoke({"input": query, "chat_history": conversation_history}, config={'run_name':'query-rewriter'})
+            retriever_query = self.__get_retriever_query(query, chat_history, enable_query_rewriting, rewritten_query)
+            if retriever_query is None:
+                return generate_answer(iter([""]), [], model=model, collection_name=collection_name, enable_citations=enable_citations, lazy_citations=lazy_citations)
+
+            # Replay a cached answer for a semantically similar standalone query if the answer cache is enabled
+            answer_cache_scope, query_embedding = None, None
+            if ENABLE_ANSWER_CACHE:
+                query_embedding = document_embedder.embed_query(retriever_query)
+                answer_cache_scope, cached_answer = self.__lookup_answer_cache(
+                    query_embedding, collection_names, vdb_endpoint, filter_expr, reranker_top_k, vdb_top_k, enable_reranker,
+                    reranker_model, embedding_model, enable_vlm_inference, llm_settings
+                )
+                if cached_answer is not None:
+                    return generate_answer(iter([cached_answer.answer]), cached_answer.contexts, model=model, collection_name=collection_name, enable_citations=enable_citations, lazy_citations=lazy_citations)
 
-            for message in chat_history:
-                if message.get("role") ==  "system":
-                    system_prompt = system_prompt + " " + message.get("content")
-                else:
-                    conversation_history.append((message.get("role"), message.get("content")))
+            # Get relevant documents with optional reflection
+            if reflection_counter is not None:
+                context_to_show = self.__reflect_on_context(retriever_query, retrievers, ranker, enable_reranker, filter_expr, reflection_counter)
+            else:
+                context_to_show = self.__retrieve_documents(retrievers, ranker if enable_reranker else None, retriever_query, filter_expr)
+
+            return self.__generate_rag_response(
+                llm=llm,
+                messages=(system_message, conversation_history, user_message),
+                context_to_show=context_to_show,
+                query=query,
+                llm_settings=llm_settings,
+                collection_name=collection_name,
+                enable_vlm_inference=enable_vlm_inference,
+                vlm_model=vlm_model,
+                vlm_endpoint=vlm_endpoint,
+                model=model,
+                enable_citations=enable_citations,
+                lazy_citations=lazy_citations,
+                stream_flush_interval_ms=stream_flush_interval_ms,
+                stream_flush_chars=stream_flush_chars,
+                reflection_counter=reflection_counter,
+                answer_cache_scope=answer_cache_scope,
+                query_embedding=query_embedding,
+                document_embedder=document_embedder
+            )
+
+        except Exception as e:
+            return self.__rag_chain_error_response(e, model, collection_name, enable_citations, lazy_citations)
 
-            system_message = [("system", system_prompt)]
-            retriever_query = query
-            if chat_history:
-                if enable_query_rewriting:
-                    # Based on conversation history recreate query for better document retrieval
-                    contextualize_q_system_prompt = (
-                        "Given a chat history and the latest user question "
-                        "which might reference context in the chat history, "
-                        "formulate a standalone question which can be understood "
-                        "without the chat history. Do NOT answer the question, "
-                        "just reformulate it if needed and otherwise return it as is."
-                    )
-                    query_rewriter_prompt = prompts.get("query_rewriter_prompt", contextualize_q_system_prompt)
-                    contextualize_q_prompt = ChatPromptTemplate.from_messages(
-                        [("system", query_rewriter_prompt), MessagesPlaceholder("chat_history"), ("human", "{input}"),]
-                    )
-                    q_prompt = contextualize_q_prompt | query_rewriter_llm | StreamingFilterThinkParser | StrOutputParser()
-                    # query to be used for document retrieval
-                    logger.info("Query rewriter prompt: %s", contextualize_q_prompt)
-                    retriever_query = q_prompt.invoke({"input": query, "chat_history": conversation_history}, config={'run_name':'query-rewriter'})
-                    logger.info("Rewritten Query: %s %s", retriever_query, len(retriever_query))
-                    if retriever_query.replace('"', "'") == "''" or len(retriever_query) == 0:
-                        return generate_answer(iter([""]), [], model=model, collection_name=collection_name, enable_citations=enable_citations)
-                else:
-                    # Use previous user queries and current query to form a single query for document retrieval
-                    user_queries = [msg.get("content") for msg in chat_history if msg.get("role") == "user"]
-                    # TODO: Find a better way to join this when queries already have punctuation
-                    retriever_query = ". ".join([*user_queries, query])
-                    logger.info("Combined retriever query: %s", retriever_query)
+
+    async def __arag_chain(
+        self,
+        llm_settings: Dict[str, Any],
+        query: str,
+        chat_history: List[Dict[str, str]],
+        reranker_top_k: int = 10,
+        vdb_top_k: int = 40,
+        collection_name: str = "",
+        collection_names: List[str] = [CONFIG.vector_store.default_collection_name],
+        embedding_model: str = "",
+        embedding_endpoint: Optional[str] = None,
+        vdb_endpoint: str = "http://localhost:19530",
+        enable_reranker: bool = True,
+        reranker_model: str = "",
+        reranker_endpoint: Optional[str] = None,
+        enable_vlm_inference: bool = False,
+        vlm_model: str = "",
+        vlm_endpoint: str = "",
+        model: str = "",
+        enable_query_rewriting: bool = False,
+        enable_citations: bool = True,
+        lazy_citations: bool = False,
+        filter_expr: Optional[str] = '',
+        stream_flush_interval_ms: int = 0,
+        stream_flush_chars: int = 0,
+    ) -> AsyncGenerator[str, None]:
+        """Async version of __rag_chain, accepting the same arguments.
+
+        With speculative retrieval enabled, retrieval with the combined query runs while the query
+        rewriter runs, and its candidates are reused if the rewritten query is near-identical.
+        """
+        logger.info("Using multiturn rag to generate response from document for the query: %s", query)
+
+        speculative_task, speculative_query = None, None
+        try:
+            # Building or revalidating a vectorstore blocks on milvus, vectorstores are usually served from the registry
+            collection_names, document_embedder, ranker, retrievers = await asyncio.to_thread(
+                self.__prepare_retrieval,
+                collection_name, collection_names, vdb_endpoint, filter_expr, reranker_top_k, vdb_top_k, enable_reranker,
+                embedding_model, embedding_endpoint, reranker_model, reranker_endpoint
+            )
+            llm = get_llm(**llm_settings)
+
+            chat_history, system_message, conversation_history, user_message = self.__get_rag_messages(chat_history, model)
+            reflection_counter = self.__get_reflection_counter()
+            rewritten_query = None
+            if chat_history and enable_query_rewriting:
+                q_prompt = self.__get_query_rewriter_chain()
+                if ENABLE_SPECULATIVE_RETRIEVAL and reflection_counter is None:
+                    # Retrieve with the combined query while the query rewriter runs
+                    speculative_query = self.__get_combined_query(chat_history, query)
+                    speculative_task = asyncio.create_task(self.__aretrieve_candidates(
+                        retrievers, ranker if enable_reranker else None, speculative_query, filter_expr
+                    ))
+                rewritten_query = await q_prompt.ainvoke({"input": query, "chat_history": conversation_history}, config={'run_name':'query-rewriter'})
+            retriever_query = self.__get_retriever_query(query, chat_history, enable_query_rewriting, rewritten_query)
+            if retriever_query is None:
+                return generate_answer(iter([""]), [], model=model, collection_name=collection_name, enable_citations=enable_citations, lazy_citations=lazy_citations)
+
+            # Replay a cached answer for a semantically similar standalone query if the answer cache is enabled
+            answer_cache_scope, query_embedding = None, None
+            if ENABLE_ANSWER_CACHE:
+                query_embedding = await document_embedder.aembed_query(retriever_query)
+                answer_cache_scope, cached_answer = self.__lookup_answer_cache(
+                    query_embedding, collection_names, vdb_endpoint, filter_expr, reranker_top_k, vdb_top_k, enable_reranker,
+                    reranker_model, embedding_model, enable_vlm_inference, llm_settings
+                )
+                if cached_answer is not None:
+                    return generate_answer(iter([cached_answer.answer]), cached_answer.contexts, model=model, collection_name=collection_name, enable_citations=enable_citations, lazy_citations=lazy_citations)
 
             # Get relevant documents with optional reflection
-            if os.environ.get("ENABLE_REFLECTION", "false").lower() == "true":
-                max_loops = int(os.environ.get("MAX_REFLECTION_LOOP", 3))
-                reflection_counter = ReflectionCounter(max_loops)
-
-                context_to_show, is_relevant = check_context_relevance(
-                    retriever_query,
-                    retrievers,
-                    ranker,
-                    reflection_counter,
-                    filter_expr=filter_expr
+            if reflection_counter is not None:
+                context_to_show = await asyncio.to_thread(
+                    self.__reflect_on_context, retriever_query, retrievers, ranker, enable_reranker, filter_expr, reflection_counter
                 )
-                
-                # Normalize scores to 0-1 range (was missing!)
-                if ranker and enable_reranker:
-                    context_to_show = self.__normalize_relevance_scores(context_to_show)
-
-                if not is_relevant:
-                    logger.warning("Could not find sufficiently relevant context after %d attempts",
-                                  reflection_counter.current_count)
             else:
-                otel_ctx = otel_context.get_current()
-                if ranker and enable_reranker:
-                    logger.info(
-                        "Narrowing the collection from %s results and further narrowing it to "
-                        "%s with the reranker for rag chain.",
-                        top_k,
-                        reranker_top_k)
-                    logger.info("Setting ranker top n as: %s.", reranker_top_k)
-                    context_reranker = RunnableAssign({
-                        "context":
-                            lambda input: ranker.compress_documents(query=input['question'], documents=input['context'])
-                    })
-
-                    # Perform parallel retrieval from all vector stores
-                    docs = []
-                    with ThreadPoolExecutor() as executor:
-                        futures = [executor.submit(retreive_docs_from_retriever, retriever=retriever, retriever_query=query, expr=filter_expr, otel_ctx=otel_ctx) for retriever in retrievers]
-                        for future in futures:
-                            docs.extend(future.result())
-
-                    start_time = time.time()
-                    docs = context_reranker.invoke({"context": docs, "question": query}, config={'run_name':'context_reranker'})
-                    logger.info("    == Context reranker time: %.2f ms ==", (time.time() - start_time) * 1000)
-                    context_to_show = docs.get("context", [])
-                    # Normalize scores to 0-1 range
-                    context_to_show = self.__normalize_relevance_scores(context_to_show)
-                else:
-                    # Multiple retrievers are not supported when reranking is disabled
-                    docs = retreive_docs_from_retriever(retriever=retrievers[0], retriever_query=query, expr=filter_expr, otel_ctx=otel_ctx)
-                    context_to_show = docs
-
-            if enable_vlm_inference:
-                logger.info("Calling VLM to analyze images cited in the context")
-                vlm_response: str = ""
-                try:
-                    vlm = VLM(vlm_model, vlm_endpoint)
-                    vlm_response = vlm.analyze_images_from_context(
-                        context_to_show, query
+                candidates = None
+                if speculative_task is not None:
+                    candidates = await self.__accept_speculative_candidates(document_embedder, speculative_task, speculative_query, retriever_query)
+                context_to_show = await self.__aretrieve_documents(
+                    retrievers, ranker if enable_reranker else None, retriever_query, filter_expr, candidates=candidates
+                )
+
+            # VLM inference and the reflection groundedness check block, the response stream itself is lazy
+            return await asyncio.to_thread(
+                self.__generate_rag_response,
+                llm=llm,
+                messages=(system_message, conversation_history, user_message),
+                context_to_show=context_to_show,
+                query=query,
+                llm_settings=llm_settings,
+                collection_name=collection_name,
+                enable_vlm_inference=enable_vlm_inference,
+                vlm_model=vlm_model,
+                vlm_endpoint=vlm_endpoint,
+                model=model,
+                enable_citations=enable_citations,
+                lazy_citations=lazy_citations,
+                stream_flush_interval_ms=stream_flush_interval_ms,
+                stream_flush_chars=stream_flush_chars,
+                reflection_counter=reflection_counter,
+                answer_cache_scope=answer_cache_scope,
+                query_embedding=query_embedding,
+                document_embedder=document_embedder
+            )
+
+        except Exception as e:
+            return self.__rag_chain_error_response(e, model, collection_name, enable_citations, lazy_citations)
+
+        finally:
+            if speculative_task is not None:
+                if not speculative_task.done():
+                    speculative_task.cancel()
+                elif not speculative_task.cancelled():
+                    # Mark a failed speculative retrieval as handled
+                    speculative_task.exception()
+
+
+    def __generate_rag_response(
+        self,
+        llm: Any,
+        messages: Tuple[List[Tuple[str, str]], List[Tuple[str, str]], List[Tuple[str, str]]],
+        context_to_show: List["Document"],
+        query: str,
+        llm_settings: Dict[str, Any],
+        collection_name: str,
+        enable_vlm_inference: bool,
+        vlm_model: str,
+        vlm_endpoint: str,
+        model: str,
+        enable_citations: bool,
+        lazy_citations: bool = False,
+        stream_flush_interval_ms: int = 0,
+        stream_flush_chars: int = 0,
+        reflection_counter: Optional[ReflectionCounter] = None,
+        answer_cache_scope: Optional[str] = None,
+        query_embedding: Optional[List[float]] = None,
+        document_embedder: Optional[Any] = None,
+    ) -> AsyncGenerator[str, None]:
+        """Generate the response of the RAG chain from the retrieved context.
+
+        Args:
+            llm: LLM used to generate the response
+            messages: System message, conversation history and user messages of the prompt
+            context_to_show: Retrieved documents used as context and citations
+            query: The user's query
+            llm_settings: Dictionary containing LLM settings
+            collection_name: Name of the collection used for retrieval
+            enable_vlm_inference: Whether to analyze the images cited in the context with the VLM
+            vlm_model: Name of the VLM model
+            vlm_endpoint: VLM server endpoint URL
+            model: Name of the LLM model
+            enable_citations: Whether to enable citations
+            lazy_citations: Whether citations carry thumbnail ids instead of their content
+            stream_flush_interval_ms: Merge response chunks arriving within this many milliseconds, 0 to disable
+            stream_flush_chars: Send merged response chunks once they reach this many characters, 0 to disable
+            reflection_counter: Reflection counter if reflection is enabled
+            answer_cache_scope: Scope key of the answer cache if the answer cache is enabled
+            query_embedding: Embedding of the standalone query if the answer cache is enabled
+            document_embedder: Embedding model used to look up the VLM answer cache
+        """
+        system_message, conversation_history, user_message = messages
+        user_message = list(user_message)
+
+        if enable_vlm_inference:
+            logger.info("Calling VLM to analyze images cited in the context")
+            vlm_response: str = ""
+            try:
+                vlm = VLM(vlm_model, vlm_endpoint)
+
+                # Reuse the VLM response for the same cited images and a similar question, and its verdict for the same text context
+                def analyze_images() -> str:
+                    return vlm.analyze_images_from_context(context_to_show, query)
+
+                def judge_vlm_response(response: str) -> bool:
+                    return vlm.reason_on_vlm_response(query, response, context_to_show, llm_settings)
+
+                thumbnail_ids = []
+                if ENABLE_VLM_ANSWER_CACHE and document_embedder is not None:
+                    thumbnail_ids = vlm.get_thumbnail_ids(context_to_show)
+                if thumbnail_ids:
+                    vlm_answer_cache = get_vlm_answer_cache()
+                    vlm_response, use_vlm_response = vlm_answer_cache.get_or_analyze(
+                        vlm_answer_cache.scope_key(
+                            thumbnail_ids, vlm_model=vlm_model, vlm_endpoint=vlm_endpoint, model=llm_settings.get("model")
+                        ),
+                        document_embedder.embed_query(query),
+                        vlm_answer_cache.context_key(context_to_show),
+                        analyze=analyze_images,
+                        judge=judge_vlm_response
                     )
-                    if vlm_response and vlm.reason_on_vlm_response(
-                        query, vlm_response, context_to_show, llm_settings
-                    ):
-                        logger.info("VLM response validated and added to prompt: %s", vlm_response)
-                        vlm_response_prompt = (
-                            "The following is an answer generated by a Vision-Language Model (VLM) based solely on images cited in the context:\n"
-                            f"---\n{vlm_response.strip()}\n---\n"
-                            "Consider this visual insight when answering the user's query, especially where the textual context is ambiguous or limited."
-                        )
-                        user_message += [("user", vlm_response_prompt)]
-                    else:
-                        logger.info("VLM response skipped after reasoning or was empty.")
-                except (ValueError, EnvironmentError) as e:
-                    logger.warning(
-                        "VLM processing failed for query='%s', collection='%s': %s",
-                        query, collection_name, e, exc_info=True
+                else:
+                    vlm_response = analyze_images()
+                    use_vlm_response = bool(vlm_response) and judge_vlm_response(vlm_response)
+
+                if use_vlm_response:
+                    logger.info("VLM response validated and added to prompt: %s", vlm_response)
+                    vlm_response_prompt = (
+                        "The following is an answer generated by a Vision-Language Model (VLM) based solely on images cited in the context:\n"
+                        f"---\n{vlm_response.strip()}\n---\n"
+                        "Consider this visual insight when answering the user's query, especially where the textual context is ambiguous or limited."
                     )
+                    user_message += [("user", vlm_response_prompt)]
+                else:
+                    logger.info("VLM response skipped after reasoning or was empty.")
+            except (ValueError, EnvironmentError) as e:
+                logger.warning(
+                    "VLM processing failed for query='%s', collection='%s': %s",
+                    query, collection_name, e, exc_info=True
+                )
 
-                except Exception as e:
-                    logger.error(
-                        "Unexpected error during VLM processing for query='%s', collection='%s': %s",
-                        query, collection_name, e, exc_info=True
-                    )
+            except Exception as e:
+                logger.error(
+                    "Unexpected error during VLM processing for query='%s', collection='%s': %s",
+                    query, collection_name, e, exc_info=True
+                )
 
-            docs = [self.__format_document_with_source(d) for d in context_to_show]
+        docs = [self.__format_document_with_source(d) for d in context_to_show]
 
-            # Prompt for response generation based on context
-            user_message += [("user", "{question}")]
-            message = system_message + conversation_history + user_message
-            self.__print_conversation_history(message)
-            prompt = ChatPromptTemplate.from_messages(message)
+        # Prompt for response generation based on context
+        user_message += [("user", "{question}")]
+        message = system_message + conversation_history + user_message
+        self.__print_conversation_history(message)
+        prompt = ChatPromptTemplate.from_messages(message)
 
-            chain = prompt | llm | StreamingFilterThinkParser | StrOutputParser()
+        chain = prompt | llm | StreamingFilterThinkParser | StrOutputParser()
 
-            # Check response groundedness if we still have reflection iterations available
-            if os.environ.get("ENABLE_REFLECTION", "false").lower() == "true" and reflection_counter.remaining > 0:
+        # Check response groundedness if we still have reflection iterations available
+        if reflection_counter is not None and reflection_counter.remaining > 0:
+            if ENABLE_BEST_OF_N_GENERATION:
+                final_response, is_grounded = generate_best_grounded_response(
+                    chain,
+                    {"question": query, "context": docs},
+                    docs,
+                    reflection_counter
+                )
+            else:
                 initial_response = chain.invoke({"question": query, "context": docs})
                 final_response, is_grounded = check_response_groundedness(
                     initial_response,
                     docs,
                     reflection_counter
                 )
-                if not is_grounded:
-                    logger.warning("Could not generate sufficiently grounded response after %d total reflection attempts",
-                                    reflection_counter.current_count)
-                return generate_answer(iter([final_response]), context_to_show, model=model, collection_name=collection_name, enable_citations=enable_citations)
-            else:
-                return generate_answer(chain.stream({"question": query, "context": docs}, config={'run_name':'llm-stream'}), context_to_show, model=model, collection_name=collection_name, enable_citations=enable_citations)
+            if not is_grounded:
+                logger.warning("Could not generate sufficiently grounded response after %d total reflection attempts",
+                                reflection_counter.current_count)
+            if answer_cache_scope is not None:
+                get_answer_cache().store(answer_cache_scope, query_embedding, final_response, context_to_show)
+            return generate_answer(iter([final_response]), context_to_show, model=model, collection_name=collection_name, enable_citations=enable_citations, lazy_citations=lazy_citations)
+        else:
+            response_stream = chain.stream({"question": query, "context": docs}, config={'run_name':'llm-stream'})
+            if answer_cache_scope is not None:
+                response_stream = get_answer_cache().record_stream(response_stream, answer_cache_scope, query_embedding, context_to_show)
+            return generate_answer(response_stream, context_to_show, model=model, collection_name=collection_name, enable_citations=enable_citations, lazy_citations=lazy_citations,
+                                   stream_flush_interval_ms=stream_flush_interval_ms, stream_flush_chars=stream_flush_chars)
 
-        except ConnectTimeout as e:
+
+    def __rag_chain_error_response(
+        self,
+        e: Exception,
+        model: str,
+        collection_name: str,
+        enable_citations: bool,
+        lazy_citations: bool = False
+    ) -> AsyncGenerator[str, None]:
+        """Build the response stream reporting an error raised by the RAG chain."""
+        if isinstance(e, ConnectTimeout):
             logger.warning("Connection timed out while making a request to the LLM endpoint: %s", e)
-            return generate_answer(iter([f"Connection timed out while making a request to the NIM endpoint. Verify if the NIM server is available."]), [], model=model, collection_name=collection_name, enable_citations=enable_citations)
+            return generate_answer(iter([f"Connection timed out while making a request to the NIM endpoint. Verify if the NIM server is available."]), [], model=model, collection_name=collection_name, enable_citations=enable_citations, lazy_citations=lazy_citations)
 
-        except requests.exceptions.ConnectionError as e:
-            if "HTTPConnectionPool" in str(e):
-                logger.error("Connection pool error while connecting to service: %s", e)
-                return generate_answer(iter([f"Connection error: Failed to connect to service. Please verify if all required NIMs are running and accessible."]), [], model=model, collection_name=collection_name, enable_citations=enable_citations)
+        if isinstance(e, requests.exceptions.ConnectionError) and "HTTPConnectionPool" in str(e):
+            logger.error("Connection pool error while connecting to service: %s", e)
+            return generate_answer(iter([f"Connection error: Failed to connect to service. Please verify if all required NIMs are running and accessible."]), [], model=model, collection_name=collection_name, enable_citations=enable_citations, lazy_citations=lazy_citations)
 
-        except Exception as e:
-            logger.warning("Failed to generate response due to exception %s", e)
-            print_exc()
+        logger.warning("Failed to generate response due to exception %s", e)
+        print_exc()
 
-            if "[403] Forbidden" in str(e) and "Invalid UAM response" in str(e):
-                logger.warning("Authentication or permission error: Verify the validity and permissions of your NVIDIA API key.")
-                return generate_answer(iter([f"Authentication or permission error: Verify the validity and permissions of your NVIDIA API key."]), [], model=model, collection_name=collection_name, enable_citations=enable_citations)
-            elif "[404] Not Found" in str(e):
-                logger.warning("Please verify the API endpoint and your payload. Ensure that the model name is valid.")
-                return generate_answer(iter([f"Please verify the API endpoint and your payload. Ensure that the model name is valid."]), [], model=model, collection_name=collection_name, enable_citations=enable_citations)
+        if "[403] Forbidden" in str(e) and "Invalid UAM response" in str(e):
+            logger.warning("Authentication or permission error: Verify the validity and permissions of your NVIDIA API key.")
+            return generate_answer(iter([f"Authentication or permission error: Verify the validity and permissions of your NVIDIA API key."]), [], model=model, collection_name=collection_name, enable_citations=enable_citations, lazy_citations=lazy_citations)
+        elif "[404] Not Found" in str(e):
+            logger.warning("Please verify the API endpoint and your payload. Ensure that the model name is valid.")
+            return generate_answer(iter([f"Please verify the API endpoint and your payload. Ensure that the model name is valid."]), [], model=model, collection_name=collection_name, enable_citations=enable_citations, lazy_citations=lazy_citations)
+        else:
+            return generate_answer(iter([f"Failed to generate RAG chain with multi-turn response. {str(e)}"]), [], model=model, collection_name=collection_name, enable_citations=enable_citations, lazy_citations=lazy_citations)
+
+
+    def __validate_collection_names(
+        self,
+        collection_name: str,
+        collection_names: List[str],
+        filter_expr: Optional[str]
+    ) -> List[str]:
+        """Validate the collections and filter expression of a request and return the collection names to use."""
+        # If collection_name is provided, use it as the collection name, Otherwise, use the collection names from the kwargs
+        if collection_name: # Would be deprecated in the future
+            logger.warning("'collection_name' parameter is provided. This will be deprecated in the future. Use 'collection_names' instead.")
+            collection_names = [collection_name]
+        # Check if collection names are provided
+        if not collection_names:
+            raise APIError("Collection names are not provided.", 400)
+        if len(collection_names) > MAX_COLLECTION_NAMES:
+            raise APIError(f"Only {MAX_COLLECTION_NAMES} collections are supported at a time.", 400)
+        if not validate_filter_expr(filter_expr):
+            raise APIError("Invalid filter expression.", 400)
+        return collection_names
+
+
+    def __get_retrievers(
+        self,
+        document_embedder: Any,
+        collection_names: List[str],
+        vdb_endpoint: str,
+        top_k: int
+    ) -> List[Any]:
+        """Get a retriever returning the top_k documents for each collection."""
+        # Initialize vector stores for each collection name
+        vector_stores = [get_vectorstore(document_embedder, name, vdb_endpoint) for name in collection_names]
+
+        # Check if all vector stores are initialized properly
+        if any(vs is None for vs in vector_stores):
+            raise APIError("Vector store not initialized properly. Please check if the vector DB is up and running.", 500)
+
+        return [vs.as_retriever(search_kwargs={"k": top_k}) for vs in vector_stores]
+
+
+    def __get_rag_messages(
+        self,
+        chat_history: List[Dict[str, str]],
+        model: str
+    ) -> Tuple[List[Dict[str, str]], List[Tuple[str, str]], List[Tuple[str, str]], List[Tuple[str, str]]]:
+        """Trim the chat history and build the system message, conversation history and user messages of the RAG prompt."""
+        # conversation is tuple so it should be multiple of two
+        # -1 is to keep last k conversation
+        history_count = int(os.environ.get("CONVERSATION_HISTORY", 15)) * 2 * -1
+        chat_history = chat_history[history_count:]
+        system_prompt = ""
+        conversation_history = []
+        system_prompt += prompts.get("rag_template", "")
+        user_message = []
+
+        if "llama-3.3-nemotron-super-49b" in str(model):
+            if os.environ.get("ENABLE_NEMOTRON_THINKING", "false").lower() == "true":
+                logger.info("Setting system prompt as detailed thinking on")
+                system_prompt = "detailed thinking on"
+            else:
+                logger.info("Setting system prompt as detailed thinking off")
+                system_prompt = "detailed thinking off"
+            user_message += [("user", prompts.get("rag_template", ""))]
+
+        for message in chat_history:
+            if message.get("role") ==  "system":
+                system_prompt = system_prompt + " " + message.get("content")
             else:
-                return generate_answer(iter([f"Failed to generate RAG chain with multi-turn response. {str(e)}"]), [], model=model, collection_name=collection_name, enable_citations=enable_citations)
+                conversation_history.append((message.get("role"), message.get("content")))
+
+        system_message = [("system", system_prompt)]
+        return chat_history, system_message, conversation_history, user_message
+
+
+    def __get_rewriter_history(self, messages: List[Dict[str, str]]) -> List[Tuple[str, str]]:
+        """Get the last k conversation turns, without system messages, used by the query rewriter."""
+        # conversation is tuple so it should be multiple of two
+        # -1 is to keep last k conversation
+        history_count = int(os.environ.get("CONVERSATION_HISTORY", 15)) * 2 * -1
+        return [
+            (message.get("role"), message.get("content"))
+            for message in messages[history_count:]
+            if message.get("role") != "system"
+        ]
+
+
+    def __get_query_rewriter_chain(self):
+        """Get the chain which reformulates the latest user question into a standalone question."""
+        # Based on conversation history recreate query for better document retrieval
+        contextualize_q_system_prompt = (
+            "Given a chat history and the latest user question "
+            "which might reference context in the chat history, "
+            "formulate a standalone question which can be understood "
+            "without the chat history. Do NOT answer the question, "
+            "just reformulate it if needed and otherwise return it as is."
+        )
+        query_rewriter_prompt = prompts.get("query_rewriter_prompt", contextualize_q_system_prompt)
+        contextualize_q_prompt = ChatPromptTemplate.from_messages(
+            [("system", query_rewriter_prompt), MessagesPlaceholder("chat_history"), ("human", "{input}"),]
+        )
+        # query to be used for document retrieval
+        logger.info("Query rewriter prompt: %s", contextualize_q_prompt)
+        return contextualize_q_prompt | query_rewriter_llm | StreamingFilterThinkParser | StrOutputParser()
+
+
+    def __get_combined_query(self, chat_history: List[Dict[str, str]], query: str) -> str:
+        """Use previous user queries and current query to form a single query for document retrieval."""
+        user_queries = [msg.get("content") for msg in chat_history if msg.get("role") == "user"]
+        # TODO: Find a better way to join this when queries already have punctuation
+        retriever_query = ". ".join([*user_queries, query])
+        logger.info("Combined retriever query: %s", retriever_query)
+        return retriever_query
+
+
+    def __lookup_answer_cache(
+        self,
+        query_embedding: List[float],
+        collection_names: List[str],
+        vdb_endpoint: str,
+        filter_expr: Optional[str],
+        reranker_top_k: int,
+        vdb_top_k: int,
+        enable_reranker: bool,
+        reranker_model: str,
+        embedding_model: str,
+        enable_vlm_inference: bool,
+        llm_settings: Dict[str, Any]
+    ) -> Tuple[str, Optional[CachedAnswer]]:
+        """Get the answer cache scope for the retrieval and generation parameters of a request, and the
+        cached answer for the most similar standalone query in the scope if there is one."""
+        answer_cache_scope = get_answer_cache().scope_key(
+            collection_names,
+            vdb_endpoint=vdb_endpoint,
+            filter_expr=filter_expr,
+            reranker_top_k=reranker_top_k,
+            vdb_top_k=vdb_top_k,
+            enable_reranker=enable_reranker,
+            reranker_model=reranker_model,
+            embedding_model=embedding_model,
+            enable_vlm_inference=enable_vlm_inference,
+            enable_reflection=os.environ.get("ENABLE_REFLECTION", "false").lower(),
+            **llm_settings
+        )
+        return answer_cache_scope, get_answer_cache().lookup(answer_cache_scope, query_embedding)
+
+
+    def __retrieve_documents(
+        self,
+        retrievers: List[Any],
+        ranker: Optional[Any],
+        retriever_query: str,
+        filter_expr: Optional[str]
+    ) -> List["Document"]:
+        """Retrieve documents from all collections in parallel and rerank them if a ranker is given.
+
+        Without a ranker, the results of multiple collections are merged with rank fusion.
+        """
+        otel_ctx = otel_context.get_current()
+        # Perform parallel retrieval from all vector stores
+        futures = [
+            RETRIEVAL_EXECUTOR.submit(retreive_docs_from_retriever, retriever=retriever, retriever_query=retriever_query, expr=filter_expr, otel_ctx=otel_ctx)
+            for retriever in retrievers
+        ]
+        results = [future.result() for future in futures]
+
+        if ranker:
+            logger.info("Narrowing the collection to %s results with the reranker.", ranker.top_n)
+            context_reranker = RunnableAssign({
+                "context":
+                    lambda input: ranker.compress_documents(query=input['question'], documents=input['context'])
+            })
+
+            docs = merge_candidates(results, min_candidates=ranker.top_n)
+
+            start_time = time.time()
+            docs = context_reranker.invoke({"context": docs, "question": retriever_query}, config={'run_name':'context_reranker'})
+            logger.info("    == Context reranker time: %.2f ms ==", (time.time() - start_time) * 1000)
+
+            # Normalize scores to 0-1 range
+            return self.__normalize_relevance_scores(docs.get("context", []))
+
+        return fuse_results(results, top_k=retrievers[0].search_kwargs.get("k"))
+
+
+    async def __aretrieve_candidates(
+        self,
+        retrievers: List[Any],
+        ranker: Optional[Any],
+        retriever_query: str,
+        filter_expr: Optional[str]
+    ) -> List["Document"]:
+        """Retrieve candidates from all collections concurrently.
+
+        Without a ranker, the results of multiple collections are merged with rank fusion and are final.
+        """
+        results = await asyncio.gather(*[
+            aretreive_docs_from_retriever(retriever=retriever, retriever_query=retriever_query, expr=filter_expr)
+            for retriever in retrievers
+        ])
+        if ranker:
+            return merge_candidates(results, min_candidates=ranker.top_n)
+        return fuse_results(results, top_k=retrievers[0].search_kwargs.get("k"))
+
+
+    async def __aretrieve_documents(
+        self,
+        retrievers: List[Any],
+        ranker: Optional[Any],
+        retriever_query: str,
+        filter_expr: Optional[str],
+        candidates: Optional[List["Document"]] = None
+    ) -> List["Document"]:
+        """Async version of __retrieve_documents, retrieving from all collections concurrently on the event loop.
+
+        Already retrieved candidates, e.g. from speculative retrieval, are reranked without retrieving again.
+        """
+        if candidates is None:
+            candidates = await self.__aretrieve_candidates(retrievers, ranker, retriever_query, filter_expr)
+
+        if ranker:
+            logger.info("Narrowing the collection to %s results with the reranker.", ranker.top_n)
+
+            async def _arerank(input):
+                return await ranker.acompress_documents(query=input['question'], documents=input['context'])
+
+            context_reranker = RunnableAssign({
+                "context": RunnableLambda(
+                    lambda input: ranker.compress_documents(query=input['question'], documents=input['context']),
+                    afunc=_arerank
+                )
+            })
+
+            start_time = time.time()
+            docs = await context_reranker.ainvoke({"context": candidates, "question": retriever_query}, config={'run_name':'context_reranker'})
+            logger.info("    == Context reranker time: %.2f ms ==", (time.time() - start_time) * 1000)
+
+            # Normalize scores to 0-1 range
+            return self.__normalize_relevance_scores(docs.get("context", []))
+
+        return candidates
+
+
+    async def __accept_speculative_candidates(
+        self,
+        document_embedder: Any,
+        speculative_task: "asyncio.Task",
+        speculative_query: str,
+        retriever_query: str
+    ) -> Optional[List["Document"]]:
+        """Return the speculatively retrieved candidates if the rewritten query is near-identical to the
+        combined query they were retrieved with, otherwise cancel the speculative retrieval and return None.
+        """
+        if " ".join(speculative_query.split()) == " ".join(retriever_query.split()):
+            similarity = 1.0
+        else:
+            speculative_embedding, rewritten_embedding = await asyncio.gather(
+                document_embedder.aembed_query(speculative_query),
+                document_embedder.aembed_query(retriever_query)
+            )
+            speculative_vector = np.asarray(speculative_embedding, dtype=np.float32)
+            rewritten_vector = np.asarray(rewritten_embedding, dtype=np.float32)
+            norm = float(np.linalg.norm(speculative_vector) * np.linalg.norm(rewritten_vector))
+            similarity = float(speculative_vector @ rewritten_vector) / norm if norm else 0.0
+
+        accepted = similarity >= SPECULATIVE_RETRIEVAL_SIMILARITY_THRESHOLD
+        candidates = None
+        if accepted:
+            try:
+                candidates = await speculative_task
+            except Exception as e:
+                logger.warning("Speculative retrieval failed, retrieving with the rewritten query: %s", e)
+                accepted = False
+        else:
+            speculative_task.cancel()
+
+        logger.info("Speculative retrieval %s, similarity between combined and rewritten query: %.4f",
+                    "accepted" if accepted else "rejected", similarity)
+        metrics = get_otel_metrics()
+        if metrics:
+            metrics.update_speculative_retrieval(accepted=accepted)
+        return candidates
 
 
     def __print_conversation_history(self, conversation_history: List[str] = None, query: str | None = None):
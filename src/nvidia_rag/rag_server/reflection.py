@@ -19,24 +19,58 @@ Reflection is a technique used to improve the quality of the generated response
 2. check_context_relevance: Check relevance of retrieved context and optionally rewrite query for better results.
 3. check_response_groundedness: Check groundedness of generated response against retrieved context.
 4. _retry_score_generation: Helper method to retry score generation with error handling.
+5. _retrieve_context: Retrieve from all collections and rerank or fuse the results.
+6. _score_context: Retrieve the context of a query and score its relevance.
+7. _check_context_relevance_parallel: Score the query and several rewrites of it concurrently and keep the best context.
+8. _reranker_relevance_score: Score the relevance of reranked context from its reranker scores when they are conclusive.
+9. generate_best_grounded_response: Generate several responses concurrently and keep the most grounded one.
+10. _get_reflection_llm: Get the reflection LLM used to judge relevance and groundedness.
 """
 
+import contextvars
 import logging
 import os
-from typing import List, Tuple, Dict, Any
+from typing import List, Optional, Tuple, Dict, Any
 from concurrent.futures import ThreadPoolExecutor
 
 from langchain_core.output_parsers.string import StrOutputParser
 from langchain_core.prompts.chat import ChatPromptTemplate
 from langchain_core.runnables import RunnableAssign
+from opentelemetry import context as otel_context
 
 from nvidia_rag.utils.llm import get_llm, get_prompts
-from nvidia_rag.utils.common import get_env_variable
-from nvidia_rag.utils.vectorstore import retreive_docs_from_retriever
+from nvidia_rag.utils.common import get_env_variable, get_otel_metrics
+from nvidia_rag.utils.vectorstore import retreive_docs_from_retriever, RETRIEVAL_EXECUTOR
+from nvidia_rag.utils.fusion import fuse_results, merge_candidates
 
 logger = logging.getLogger(__name__)
 prompts = get_prompts()
 
+# Parallel reflection scores the query and several rewrites of it in a single round instead of a serial loop
+ENABLE_PARALLEL_REFLECTION = os.getenv("ENABLE_PARALLEL_REFLECTION", "False").lower() in ["true", "True"]
+REFLECTION_PARALLEL_REWRITES = int(os.getenv("REFLECTION_PARALLEL_REWRITES", 3))
+REFLECTION_REWRITE_TEMPERATURE = float(os.getenv("REFLECTION_REWRITE_TEMPERATURE", 0.7))
+
+# Reranker score fast path, judging the relevance of reranked context without the reflection LLM when the
+# scores are conclusive. Thresholds are raw logits of the ranking NIM or local cross-encoder, before
+# normalization to 0-1, and the fast path is skipped for rankers whose scores are on another scale
+ENABLE_RERANKER_RELEVANCE_FAST_PATH = os.getenv("ENABLE_RERANKER_RELEVANCE_FAST_PATH", "False").lower() in ["true", "True"]
+RERANKER_RELEVANCE_ACCEPT_SCORE = float(os.getenv("RERANKER_RELEVANCE_ACCEPT_SCORE", 2.0))
+RERANKER_RELEVANCE_ACCEPT_MIN_DOCS = int(os.getenv("RERANKER_RELEVANCE_ACCEPT_MIN_DOCS", 2))
+RERANKER_RELEVANCE_REJECT_SCORE = float(os.getenv("RERANKER_RELEVANCE_REJECT_SCORE", -6.0))
+RERANKER_RELEVANCE_SCORE_SCALE = "logit"
+
+# Best-of-N generation, generating several responses concurrently and keeping the most grounded one
+ENABLE_BEST_OF_N_GENERATION = os.getenv("ENABLE_BEST_OF_N_GENERATION", "False").lower() in ["true", "True"]
+BEST_OF_N_CANDIDATES = int(os.getenv("BEST_OF_N_CANDIDATES", 3))
+
+# Shared pool for scoring candidate queries concurrently. Retrievals run in the RETRIEVAL_EXECUTOR of the
+# vectorstore module instead, since a candidate being scored waits on its retrievals.
+CANDIDATE_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("REFLECTION_THREAD_POOL_SIZE", 16)),
+    thread_name_prefix="reflection"
+)
+
 def _retry_score_generation(chain, inputs: Dict[str, Any], max_retries: int = 3, config: Dict[str, Any] = {}) -> int:
     """Helper method to retry score generation with error handling.
 
@@ -101,20 +135,7 @@ def check_context_relevance(retriever_query: str,
         Tuple[List[str], bool]: Retrieved documents and whether they meet relevance threshold
     """
     relevance_threshold = int(os.environ.get("CONTEXT_RELEVANCE_THRESHOLD", 1))
-    reflection_llm_name = get_env_variable(variable_name="REFLECTION_LLM", default_value="mistralai/mixtral-8x22b-instruct-v0.1").strip('"').strip("'")
-    reflection_llm_endpoint = os.environ.get("REFLECTION_LLM_SERVERURL", "").strip('"').strip("'")
-
-    llm_params = {
-        "model": reflection_llm_name,
-        "temperature": 0.2,
-        "top_p": 0.9,
-        "max_tokens": 512
-    }
-
-    if reflection_llm_endpoint:
-        llm_params["llm_endpoint"] = reflection_llm_endpoint
-
-    reflection_llm = get_llm(**llm_params)
+    reflection_llm = _get_reflection_llm(max_tokens=512)
 
     relevance_template = ChatPromptTemplate.from_messages([
         ("system", prompts["reflection_relevance_check_prompt"]["system"]),
@@ -127,37 +148,21 @@ def check_context_relevance(retriever_query: str,
     ])
 
     current_query = retriever_query
+    otel_ctx = otel_context.get_current()
+    relevance_chain = relevance_template | reflection_llm | StrOutputParser()
+    ranker = ranker if enable_reranker else None
+
+    if ENABLE_PARALLEL_REFLECTION and reflection_counter.remaining > 0:
+        rewrite_llm = _get_reflection_llm(max_tokens=512, temperature=REFLECTION_REWRITE_TEMPERATURE)
+        return _check_context_relevance_parallel(
+            current_query, retrievers, ranker, reflection_counter, filter_expr, relevance_chain,
+            query_rewrite_template | rewrite_llm | StrOutputParser(), relevance_threshold, otel_ctx
+        )
 
+    original_docs = []
     while reflection_counter.remaining > 0:
         # Get documents using current query
-        if ranker and enable_reranker:
-            context_reranker = RunnableAssign({
-                "context":
-                    lambda input: ranker.compress_documents(query=input['question'], documents=input['context'])
-            })
-
-            # Perform parallel retrieval from all vector stores
-            docs = []
-            with ThreadPoolExecutor() as executor:
-                futures = [executor.submit(retreive_docs_from_retriever, retriever=retriever, retriever_query=current_query, expr=filter_expr) for retriever in retrievers]
-                for future in futures:
-                    docs.extend(future.result())
-
-            docs = context_reranker.invoke({"context": docs, "question": current_query}, config={'run_name':'context_reranker'})
-            original_docs = docs.get("context", [])
-        else:
-            # Perform sequential retrieval from the first vector store
-            original_docs = retreive_docs_from_retriever(retriever=retrievers[0], retriever_query=current_query, expr=filter_expr)
-
-        docs = [d.page_content for d in original_docs]
-
-        context_text = "\n".join(docs)
-        relevance_chain = relevance_template | reflection_llm | StrOutputParser()
-        relevance_score = _retry_score_generation(
-            relevance_chain,
-            {"query": current_query, "context": context_text},
-            config={'run_name':'relevance-checker'}
-        )
+        original_docs, relevance_score = _score_context(current_query, retrievers, ranker, filter_expr, relevance_chain, otel_ctx)
 
         logger.info(f"Context relevance score: {relevance_score} (threshold: {relevance_threshold})")
         reflection_counter.increment()
@@ -172,6 +177,121 @@ def check_context_relevance(retriever_query: str,
 
     return original_docs, False
 
+
+def _retrieve_context(query: str, retrievers: List[Any], ranker: Optional[Any], filter_expr: str, otel_ctx: Any) -> List[Any]:
+    """Retrieve from all collections in parallel, then rerank the pruned candidates or fuse the results."""
+    futures = [
+        RETRIEVAL_EXECUTOR.submit(retreive_docs_from_retriever, retriever=retriever, retriever_query=query, expr=filter_expr, otel_ctx=otel_ctx)
+        for retriever in retrievers
+    ]
+    results = [future.result() for future in futures]
+
+    if ranker:
+        context_reranker = RunnableAssign({
+            "context":
+                lambda input: ranker.compress_documents(query=input['question'], documents=input['context'])
+        })
+        docs = merge_candidates(results, min_candidates=ranker.top_n)
+        docs = context_reranker.invoke({"context": docs, "question": query}, config={'run_name':'context_reranker'})
+        return docs.get("context", [])
+
+    return fuse_results(results, top_k=retrievers[0].search_kwargs.get("k"))
+
+
+def _score_context(query: str, retrievers: List[Any], ranker: Optional[Any], filter_expr: str,
+                   relevance_chain, otel_ctx: Any) -> Tuple[List[Any], int]:
+    """Retrieve the context of a query and score its relevance, with the reflection LLM unless the reranker scores are conclusive."""
+    docs = _retrieve_context(query, retrievers, ranker, filter_expr, otel_ctx)
+
+    relevance_score = None
+    if ranker and ENABLE_RERANKER_RELEVANCE_FAST_PATH:
+        score_scale = getattr(ranker, "score_scale", None)
+        if score_scale == RERANKER_RELEVANCE_SCORE_SCALE:
+            relevance_score = _reranker_relevance_score(docs)
+        else:
+            logger.debug("Reranker scores on the %s scale don't match the relevance thresholds, using the reflection LLM", score_scale)
+    judge = "llm" if relevance_score is None else "reranker"
+    metrics = get_otel_metrics()
+    if metrics:
+        metrics.update_relevance_judge(judge=judge)
+
+    if relevance_score is None:
+        relevance_score = _retry_score_generation(
+            relevance_chain,
+            {"query": query, "context": "\n".join(d.page_content for d in docs)},
+            config={'run_name':'relevance-checker'}
+        )
+    else:
+        logger.info("Context relevance judged from reranker scores, skipping the reflection LLM")
+    return docs, relevance_score
+
+
+def _reranker_relevance_score(docs: List[Any]) -> Optional[int]:
+    """Score the relevance of reranked context from the raw reranker logits of its documents.
+
+    Returns 2 when at least RERANKER_RELEVANCE_ACCEPT_MIN_DOCS documents, or all of them if fewer, score
+    RERANKER_RELEVANCE_ACCEPT_SCORE or more, and 0 when no document scores above RERANKER_RELEVANCE_REJECT_SCORE.
+    Returns None when the scores are ambiguous or missing, so that the reflection LLM judges the context.
+    """
+    scores = [doc.metadata.get("relevance_score") for doc in docs]
+    if not scores or any(score is None for score in scores):
+        return None
+    accepted = sum(score >= RERANKER_RELEVANCE_ACCEPT_SCORE for score in scores)
+    if accepted >= min(max(1, RERANKER_RELEVANCE_ACCEPT_MIN_DOCS), len(scores)):
+        return 2
+    if max(scores) <= RERANKER_RELEVANCE_REJECT_SCORE:
+        return 0
+    return None
+
+
+def _check_context_relevance_parallel(retriever_query: str,
+                                      retrievers: List[Any],
+                                      ranker: Optional[Any],
+                                      reflection_counter: ReflectionCounter,
+                                      filter_expr: str,
+                                      relevance_chain,
+                                      rewrite_chain,
+                                      relevance_threshold: int,
+                                      otel_ctx: Any
+                                      ) -> Tuple[List[Any], bool]:
+    """Score the query and several rewrites of it concurrently and keep the most relevant context.
+
+    The original query is scored while REFLECTION_PARALLEL_REWRITES rewrites are generated in one batch,
+    then every distinct rewrite is scored concurrently. The context with the highest relevance score is
+    returned, preferring the original query on ties. The whole round counts as a single reflection iteration.
+    """
+    def submit(query: str):
+        # Each task runs in a copy of the caller's context, so that tracing spans are attached to the request
+        return CANDIDATE_EXECUTOR.submit(
+            contextvars.copy_context().run, _score_context, query, retrievers, ranker, filter_expr, relevance_chain, otel_ctx
+        )
+
+    queries = [retriever_query]
+    futures = [submit(retriever_query)]
+    rewrites = rewrite_chain.batch(
+        [{"query": retriever_query}] * REFLECTION_PARALLEL_REWRITES,
+        config={'run_name':'query-rewriter'},
+        return_exceptions=True
+    )
+    for rewrite in rewrites:
+        if isinstance(rewrite, Exception):
+            logger.warning("Failed to rewrite the query for parallel reflection: %s", rewrite)
+            continue
+        rewrite = rewrite.strip()
+        if rewrite and rewrite not in queries:
+            queries.append(rewrite)
+            futures.append(submit(rewrite))
+
+    candidates = [future.result() for future in futures]
+    reflection_counter.increment()
+
+    best = max(range(len(candidates)), key=lambda i: candidates[i][1])
+    docs, relevance_score = candidates[best]
+    logger.info("Best context relevance score %s of %d queries (threshold: %s), query: %s",
+                relevance_score, len(queries), relevance_threshold, queries[best])
+    return docs, relevance_score >= relevance_threshold
+
+
 def check_response_groundedness(response: str,
                               context: List[str],
                               reflection_counter: ReflectionCounter,
@@ -187,20 +307,7 @@ def check_response_groundedness(response: str,
         Tuple[str, bool]: Final response and whether it meets groundedness threshold
     """
     groundedness_threshold = int(os.environ.get("RESPONSE_GROUNDEDNESS_THRESHOLD", 1))
-    reflection_llm_name = get_env_variable(variable_name="REFLECTION_LLM", default_value="mistralai/mixtral-8x22b-instruct-v0.1").strip('"').strip("'")
-    reflection_llm_endpoint = os.environ.get("REFLECTION_LLM_SERVERURL", "").strip('"').strip("'")
-
-    llm_params = {
-        "model": reflection_llm_name,
-        "temperature": 0.2,
-        "top_p": 0.9,
-        "max_tokens": 1024
-    }
-
-    if reflection_llm_endpoint:
-        llm_params["llm_endpoint"] = reflection_llm_endpoint
-
-    reflection_llm = get_llm(**llm_params)
+    reflection_llm = _get_reflection_llm(max_tokens=1024)
 
     groundedness_template = ChatPromptTemplate.from_messages([
         ("system", prompts["reflection_groundedness_check_prompt"]["system"]),
@@ -234,4 +341,79 @@ def check_response_groundedness(response: str,
             current_response = regen_chain.invoke({}, config={'run_name':'response-regenerator'})
             logger.info(f"Regenerated response (iteration {reflection_counter.current_count})")
 
-    return current_response, False
\ No newline at end of file
+    return current_response, False
+
+
+def generate_best_grounded_response(chain,
+                                    inputs: Dict[str, Any],
+                                    context: List[str],
+                                    reflection_counter: ReflectionCounter,
+                                    num_candidates: int = BEST_OF_N_CANDIDATES
+                                    ) -> Tuple[str, bool]:
+    """Generate several responses concurrently and keep the most grounded one.
+
+    The candidate responses are generated in one batch and the distinct ones are scored for groundedness
+    concurrently, so this takes one generation and one judge round trip instead of a regeneration loop.
+    Candidates only differ when the LLM samples with a temperature above 0. Ties keep the earlier
+    candidate, and the whole round counts as a single reflection iteration.
+
+    Args:
+        chain: The response generation chain
+        inputs: Input dictionary for the chain
+        context (List[str]): List of context documents
+        reflection_counter: ReflectionCounter instance to track loop count
+        num_candidates: Number of responses to generate
+
+    Returns:
+        Tuple[str, bool]: Most grounded response and whether it meets groundedness threshold
+    """
+    groundedness_threshold = int(os.environ.get("RESPONSE_GROUNDEDNESS_THRESHOLD", 1))
+    groundedness_template = ChatPromptTemplate.from_messages([
+        ("system", prompts["reflection_groundedness_check_prompt"]["system"]),
+        ("human", "{context}\n\n{response}")
+    ])
+    groundedness_chain = groundedness_template | _get_reflection_llm(max_tokens=1024) | StrOutputParser()
+    context_text = "\n".join(context)
+
+    responses = []
+    generated = chain.batch([inputs] * max(1, num_candidates), config={'run_name':'llm-best-of-n'}, return_exceptions=True)
+    for response in generated:
+        if isinstance(response, Exception):
+            logger.warning("Failed to generate a candidate response: %s", response)
+        elif response not in responses:
+            responses.append(response)
+    if not responses:
+        raise generated[0]
+
+    futures = [
+        CANDIDATE_EXECUTOR.submit(
+            contextvars.copy_context().run, _retry_score_generation, groundedness_chain,
+            {"context": context_text, "response": response}, config={'run_name':'groundedness-checker'}
+        )
+        for response in responses
+    ]
+    scores = [future.result() for future in futures]
+    reflection_counter.increment()
+
+    best = max(range(len(responses)), key=lambda i: scores[i])
+    logger.info("Best response groundedness score %s of %d candidates (threshold: %s)",
+                scores[best], len(responses), groundedness_threshold)
+    return responses[best], scores[best] >= groundedness_threshold
+
+
+def _get_reflection_llm(max_tokens: int, temperature: float = 0.2):
+    """Get the reflection LLM configured by REFLECTION_LLM and REFLECTION_LLM_SERVERURL."""
+    reflection_llm_name = get_env_variable(variable_name="REFLECTION_LLM", default_value="mistralai/mixtral-8x22b-instruct-v0.1").strip('"').strip("'")
+    reflection_llm_endpoint = os.environ.get("REFLECTION_LLM_SERVERURL", "").strip('"').strip("'")
+
+    llm_params = {
+        "model": reflection_llm_name,
+        "temperature": temperature,
+        "top_p": 0.9,
+        "max_tokens": max_tokens
+    }
+
+    if reflection_llm_endpoint:
+        llm_params["llm_endpoint"] = reflection_llm_endpoint
+
+    return get_llm(**llm_params)
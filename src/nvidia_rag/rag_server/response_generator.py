@@ -17,29 +17,57 @@
     1. response_generator(): Generate a response using the RAG chain.
     2. prepare_llm_request(): Prepare the request for the LLM response generation.
     3. generate_answer(): Generate and stream the response to the provided prompt.
+    3a. iterate_in_thread(): Iterate a blocking generator in a worker thread without blocking the event loop.
+    3b. StreamFrameTemplate: Serialize the token chunks of a streamed response without building pydantic models.
+    3c. ChunkCoalescer: Merge the chunks of a response stream into fewer frames by time and size.
     4. prepare_citations(): Prepare citations for the response.
     5. error_response_generator(): Generate a stream of data for the error response.
     6. retrieve_summary(): Retrieve the summary of a document.
+    7. retrieve_citation_content(): Retrieve the image bytes of an image, table or chart citation.
 """
 
 import logging
 import time
 import os
+import re
+import base64
 import bleach
 import asyncio
-from typing import Dict, Any, Generator, List, Union
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from json.encoder import encode_basestring
+from typing import Dict, Any, AsyncGenerator, AsyncIterable, Generator, Iterable, List, Union
 from uuid import uuid4
 from langchain_core.documents import Document
 from pymilvus.exceptions import MilvusException, MilvusUnavailableException
 from pydantic import BaseModel, Field, validator
 from typing import Literal, Optional
 
-from nvidia_rag.utils.minio_operator import get_unique_thumbnail_id, get_minio_operator
+from nvidia_rag.utils.common import get_otel_metrics
+from nvidia_rag.utils.minio_operator import get_unique_thumbnail_id, get_minio_operator, get_thumbnail_contents
 
 logger = logging.getLogger(__name__)
 
 FALLBACK_EXCEPTION_MSG = "Error from rag-server. Please check rag-server logs for more details."
 
+# Blocking response streams are iterated in this bounded pool, at most this many streams make progress at once
+STREAM_BRIDGE_MAX_WORKERS = int(os.getenv("STREAM_BRIDGE_MAX_WORKERS", 64))
+# Number of chunks a worker may read ahead of the client before it waits
+STREAM_BRIDGE_QUEUE_SIZE = int(os.getenv("STREAM_BRIDGE_QUEUE_SIZE", 64))
+
+_STREAM_BRIDGE_EXECUTOR = ThreadPoolExecutor(max_workers=STREAM_BRIDGE_MAX_WORKERS, thread_name_prefix="stream-bridge")
+_STREAM_END = object()
+
+# Default token coalescing of response streams, 0 sends every chunk as its own frame
+STREAM_FLUSH_INTERVAL_MS = int(os.getenv("STREAM_FLUSH_INTERVAL_MS", 0))
+STREAM_FLUSH_CHARS = int(os.getenv("STREAM_FLUSH_CHARS", 0))
+
+# Serialize streamed tokens by splicing them into a precomputed frame instead of building the response models
+ENABLE_FAST_SSE_SERIALIZATION = os.getenv("ENABLE_FAST_SSE_SERIALIZATION", "True").lower() in ["true", "True"]
+# Characters which bleach.clean may change, chunks containing them are sanitized with bleach as in Message
+_BLEACH_SENSITIVE_CHARACTERS = re.compile(r"[<>&\r\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f\ufdd0-\ufdef\ufffe\uffff]")
+
 
 class Usage(BaseModel):
     """Token usage information."""
@@ -259,36 +287,221 @@ def prepare_llm_request(messages: List[Dict[str, str]], **kwargs) -> Dict[str, A
     return last_user_message, processed_chat_history
 
 
+async def iterate_in_thread(
+    generator: Iterable[Any],
+    maxsize: int = STREAM_BRIDGE_QUEUE_SIZE
+) -> AsyncGenerator[Any, None]:
+    """Iterate a blocking generator in a worker thread and yield its items on the event loop.
+
+    Items are passed through a bounded asyncio queue, so the worker stops reading ahead of a slow client.
+    Exceptions raised by the generator are re-raised to the consumer. If the consumer stops early, the
+    worker stops at the next item and closes the generator.
+
+    Args:
+        generator: Blocking generator, for example the output of chain.stream()
+        maxsize: Maximum number of items buffered between the worker thread and the event loop
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def _put(item) -> bool:
+        # Blocks the worker thread, never the event loop, while the queue is full
+        future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        while True:
+            try:
+                future.result(timeout=0.1)
+                return True
+            except FutureTimeoutError:
+                if stop.is_set():
+                    future.cancel()
+                    return False
+
+    def _produce():
+        try:
+            for item in generator:
+                if stop.is_set() or not _put((item, None)):
+                    break
+            else:
+                _put((_STREAM_END, None))
+        except Exception as e:
+            _put((_STREAM_END, e))
+        finally:
+            close = getattr(generator, "close", None)
+            if close is not None:
+                close()
+
+    # Run the worker in a copy of the current context so that the tracing context follows the stream
+    loop.run_in_executor(_STREAM_BRIDGE_EXECUTOR, contextvars.copy_context().run, _produce)
+    try:
+        while True:
+            item, error = await queue.get()
+            if error is not None:
+                raise error
+            if item is _STREAM_END:
+                break
+            yield item
+    finally:
+        stop.set()
+
+
+class StreamFrameTemplate:
+    """Serializes the token chunks of a streamed response without building the pydantic response models.
+
+    The JSON around the chunk content is encoded once per response, and each chunk only sanitizes and
+    escapes its content. Frames are byte-compatible with the ChainResponse frames of generate_answer for
+    chunks without citations, and chunks which the Message validators would reject return None.
+    """
+
+    def __init__(self, resp_id: str, model: str):
+        self._prefix = (
+            'data: {"id":' + encode_basestring(resp_id) +
+            ',"choices":[{"index":0,"message":{"role":"assistant","content":'
+        )
+        self._delta = '},"delta":{"role":null,"content":'
+        self._created = (
+            '},"finish_reason":null}],"model":' + encode_basestring(model) +
+            ',"object":"chat.completion.chunk","created":'
+        )
+        self._suffix = (
+            ',"usage":{"total_tokens":0,"prompt_tokens":0,"completion_tokens":0},'
+            '"citations":{"total_results":0,"results":[]}}\n\n'
+        )
+
+    def frame(self, chunk: str, created: int) -> Optional[str]:
+        """Get the server-sent event frame of a chunk, or None if it must go through the response models."""
+        if not isinstance(chunk, str):
+            return None
+        if _BLEACH_SENSITIVE_CHARACTERS.search(chunk):
+            chunk = bleach.clean(chunk, strip=True)
+        if len(chunk) > 131072:
+            return None
+        content = encode_basestring(chunk)
+        return "".join((self._prefix, content, self._delta, content, self._created, str(created), self._suffix))
+
+
+class ChunkCoalescer:
+    """Merges the chunks of a response stream into fewer frames.
+
+    The first chunk is passed through as soon as it arrives so that the time to first token is unchanged.
+    Later chunks are buffered and sent as one chunk once `flush_chars` characters are buffered or
+    `flush_interval_ms` milliseconds have passed since the oldest buffered chunk arrived, whichever comes
+    first. A value of 0 disables the corresponding trigger, and the rest of the buffer is sent at the end.
+    """
+
+    def __init__(self, flush_interval_ms: int = 0, flush_chars: int = 0):
+        self.flush_interval = max(0, flush_interval_ms) / 1000
+        self.flush_chars = max(0, flush_chars)
+        self.chunks = 0
+        self.frames = 0
+
+    async def coalesce(self, chunks: AsyncIterable[str]) -> AsyncGenerator[str, None]:
+        """Iterate the merged chunks of an async iterable of chunks."""
+        iterator = chunks.__aiter__()
+        loop = asyncio.get_running_loop()
+        buffer = []
+        buffered_chars = 0
+        deadline = None
+        pending = None
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(iterator.__anext__())
+                timeout = None if deadline is None else max(0.0, deadline - loop.time())
+                done, _ = await asyncio.wait((pending,), timeout=timeout)
+                if done:
+                    try:
+                        chunk = pending.result()
+                    except StopAsyncIteration:
+                        pending = None
+                        break
+                    pending = None
+                    self.chunks += 1
+                    buffer.append(chunk)
+                    buffered_chars += len(chunk)
+                    if deadline is None and self.flush_interval:
+                        deadline = loop.time() + self.flush_interval
+                    if self.frames and not (self.flush_chars and buffered_chars >= self.flush_chars):
+                        continue
+                # Flush on the first chunk, a full buffer or an elapsed interval
+                self.frames += 1
+                yield "".join(buffer)
+                buffer = []
+                buffered_chars = 0
+                deadline = None
+
+            if buffer:
+                self.frames += 1
+                yield "".join(buffer)
+        finally:
+            if pending is not None:
+                pending.cancel()
+            elif hasattr(iterator, "aclose"):
+                await iterator.aclose()
+
+
 async def generate_answer(
-    generator: 'Generator[str]',
+    generator: 'Union[Generator[str], AsyncIterable[str]]',
     contexts: List[Any],
     model: str = "",
     collection_name: str = "",
-    enable_citations: bool = True
+    enable_citations: bool = True,
+    lazy_citations: bool = False,
+    stream_flush_interval_ms: int = 0,
+    stream_flush_chars: int = 0
 ):
     """Generate and stream the response to the provided prompt.
 
+    Blocking generators, like the output of chain.stream(), are iterated in a worker thread and the
+    citations are prepared in a worker thread while waiting for the first chunk, so that neither the
+    LLM stream nor the minio reads block the event loop.
+
     Args:
-        generator: Generator that yields response chunks
+        generator: Generator or async iterable that yields response chunks
         contexts: List of context documents used for generation
         model: Name of the model used for generation
         collection_name: Name of the collection used for retrieval
         enable_citations: Whether to enable citations in the response
+        lazy_citations: Whether citations carry thumbnail ids instead of thumbnail content
+        stream_flush_interval_ms: Merge chunks arriving within this many milliseconds into one frame, 0 to disable
+        stream_flush_chars: Send merged chunks once they reach this many characters, 0 to disable
     """
 
+    citations_task = None
     try:
         # unique response id for every query
         resp_id = str(uuid4())
         if generator:
             logger.debug("Generated response chunks\n")
+            if contexts:
+                citations_task = asyncio.create_task(asyncio.to_thread(
+                    prepare_citations,
+                    retrieved_documents=contexts,
+                    enable_citations=enable_citations,
+                    lazy_citations=lazy_citations,
+                ))
+            chunks = generator if hasattr(generator, "__aiter__") else iterate_in_thread(generator)
+            coalescer = None
+            if stream_flush_interval_ms > 0 or stream_flush_chars > 0:
+                coalescer = ChunkCoalescer(stream_flush_interval_ms, stream_flush_chars)
+                chunks = coalescer.coalesce(chunks)
+            frame_count = 0
+            frame_template = StreamFrameTemplate(resp_id, model) if ENABLE_FAST_SSE_SERIALIZATION else None
             # Create ChainResponse object for every token generated
             first_chunk = True
             start_time = time.time()
-            for chunk in generator:
+            async for chunk in chunks:
                 # TODO: This is a hack to clear contexts if we get an error response from nemoguardrails
                 if chunk == "I'm sorry, I can't respond to that.":
                     # Clear contexts if we get an error response
                     contexts = list()
+                # Only the first chunk carries citations, the rest are spliced into the frame template
+                if not first_chunk and frame_template is not None:
+                    frame = frame_template.frame(chunk, int(time.time()))
+                    if frame is not None:
+                        frame_count += 1
+                        yield frame
+                        continue
                 chain_response = ChainResponse()
                 response_choice = ChainResponseChoices(
                     index=0,
@@ -303,15 +516,23 @@ async def generate_answer(
                 chain_response.created = int(time.time())
                 if first_chunk:
                     logger.info("    == LLM Time to First Token (TTFT): %.2f ms ==", (time.time() - start_time) * 1000)
-                    chain_response.citations = prepare_citations(
-                        retrieved_documents=contexts,
-                        enable_citations=enable_citations,
-                    )
+                    if contexts and citations_task is not None:
+                        chain_response.citations = await citations_task
+                    else:
+                        chain_response.citations = prepare_citations(
+                            retrieved_documents=[],
+                            enable_citations=enable_citations,
+                        )
                     first_chunk = False
                 logger.debug(response_choice)
                 # Send generator with tokens in ChainResponse format
+                frame_count += 1
                 yield "data: " + str(chain_response.json()) + "\n\n"
 
+            metrics = get_otel_metrics()
+            if metrics:
+                metrics.update_stream_frames(frames=frame_count, chunks=coalescer.chunks if coalescer else frame_count)
+
             chain_response = ChainResponse()
 
             # [DONE] indicate end of response from server
@@ -343,11 +564,16 @@ async def generate_answer(
                      exc_info=logger.getEffectiveLevel() <= logging.DEBUG)
         yield error_response_generator(FALLBACK_EXCEPTION_MSG)
 
+    finally:
+        if citations_task is not None and not citations_task.done():
+            citations_task.cancel()
+
 
 def prepare_citations(
     retrieved_documents: List[Document],
     force_citations: bool = False, # True in-case of doc search api
-    enable_citations: bool = True
+    enable_citations: bool = True,
+    lazy_citations: bool = False
 ) -> Citations:
     """
     Prepare citation information based on retrieved_documents
@@ -355,13 +581,30 @@ def prepare_citations(
         - collection_name: str - Milvus Collection Name
         - retrieved_documents: List of retrieved langchain documents
         - force_citations: This flag would give citations even if config enable_citations is unset
+        - lazy_citations: Leave out the content of citations, image, table and chart citations carry
+          their thumbnail id as document_id which can be passed to the /citations/content API
     Returns:
         - source_results: Citations
     """
     citations = list()
 
     if force_citations or enable_citations:
+        # Pull content of all images, tables and charts from the thumbnail cache or minio before building the citations
+        thumbnail_contents = {}
+        if enable_citations and not lazy_citations:
+            thumbnail_ids = [
+                thumbnail_id for thumbnail_id in map(_get_citation_thumbnail_id, retrieved_documents)
+                if thumbnail_id is not None
+            ]
+            if thumbnail_ids:
+                logger.debug("Pulling content from minio for %d image/table/chart citations ...", len(thumbnail_ids))
+                try:
+                    thumbnail_contents = get_thumbnail_contents(thumbnail_ids)
+                except Exception as e:
+                    logger.error(f"Error pulling content from minio for image/table/chart for citations: {e}")
+
         for doc in retrieved_documents:
+            document_id = ""
 
             if isinstance(doc.metadata.get("source"), str):
                 # If langchain is used for ingestion, the source is a string
@@ -393,15 +636,11 @@ def prepare_citations(
                     document_type = doc.metadata.get("content_metadata", {}).get("subtype")
                 try:
                     if enable_citations:
-                        logger.debug("Pulling content from minio for image/table/chart for citations ...")
-                        unique_thumbnail_id = get_unique_thumbnail_id(
-                            collection_name=doc.metadata.get("collection_name"),
-                            file_name=file_name,
-                            page_number=page_number,
-                            location=location
-                        )
-                        payload = get_minio_operator().get_payload(object_name=unique_thumbnail_id)
-                        content = payload.get("content", "")
+                        if lazy_citations:
+                            content = ""
+                            document_id = _get_citation_thumbnail_id(doc) or ""
+                        else:
+                            content = thumbnail_contents.get(_get_citation_thumbnail_id(doc), "")
                         source_metadata = SourceMetadata(
                             page_number=page_number,
                             location=location,
@@ -422,10 +661,11 @@ def prepare_citations(
                         content_metadata=doc.metadata.get("content_metadata", {})
                     )
 
-            if content and document_type in ["image", "text", "table", "chart", "audio"]:
+            if (content or document_id) and document_type in ["image", "text", "table", "chart", "audio"]:
                 # Prepare citations basemodel
                 source_result = SourceResult(
-                    content=content,
+                    document_id=document_id,
+                    content="" if lazy_citations else content,
                     document_type=document_type,
                     document_name=file_name,
                     score=doc.metadata.get("relevance_score", 0),
@@ -439,6 +679,24 @@ def prepare_citations(
     )
 
 
+def _get_citation_thumbnail_id(doc: Document) -> Optional[str]:
+    """Get the unique thumbnail id of an image, table or chart document, or None for other documents."""
+    content_metadata = doc.metadata.get("content_metadata", {})
+    if content_metadata.get("type") not in ["image", "structured"]:
+        return None
+    source = doc.metadata.get("source")
+    try:
+        return get_unique_thumbnail_id(
+            collection_name=doc.metadata.get("collection_name"),
+            file_name=os.path.basename(source if isinstance(source, str) else source.get("source_id")),
+            page_number=content_metadata.get("page_number"),
+            location=content_metadata.get("location")
+        )
+    except Exception as e:
+        logger.debug("Unable to get the thumbnail id of a citation: %s", e)
+        return None
+
+
 def error_response_generator(exception_msg: str):
     """
     Generate a stream of data for the error response
@@ -493,7 +751,7 @@ async def retrieve_summary(
             )
 
             # First attempt to get existing summary
-            payload = get_minio_operator().get_payload(object_name=unique_thumbnail_id)
+            payload = await asyncio.to_thread(get_minio_operator().get_payload, object_name=unique_thumbnail_id)
 
             if payload:
                 return {
@@ -514,7 +772,7 @@ async def retrieve_summary(
             # If wait=True, poll for summary with timeout
             start_time = time.time()
             while time.time() - start_time < timeout:
-                payload = get_minio_operator().get_payload(object_name=unique_thumbnail_id)
+                payload = await asyncio.to_thread(get_minio_operator().get_payload, object_name=unique_thumbnail_id)
                 if payload:
                     return {
                         "message": "Summary retrieved successfully.",
@@ -542,6 +800,16 @@ async def retrieve_summary(
             }
 
 
+async def retrieve_citation_content(document_id: str) -> Optional[bytes]:
+    """Get the image bytes of an image, table or chart citation, or None if it is not found."""
+    # Only thumbnail ids are accepted so that other objects in the bucket can not be read
+    if "_::" not in document_id or document_id.startswith("summary_"):
+        return None
+    contents = await asyncio.to_thread(get_thumbnail_contents, [document_id])
+    content = contents.get(document_id, "")
+    return base64.b64decode(content) if content else None
+
+
 # Helper function to escape JSON-like structures in content
 def escape_json_content(content: str) -> str:
     """Escape curly braces in content to avoid JSON parsing issues"""
@@ -19,9 +19,11 @@ Endpoints:
 2. /generate: Generate a response using the RAG chain.
 3. /search: Search for the most relevant documents for the given search parameters.
 4. /chat/completions: Just an alias function to /generate endpoint which is openai compatible
+5. /citations/content: Get the image bytes of a citation returned with lazy citations.
 """
 
 import asyncio
+import hashlib
 import logging
 import os
 import time
@@ -31,12 +33,13 @@ from fastapi import FastAPI, Request
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from starlette.status import HTTP_422_UNPROCESSABLE_ENTITY
 from pydantic import BaseModel, Field, constr, validator, field_validator, model_validator
 
 from nvidia_rag.rag_server.main import NvidiaRAG
 from nvidia_rag.rag_server.response_generator import Message, ChainResponse, Citations
+from nvidia_rag.rag_server.response_generator import STREAM_FLUSH_INTERVAL_MS, STREAM_FLUSH_CHARS
 from nvidia_rag.utils.common import get_config
 from nvidia_rag.rag_server.health import check_all_services_health, print_health_report
 
@@ -44,6 +47,8 @@ logging.basicConfig(level=os.environ.get('LOGLEVEL', 'INFO').upper())
 logger = logging.getLogger(__name__)
 
 settings = get_config()
+# Seconds for which clients may reuse citation content without revalidating it
+CITATION_CONTENT_MAX_AGE = int(os.getenv("CITATION_CONTENT_MAX_AGE", 3600))
 model_params = settings.llm.get_model_parameters()
 default_max_tokens = model_params["max_tokens"]
 default_temperature = model_params["temperature"]
@@ -179,6 +184,11 @@ class Prompt(BaseModel):
         description="Enable or disable citations as part of response.",
         default=settings.enable_citations,
     )
+    lazy_citations: bool = Field(
+        description="Return the thumbnail id of image, table and chart citations as document_id instead of their "
+                    "content, which can be fetched from the /citations/content API.",
+        default=settings.lazy_citations,
+    )
     enable_vlm_inference: bool = Field(
         description="Enable or disable VLM inference.",
         default=settings.enable_vlm_inference,
@@ -244,6 +254,20 @@ class Prompt(BaseModel):
         max_length=4096,
         pattern=r'[\s\S]*',
     )
+    stream_flush_interval_ms: int = Field(
+        description="Merge response tokens arriving within this many milliseconds into one server-sent event. "
+                    "The first token is always sent immediately. 0 sends every token as its own event.",
+        default=STREAM_FLUSH_INTERVAL_MS,
+        ge=0,
+        le=10000,
+    )
+    stream_flush_chars: int = Field(
+        description="Send merged response tokens as soon as they reach this many characters. "
+                    "0 disables the size limit.",
+        default=STREAM_FLUSH_CHARS,
+        ge=0,
+        le=131072,
+    )
 
     # Validator to check chat message structure
     @model_validator(mode="after")
@@ -537,8 +561,8 @@ async def generate_answer(request: Request, prompt: Prompt) -> StreamingResponse
         # Convert messages to list of dicts
         messages_dict = [{'role': msg.role, 'content': msg.content} for msg in prompt.messages]
 
-        # Get the streaming generator from NVIDIA_RAG.generate
-        response_generator = NVIDIA_RAG.generate(
+        # Get the streaming generator from NVIDIA_RAG.agenerate
+        response_generator = await NVIDIA_RAG.agenerate(
             messages=messages_dict,
             use_knowledge_base=prompt.use_knowledge_base,
             temperature=prompt.temperature,
@@ -554,6 +578,7 @@ async def generate_answer(request: Request, prompt: Prompt) -> StreamingResponse
             enable_reranker=prompt.enable_reranker,
             enable_guardrails=prompt.enable_guardrails,
             enable_citations=prompt.enable_citations,
+            lazy_citations=prompt.lazy_citations,
             enable_vlm_inference=prompt.enable_vlm_inference,
             model=prompt.model,
             llm_endpoint=prompt.llm_endpoint,
@@ -564,6 +589,8 @@ async def generate_answer(request: Request, prompt: Prompt) -> StreamingResponse
             vlm_model=prompt.vlm_model,
             vlm_endpoint=prompt.vlm_endpoint,
             filter_expr=prompt.filter_expr,
+            stream_flush_interval_ms=prompt.stream_flush_interval_ms,
+            stream_flush_chars=prompt.stream_flush_chars,
         )
 
         # Wrap the generator with TTFT calculation and buffering fixes
@@ -642,7 +669,7 @@ async def document_search(request: Request, data: DocumentSearch) -> Dict[str, L
         metrics.update_api_requests(method=request.method, endpoint=request.url.path)
     try:
         messages_dict = [{'role': msg.role, 'content': msg.content} for msg in data.messages]
-        return NVIDIA_RAG.search(
+        return await NVIDIA_RAG.asearch(
             query=data.query,
             messages=messages_dict,
             reranker_top_k=data.reranker_top_k,
@@ -773,6 +800,87 @@ async def get_summary(
         )
 
 
+@app.get(
+    "/citations/content",
+    tags=["Retrieval APIs"],
+    response_class=Response,
+    responses={
+        200: {
+            "description": "Image bytes of the citation",
+            "content": {"image/png": {}, "image/jpeg": {}},
+        },
+        304: {"description": "Not Modified"},
+        404: {
+            "description": "Citation content not found",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "message": "Content for citation example_::_example.pdf_::_1_0.1_0.2_0.3_0.4 not found."
+                    }
+                }
+            },
+        },
+        500: {
+            "description": "Internal Server Error",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "message": "Error occurred while getting citation content.",
+                        "error": "Internal server error details"
+                    }
+                }
+            },
+        }
+    },
+)
+async def get_citation_content(request: Request, document_id: str) -> Response:
+    """
+    Get the image bytes of an image, table or chart citation returned with lazy citations.
+
+    The response can be cached by the client, and requests with a matching If-None-Match header
+    are answered with 304 Not Modified.
+
+    Args:
+        request (Request): FastAPI request object
+        document_id (str): document_id of the citation in the /generate response
+    """
+
+    if metrics:
+        metrics.update_api_requests(method=request.method, endpoint=request.url.path)
+    try:
+        content = await NVIDIA_RAG.get_citation_content(document_id=document_id)
+        if content is None:
+            return JSONResponse(content={"message": f"Content for citation {document_id} not found."}, status_code=404)
+
+        headers = {
+            "Cache-Control": f"private, max-age={CITATION_CONTENT_MAX_AGE}",
+            "ETag": f'"{hashlib.sha256(content).hexdigest()[:32]}"',
+        }
+        if headers["ETag"] in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+
+        if content.startswith(b"\xff\xd8"):
+            media_type = "image/jpeg"
+        elif content.startswith(b"\x89PNG"):
+            media_type = "image/png"
+        else:
+            media_type = "application/octet-stream"
+        return Response(content=content, media_type=media_type, headers=headers)
+
+    except asyncio.CancelledError as e:
+        logger.warning(f"Request cancelled while getting citation content. {str(e)}")
+        return JSONResponse(content={"message": "Request was cancelled by the client."}, status_code=499)
+    except Exception as e:
+        logger.error("Error from GET /citations/content endpoint. Error details: %s", e)
+        return JSONResponse(
+            content={
+                "message": "Error occurred while getting citation content.",
+                "error": str(e)
+            },
+            status_code=500
+        )
+
+
 async def optimized_streaming_wrapper(
         generator: Generator,
         start_time: float
@@ -781,7 +889,7 @@ async def optimized_streaming_wrapper(
     Optimized wrapper for streaming generator to calculate TTFT with minimal buffering.
     
     Args:
-        generator: The streaming generator from NVIDIA_RAG.generate()
+        generator: The streaming generator from NVIDIA_RAG.agenerate()
         start_time: The timestamp when the request started
         
     Yields:
@@ -789,15 +897,21 @@ async def optimized_streaming_wrapper(
     """
     token_count = 0
     
-    async for chunk in generator:
-        current_time = time.time()
-        token_count += 1
-        
-        if token_count == 1:
-            ttft = (current_time - start_time) * 1000  # Convert to milliseconds
-            logger.info("    == RAG Time to First Token (TTFT): %.2f ms ==", ttft)
-            
-        # Yield the chunk immediately without additional processing
-        yield chunk
-
-        await asyncio.sleep(0)  # Allow event loop to process
+    try:
+        async for chunk in generator:
+            current_time = time.time()
+            token_count += 1
+
+            if token_count == 1:
+                ttft = (current_time - start_time) * 1000  # Convert to milliseconds
+                logger.info("    == RAG Time to First Token (TTFT): %.2f ms ==", ttft)
+
+            # Yield the chunk immediately without additional processing
+            yield chunk
+
+            await asyncio.sleep(0)  # Allow event loop to process
+    finally:
+        # Release the stream, also a coalesced one shared with other requests, when the client goes away
+        aclose = getattr(generator, "aclose", None)
+        if aclose is not None:
+            await aclose()
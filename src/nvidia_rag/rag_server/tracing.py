@@ -37,6 +37,8 @@ from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 from fastapi import FastAPI
 import logging
 
+from nvidia_rag.utils.common import register_otel_metrics
+
 logger = logging.getLogger(__name__)
 
 def _fastapi_server_request_hook(span: Span, scope: dict[str, Any]):
@@ -74,6 +76,7 @@ def instrument(app: FastAPI, settings):
         )
         metrics.set_meter_provider(provider)
         otel_metrics = OtelMetrics(service_name="rag")
+        register_otel_metrics(otel_metrics)
 
         # Oberservability Tracing
         trace.set_tracer_provider(TracerProvider(resource=resource))
@@ -19,7 +19,8 @@ This module defines the VLM (Vision-Language Model) utilities for NVIDIA RAG pip
 Main functionalities:
 - Analyze up to 4 images using a VLM given a user question.
 - Merge and resize images for VLM input.
-- Extract and process images from document context (e.g., MinIO storage).
+- Extract images from document context (e.g., MinIO storage), passing PNG and JPEG images within the size
+  limits through untouched and downscaling larger ones in a worker pool.
 - Use an LLM to reason about the VLM's response and decide if it should be used.
 
 Intended for use in NVIDIA's Retrieval-Augmented Generation (RAG) systems, compatible with LangChain and OpenAI-compatible VLM APIs.
@@ -31,9 +32,11 @@ Class:
 import base64
 import io
 import json
+import math
 import os
+from concurrent.futures import Future, ThreadPoolExecutor
 from logging import getLogger
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Union
 
 import requests
 import yaml
@@ -45,10 +48,20 @@ from PIL import Image as PILImage
 
 from nvidia_rag.utils.common import get_config
 from nvidia_rag.utils.llm import get_llm, get_prompts
-from nvidia_rag.utils.minio_operator import get_minio_operator, get_unique_thumbnail_id
+from nvidia_rag.utils.minio_operator import get_thumbnail_contents, get_unique_thumbnail_id
 
 logger = getLogger(__name__)
 
+# The VLM is sent at most this many images per request
+VLM_MAX_IMAGES = 4
+# Images above these limits are downscaled to VLM_IMAGE_MAX_PIXELS and re-encoded as PNG before being sent to the VLM
+VLM_IMAGE_MAX_PIXELS = int(os.getenv("VLM_IMAGE_MAX_PIXELS", 1024 * 1024))
+VLM_IMAGE_MAX_BYTES = int(os.getenv("VLM_IMAGE_MAX_BYTES", 4 * 1024 * 1024))
+VLM_IMAGE_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("VLM_IMAGE_THREAD_POOL_SIZE", 4)),
+    thread_name_prefix="vlm-image"
+)
+
 
 class VLM:
     """
@@ -60,8 +73,12 @@ class VLM:
         Analyze up to 4 images with a VLM given a question.
     _resize_and_merge_images(image_objects, target_height=400):
         Resize and merge images horizontally, returning a base64-encoded PNG.
+    get_thumbnail_ids(docs):
+        Get the unique thumbnail ids of the images cited in the document context.
     analyze_images_from_context(docs, question):
         Extracts images from document context and analyzes them with the VLM.
+    _prepare_images(image_b64_list):
+        Pass images within the size limits through and downscale the others in a worker pool.
     reason_on_vlm_response(question, vlm_response, docs, llm_settings):
         Uses an LLM to reason about the VLM's response and decide if it should be used.
     """
@@ -96,7 +113,7 @@ class VLM:
         Parameters
         ----------
         image_b64_list : List[str]
-            List of base64-encoded PNG images (max 4).
+            List of base64-encoded PNG or JPEG images (max 4).
         question : str
             The question to ask the VLM about the images.
 
@@ -117,16 +134,18 @@ class VLM:
         formatted_prompt = self.vlm_template.format(question=question)
         message = HumanMessage(content=[{"type": "text", "text": formatted_prompt}])
 
-        if len(image_b64_list) > 4:
-            image_b64_list = image_b64_list[:4]
+        if len(image_b64_list) > VLM_MAX_IMAGES:
+            image_b64_list = image_b64_list[:VLM_MAX_IMAGES]
             logger.warning(
                 "VLM can only handle up to 4 images at a time. Only the first 4 images will be used."
             )
         for image_b64 in image_b64_list:
+            # Base64-encoded JPEG images start with the encoded FF D8 FF marker
+            mime_type = "image/jpeg" if image_b64.startswith("/9j/") else "image/png"
             message.content.append(
                 {
                     "type": "image_url",
-                    "image_url": {"url": f"data:image/png;base64,{image_b64}"},
+                    "image_url": {"url": f"data:{mime_type};base64,{image_b64}"},
                 }
             )
         try:
@@ -176,6 +195,43 @@ class VLM:
             merged_image_bytes = buffer.getvalue()
             return base64.b64encode(merged_image_bytes).decode()
 
+    def get_thumbnail_ids(self, docs: List[dict]) -> List[str]:
+        """
+        Get the unique thumbnail ids of the images cited in the document context.
+
+        Parameters
+        ----------
+        docs : List[dict]
+            List of document objects with metadata containing image info.
+
+        Returns
+        -------
+        List[str]
+            Unique thumbnail ids of the image and structured documents, in document order.
+        """
+        unique_thumbnail_ids = []
+        for doc in docs:
+            try:
+                content_metadata = doc.metadata.get("content_metadata", {})
+                doc_type = content_metadata.get("type")
+                if doc_type in ["image", "structured"]:
+                    file_name = os.path.basename(
+                        doc.metadata.get("source", {}).get("source_id", "")
+                    )
+                    page_number = content_metadata.get("page_number")
+                    location = content_metadata.get("location")
+
+                    unique_thumbnail_ids.append(get_unique_thumbnail_id(
+                        collection_name=doc.metadata.get("collection_name"),
+                        file_name=file_name,
+                        page_number=page_number,
+                        location=location,
+                    ))
+            except Exception as e:
+                logger.warning(f"Failed to process document for image extraction: {e}", exc_info=True)
+                continue
+        return unique_thumbnail_ids
+
     def analyze_images_from_context(
         self, docs: List[dict], question: str
     ) -> str:
@@ -199,53 +255,89 @@ class VLM:
         ValueError
             If collection_name is not provided.
         """
-        image_objects = []
-
         if not docs:
             logger.warning("No documents provided for image context analysis.")
             return ""
 
-        for doc in docs:
-            try:
-                content_metadata = doc.metadata.get("content_metadata", {})
-                doc_type = content_metadata.get("type")
-                if doc_type in ["image", "structured"]:
-                    file_name = os.path.basename(
-                        doc.metadata.get("source", {}).get("source_id", "")
-                    )
-                    page_number = content_metadata.get("page_number")
-                    location = content_metadata.get("location")
+        unique_thumbnail_ids = self.get_thumbnail_ids(docs)
 
-                    unique_thumbnail_id = get_unique_thumbnail_id(
-                        collection_name=doc.metadata.get("collection_name"),
-                        file_name=file_name,
-                        page_number=page_number,
-                        location=location,
-                    )
+        # Thumbnails already shown as citations are usually served from the thumbnail cache, the rest are fetched concurrently
+        thumbnail_contents = get_thumbnail_contents(unique_thumbnail_ids)
+        image_b64_list = self._prepare_images(
+            [thumbnail_contents.get(unique_thumbnail_id, "") for unique_thumbnail_id in unique_thumbnail_ids]
+        )
 
-                    payload = get_minio_operator().get_payload(
-                        object_name=unique_thumbnail_id
-                    )
-                    content = payload.get("content", "")
-                    image_bytes = base64.b64decode(content)
-                    img = PILImage.open(io.BytesIO(image_bytes)).convert("RGB")
-                    image_objects.append(img)
+        if not image_b64_list:
+            logger.warning("No valid images extracted from document context.")
+            return ""
+
+        return self.analyze_image(image_b64_list=image_b64_list, question=question)
+
+    def _prepare_images(self, image_b64_list: List[str]) -> List[str]:
+        """
+        Prepare up to 4 images for the VLM.
+
+        Only the image headers are parsed here. PNG and JPEG images within VLM_IMAGE_MAX_PIXELS and
+        VLM_IMAGE_MAX_BYTES are passed through as the original base64 string, without decoding their
+        pixels. Other images are converted, downscaled and re-encoded as PNG in the VLM image pool.
+
+        Parameters
+        ----------
+        image_b64_list : List[str]
+            List of base64-encoded images, in order of relevance.
+
+        Returns
+        -------
+        List[str]
+            List of base64-encoded PNG or JPEG images, skipping the ones which could not be read.
+        """
+        prepared: List[Union[str, Future]] = []
+        for image_b64 in image_b64_list:
+            if len(prepared) >= VLM_MAX_IMAGES:
+                break
+            try:
+                image_bytes = base64.b64decode(image_b64)
+                with PILImage.open(io.BytesIO(image_bytes)) as img:
+                    image_format, (width, height) = img.format, img.size
             except Exception as e:
                 logger.warning(f"Failed to process document for image extraction: {e}", exc_info=True)
                 continue
 
-        if not image_objects:
-            logger.warning("No valid images extracted from document context.")
-            return ""
+            if image_format in ("PNG", "JPEG") and width * height <= VLM_IMAGE_MAX_PIXELS and len(image_bytes) <= VLM_IMAGE_MAX_BYTES:
+                prepared.append(image_b64)
+            else:
+                prepared.append(VLM_IMAGE_EXECUTOR.submit(self._downscale_image, image_bytes))
 
         image_b64_list = []
-        for img in image_objects:
-            with io.BytesIO() as buffer:
-                img.save(buffer, format="PNG")
-                image_b64 = base64.b64encode(buffer.getvalue()).decode("utf-8")
-                image_b64_list.append(image_b64)
+        for image in prepared:
+            if isinstance(image, str):
+                image_b64_list.append(image)
+                continue
+            try:
+                image_b64_list.append(image.result())
+            except Exception as e:
+                logger.warning(f"Failed to downscale image for VLM analysis: {e}", exc_info=True)
+        return image_b64_list
 
-        return self.analyze_image(image_b64_list=image_b64_list, question=question)
+    @staticmethod
+    def _downscale_image(image_bytes: bytes) -> str:
+        """
+        Convert an image to RGB, shrink it to fit VLM_IMAGE_MAX_PIXELS and return it as base64 PNG.
+
+        JPEG images are decoded directly at a reduced scale when they are much larger than the budget.
+        """
+        with PILImage.open(io.BytesIO(image_bytes)) as img:
+            scale = min(1.0, math.sqrt(VLM_IMAGE_MAX_PIXELS / max(1, img.width * img.height)))
+            target_size = (max(1, int(img.width * scale)), max(1, int(img.height * scale)))
+            if img.format == "JPEG":
+                img.draft("RGB", target_size)
+            img = img.convert("RGB")
+        if img.size != target_size and scale < 1.0:
+            img = img.resize(target_size, PILImage.LANCZOS)
+
+        with io.BytesIO() as buffer:
+            img.save(buffer, format="PNG")
+            return base64.b64encode(buffer.getvalue()).decode("utf-8")
 
     def reason_on_vlm_response(
         self,
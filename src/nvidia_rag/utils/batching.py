@@ -0,0 +1,111 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Micro-batching of concurrent model requests.
+1. MicroBatcher: Coalesces concurrent single-item requests into batched calls and fans the results back.
+"""
+
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Tuple
+
+from nvidia_rag.utils.common import get_otel_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-item requests into batched calls and fans the results back.
+
+    Items submitted from any thread are collected until either `max_batch_size` items are pending or
+    `max_wait_ms` has passed since the first one arrived. The batch is then handed to `process_batch`,
+    which must return one result per item, in a pool of `max_concurrent_batches` threads. Each caller
+    gets a concurrent.futures.Future, which async callers can await through asyncio.wrap_future.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        process_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        max_concurrent_batches: int = 4
+    ):
+        self.name = name
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: "queue.SimpleQueue[Tuple[Any, Future]]" = queue.SimpleQueue()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_batches, thread_name_prefix=f"{name}-batch")
+        self._collector = None
+        self._lock = threading.Lock()
+
+    def submit(self, item: Any) -> Future:
+        """Queue an item for the next batch and return the future of its result."""
+        future = Future()
+        self._ensure_collector()
+        self._queue.put((item, future))
+        return future
+
+    def _ensure_collector(self) -> None:
+        """Start the collector thread on first use."""
+        if self._collector is not None:
+            return
+        with self._lock:
+            if self._collector is None:
+                self._collector = threading.Thread(target=self._collect, name=f"{self.name}-collector", daemon=True)
+                self._collector.start()
+
+    def _collect(self) -> None:
+        """Group queued items into batches and dispatch them to the batch pool."""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._executor.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: List[Tuple[Any, Future]]) -> None:
+        """Process a batch and set the result or exception of each future."""
+        # Skip items whose callers have given up waiting
+        batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        metrics = get_otel_metrics()
+        if metrics:
+            metrics.update_batch_size(batcher=self.name, size=len(batch))
+        logger.debug("Processing %s batch of %d items", self.name, len(batch))
+
+        try:
+            results = self.process_batch([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Expected {len(batch)} results from {self.name} batch, got {len(results)}")
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
@@ -0,0 +1,343 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Caching utilities shared by the RAG server components.
+1. TTLCache: Thread-safe in-process LRU cache with per-entry expiry and hit/miss accounting.
+2. ByteBudgetCache: TTLCache bounded by the total size of its values in bytes.
+3. LocalCacheBackend: In-process stand-in for a shared key-value cache backend.
+4. RedisCacheBackend: Redis compatible shared key-value cache backend.
+5. get_shared_cache_backend: Get the shared cache backend configured for this process.
+6. make_cache_key: Build a compact cache key from a list of parts.
+7. get_collection_version: Get the version of a collection used to invalidate cached results.
+8. bump_collection_version: Bump the version of a collection after documents are added or deleted.
+"""
+
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+from nvidia_rag.utils.common import get_otel_metrics
+
+logger = logging.getLogger(__name__)
+
+# Shared cache backend configuration, one of "" (disabled), "local" or "redis"
+CACHE_SHARED_BACKEND = os.getenv("CACHE_SHARED_BACKEND", "").lower()
+
+_MISSING = object()
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Build a compact, stable cache key by hashing the string form of the given parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class TTLCache:
+    """Thread-safe LRU cache where every entry also expires after `ttl` seconds.
+
+    Lookups are reported to the OpenTelemetry metrics under the cache `name` when tracing is enabled.
+    A `ttl` of 0 disables expiry.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 3600):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value from the cache, or the default if the key is missing or expired."""
+        with self._lock:
+            value = self._get_locked(key)
+            hit = value is not _MISSING
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        self._record_lookup(hit)
+        return value if hit else default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Add or replace a value in the cache, evicting the least recently used entries if full."""
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._remove_locked(next(iter(self._data)))
+
+    def delete(self, key: Hashable) -> None:
+        """Remove a key from the cache if present."""
+        with self._lock:
+            self._remove_locked(key)
+
+    def delete_matching(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Remove all entries for which predicate(key, value) is true and return how many were removed."""
+        with self._lock:
+            keys = [key for key, (value, _) in self._data.items() if predicate(key, value)]
+            for key in keys:
+                self._remove_locked(key)
+        return len(keys)
+
+    def items(self) -> Iterable[tuple]:
+        """Return a snapshot of the unexpired (key, value) pairs, least recently used first."""
+        now = time.monotonic()
+        with self._lock:
+            return [(key, value) for key, (value, expires_at) in self._data.items()
+                    if expires_at is None or expires_at > now]
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _get_locked(self, key: Hashable) -> Any:
+        """Get a value while holding the lock, dropping it if it has expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._remove_locked(key)
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def _remove_locked(self, key: Hashable) -> None:
+        """Remove a key while holding the lock."""
+        self._data.pop(key, None)
+
+    def _record_lookup(self, hit: bool) -> None:
+        """Report the lookup result to the metrics if tracing is enabled."""
+        metrics = get_otel_metrics()
+        if metrics:
+            metrics.update_cache_lookup(cache_name=self.name, hit=hit)
+
+
+class ByteBudgetCache(TTLCache):
+    """TTLCache bounded by the total size of its values in bytes instead of the number of entries.
+
+    The size of a value is given by `sizeof`. Values larger than the whole budget are not cached.
+    The hit ratio and resident bytes are reported to the OpenTelemetry metrics when tracing is enabled.
+    """
+
+    def __init__(self, name: str, maxbytes: int, ttl: float = 3600, sizeof: Callable[[Any], int] = len):
+        super().__init__(name=name, maxsize=maxbytes, ttl=ttl)
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self._sizes = {}
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Add or replace a value in the cache, evicting the least recently used entries over the byte budget."""
+        size = self.sizeof(value)
+        if size > self.maxbytes:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._remove_locked(key)
+            self._data[key] = (value, expires_at)
+            self._sizes[key] = size
+            self.nbytes += size
+            while self.nbytes > self.maxbytes:
+                self._remove_locked(next(iter(self._data)))
+        self._record_size()
+
+    def delete(self, key: Hashable) -> None:
+        super().delete(key)
+        self._record_size()
+
+    def delete_matching(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        removed = super().delete_matching(predicate)
+        self._record_size()
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+        self._record_size()
+
+    def _remove_locked(self, key: Hashable) -> None:
+        if self._data.pop(key, None) is not None:
+            self.nbytes -= self._sizes.pop(key, 0)
+
+    def _record_lookup(self, hit: bool) -> None:
+        super()._record_lookup(hit)
+        metrics = get_otel_metrics()
+        if metrics:
+            metrics.update_cache_stats(cache_name=self.name, hit_ratio=self.hits / max(1, self.hits + self.misses))
+
+    def _record_size(self) -> None:
+        """Report the resident bytes to the metrics if tracing is enabled."""
+        metrics = get_otel_metrics()
+        if metrics:
+            metrics.update_cache_stats(cache_name=self.name, resident_bytes=self.nbytes)
+
+
+class LocalCacheBackend:
+    """In-process stand-in for the shared cache backend.
+
+    It exposes the same interface as RedisCacheBackend so that single worker deployments and tests
+    can exercise the shared cache code path without running redis.
+    """
+
+    def __init__(self, maxsize: int = 65536):
+        self._cache = TTLCache(name="shared_local", maxsize=maxsize, ttl=0)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Get the raw bytes stored for a key."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._cache.delete(key)
+            return None
+        return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Store raw bytes for a key with an optional ttl in seconds."""
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._cache.set(key, (value, expires_at))
+
+    def incr(self, key: str) -> int:
+        """Atomically increment an integer counter stored at key and return the new value."""
+        with self._cache._lock:
+            entry = self._cache._get_locked(key)
+            value = int(entry[0]) + 1 if entry is not _MISSING else 1
+            self._cache._data[key] = ((str(value).encode("utf-8"), None), None)
+        return value
+
+    def delete(self, key: str) -> None:
+        """Remove a key."""
+        self._cache.delete(key)
+
+
+class RedisCacheBackend:
+    """Shared cache backend using any redis protocol compatible server.
+
+    Errors from the server are logged and treated as cache misses so that an unavailable cache never
+    fails a request.
+    """
+
+    def __init__(self, host: str, port: int, db: int = 0, namespace: str = "nvidia_rag"):
+        from redis import Redis
+
+        self.namespace = namespace
+        self._client = Redis(host=host, port=port, db=db, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Get the raw bytes stored for a key."""
+        try:
+            return self._client.get(self._key(key))
+        except Exception as e:
+            logger.warning("Failed to read from shared cache backend: %s", e)
+            return None
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Store raw bytes for a key with an optional ttl in seconds."""
+        try:
+            if ttl:
+                self._client.set(self._key(key), value, px=int(ttl * 1000))
+            else:
+                self._client.set(self._key(key), value)
+        except Exception as e:
+            logger.warning("Failed to write to shared cache backend: %s", e)
+
+    def incr(self, key: str) -> int:
+        """Atomically increment an integer counter stored at key and return the new value."""
+        try:
+            return int(self._client.incr(self._key(key)))
+        except Exception as e:
+            logger.warning("Failed to increment counter in shared cache backend: %s", e)
+            return 0
+
+    def delete(self, key: str) -> None:
+        """Remove a key."""
+        try:
+            self._client.delete(self._key(key))
+        except Exception as e:
+            logger.warning("Failed to delete from shared cache backend: %s", e)
+
+
+@lru_cache
+def get_shared_cache_backend() -> Optional["LocalCacheBackend | RedisCacheBackend"]:
+    """Get the shared cache backend configured through CACHE_SHARED_BACKEND, or None if disabled."""
+    if CACHE_SHARED_BACKEND == "redis":
+        host = os.getenv("REDIS_HOST", "localhost")
+        port = int(os.getenv("REDIS_PORT", 6379))
+        db = int(os.getenv("REDIS_DB", 0))
+        logger.info("Using redis shared cache backend at %s:%s, db %s", host, port, db)
+        return RedisCacheBackend(host=host, port=port, db=db)
+    if CACHE_SHARED_BACKEND == "local":
+        logger.info("Using in-process shared cache backend")
+        return LocalCacheBackend()
+    return None
+
+
+# Collection versions used when no shared cache backend is configured
+_LOCAL_COLLECTION_VERSIONS = {}
+_LOCAL_COLLECTION_VERSIONS_LOCK = threading.Lock()
+
+
+def _collection_version_key(collection_name: str) -> str:
+    return f"collection_version:{collection_name}"
+
+
+def get_collection_version(collection_name: str) -> int:
+    """Get the version of a collection.
+
+    Cached results embed the versions of the collections they were computed from, so bumping the
+    version of a collection invalidates every cached result derived from it. With a shared cache
+    backend the versions are shared between the ingestor server and the rag server processes.
+    """
+    backend = get_shared_cache_backend()
+    if backend is not None:
+        value = backend.get(_collection_version_key(collection_name))
+        return int(value) if value else 0
+    with _LOCAL_COLLECTION_VERSIONS_LOCK:
+        return _LOCAL_COLLECTION_VERSIONS.get(collection_name, 0)
+
+
+def bump_collection_version(collection_name: str) -> int:
+    """Bump the version of a collection after documents are added to or deleted from it."""
+    backend = get_shared_cache_backend()
+    if backend is not None:
+        version = backend.incr(_collection_version_key(collection_name))
+    else:
+        with _LOCAL_COLLECTION_VERSIONS_LOCK:
+            version = _LOCAL_COLLECTION_VERSIONS.get(collection_name, 0) + 1
+            _LOCAL_COLLECTION_VERSIONS[collection_name] = version
+    logger.debug("Bumped version of collection %s to %s", collection_name, version)
+    return version
@@ -18,6 +18,8 @@
 3. get_config: Parse the application configuration.
 4. combine_dicts: Combines two dictionaries recursively, prioritizing values from dict_b.
 5. sanitize_nim_url: Sanitize the NIM URL by adding http(s):// if missing and checking if the URL is hosted on NVIDIA's known endpoints.
+6. register_otel_metrics: Register the OpenTelemetry metrics object used by library components.
+7. get_otel_metrics: Get the registered OpenTelemetry metrics object, if tracing is enabled.
 """
 
 import logging
@@ -78,6 +80,18 @@ def utils_cache(func: Callable) -> Callable:
 
     return wrapper
 
+# OpenTelemetry metrics registered by the server when tracing is enabled
+_OTEL_METRICS = None
+
+def register_otel_metrics(metrics: Any) -> None:
+    """Register the OtelMetrics object so that library components can report metrics."""
+    global _OTEL_METRICS
+    _OTEL_METRICS = metrics
+
+def get_otel_metrics() -> Any:
+    """Get the registered OtelMetrics object. Returns None when tracing is disabled."""
+    return _OTEL_METRICS
+
 # @lru_cache
 def get_config() -> "ConfigWizard":
     """Parse the application configuration."""
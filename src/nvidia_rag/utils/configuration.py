@@ -374,7 +374,7 @@ class RankingConfig(ConfigWizard):
     model_engine: str = configfield(
         "model_engine",
         default="nvidia-ai-endpoints",
-        help_txt="The server type of the hosted model. Allowed values are nvidia-ai-endpoints",
+        help_txt="The server type of the hosted model. Allowed values are nvidia-ai-endpoints and huggingface, which runs a cross-encoder on CPU in-process",
     )
     server_url: str = configfield(
         "server_url",
@@ -594,6 +594,12 @@ class AppConfig(ConfigWizard):
         default=True,
         help_txt="Enable citations",
     )
+    lazy_citations: bool = configfield(
+        "lazy_citations",
+        env_name="LAZY_CITATIONS",
+        default=False,
+        help_txt="Return thumbnail ids instead of thumbnail content in citations",
+    )
     enable_vlm_inference: bool = configfield(
         "enable_vlm_inference",
         env_name="ENABLE_VLM_INFERENCE",
@@ -15,25 +15,184 @@
 
 """The wrapper for interacting with embedding models.
 1. get_embedding_model: Get the embedding model. Uses the NVIDIA AI Endpoints or HuggingFace.
+2. CachedQueryEmbeddings: Embeddings wrapper which caches query embeddings.
+3. BatchedQueryEmbeddings: Embeddings wrapper which coalesces concurrent query embeddings into batched calls.
 """
 
+import os
+import asyncio
 import logging
+import unicodedata
 from functools import lru_cache
+from typing import List, Optional
+
+import numpy as np
 from langchain_nvidia_ai_endpoints import NVIDIAEmbeddings
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_core.embeddings import Embeddings
 
 from nvidia_rag.utils.common import get_config, sanitize_nim_url
+from nvidia_rag.utils.cache import TTLCache, get_shared_cache_backend, make_cache_key
+from nvidia_rag.utils.batching import MicroBatcher
 
 logger = logging.getLogger(__name__)
 
+# Query embedding cache configuration
+ENABLE_QUERY_EMBEDDING_CACHE = os.getenv("ENABLE_QUERY_EMBEDDING_CACHE", "True").lower() in ["true", "True"]
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", 4096))
+QUERY_EMBEDDING_CACHE_TTL = float(os.getenv("QUERY_EMBEDDING_CACHE_TTL", 3600))
+
+# Query embedding micro-batching configuration, disabled by default
+ENABLE_QUERY_EMBEDDING_BATCHING = os.getenv("ENABLE_QUERY_EMBEDDING_BATCHING", "False").lower() in ["true", "True"]
+QUERY_EMBEDDING_BATCH_SIZE = int(os.getenv("QUERY_EMBEDDING_BATCH_SIZE", 32))
+QUERY_EMBEDDING_BATCH_MAX_WAIT_MS = float(os.getenv("QUERY_EMBEDDING_BATCH_MAX_WAIT_MS", 5))
+QUERY_EMBEDDING_BATCH_CONCURRENCY = int(os.getenv("QUERY_EMBEDDING_BATCH_CONCURRENCY", 4))
+
 try:
     import torch
 except Exception:
     logger.warning("Optional module torch not installed.")
 
+class CachedQueryEmbeddings(Embeddings):
+    """Embeddings wrapper which caches query embeddings in front of the embedding model.
+
+    Query vectors are cached in-process as float32 arrays in an LRU cache with ttl, keyed by
+    (model, endpoint, normalized query text). When a shared cache backend is configured, vectors are
+    also read from and written to it so that multiple workers share cache hits.
+    Document embeddings are passed through to the wrapped model untouched.
+    """
+
+    def __init__(self, embedder: Embeddings, model: str, url: str,
+                 maxsize: int = 4096, ttl: float = 3600):
+        self.embedder = embedder
+        self.model = model
+        self.url = url
+        self.ttl = ttl
+        self._cache = TTLCache(name="query_embedding", maxsize=maxsize, ttl=ttl)
+        self._shared_backend = get_shared_cache_backend()
+
+    def __getattr__(self, name: str):
+        # Expose attributes of the wrapped embedding model, e.g. base_url
+        embedder = self.__dict__.get("embedder")
+        if embedder is None:
+            raise AttributeError(name)
+        return getattr(embedder, name)
+
+    def _cache_key(self, text: str) -> str:
+        """Cache key for a query based on the model, endpoint and normalized query text."""
+        normalized_text = " ".join(unicodedata.normalize("NFC", text).split())
+        return make_cache_key("query_embedding", self.model, self.url, normalized_text)
+
+    def _lookup(self, key: str) -> Optional[np.ndarray]:
+        """Look up a vector in the local cache followed by the shared backend."""
+        vector = self._cache.get(key)
+        if vector is None and self._shared_backend is not None:
+            raw_vector = self._shared_backend.get(key)
+            if raw_vector:
+                vector = np.frombuffer(raw_vector, dtype=np.float32)
+                self._cache.set(key, vector)
+        return vector
+
+    def _store(self, key: str, embedding: List[float]) -> np.ndarray:
+        """Store a vector as a float32 array in the local cache and the shared backend."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        self._cache.set(key, vector)
+        if self._shared_backend is not None:
+            self._shared_backend.set(key, vector.tobytes(), ttl=self.ttl)
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embedder.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embedder.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._cache_key(text)
+        vector = self._lookup(key)
+        if vector is None:
+            vector = self._store(key, self.embedder.embed_query(text))
+        return vector.tolist()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = self._cache_key(text)
+        vector = self._lookup(key)
+        if vector is None:
+            vector = self._store(key, await self.embedder.aembed_query(text))
+        return vector.tolist()
+
+
+class BatchedQueryEmbeddings(Embeddings):
+    """Embeddings wrapper which coalesces concurrent embed_query calls into batched model calls.
+
+    Queries from concurrent requests are collected for at most `max_wait_ms` or until `max_batch_size`
+    queries are pending, and embedded with a single request to the model. Identical queries in a batch
+    are embedded once. Document embeddings are passed through to the wrapped model untouched.
+    """
+
+    def __init__(self, embedder: Embeddings, max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0, max_concurrent_batches: int = 4):
+        self.embedder = embedder
+        self._batcher = MicroBatcher(
+            name="query_embedding",
+            process_batch=self._embed_queries,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            max_concurrent_batches=max_concurrent_batches
+        )
+
+    def __getattr__(self, name: str):
+        # Expose attributes of the wrapped embedding model, e.g. base_url
+        embedder = self.__dict__.get("embedder")
+        if embedder is None:
+            raise AttributeError(name)
+        return getattr(embedder, name)
+
+    def _embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of queries with a single model call."""
+        unique_texts = list(dict.fromkeys(texts))
+        if isinstance(self.embedder, NVIDIAEmbeddings):
+            # embed_documents would embed the texts as passages, asymmetric models need the query type
+            embeddings = self.embedder._embed(unique_texts, model_type="query")
+        elif isinstance(self.embedder, HuggingFaceEmbeddings):
+            embeddings = self.embedder.embed_documents(unique_texts)
+        else:
+            embeddings = [self.embedder.embed_query(text) for text in unique_texts]
+        embeddings_by_text = dict(zip(unique_texts, embeddings))
+        return [embeddings_by_text[text] for text in texts]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embedder.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embedder.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._batcher.submit(text).result()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await asyncio.wrap_future(self._batcher.submit(text))
+
+
 @lru_cache
 def get_embedding_model(model: str, url: str) -> Embeddings:
+    """Create the embedding model, wrapped with the query embedding batcher and cache if enabled."""
+    embedder = _get_embedding_model(model, url)
+    if ENABLE_QUERY_EMBEDDING_BATCHING:
+        logger.info("Query embedding batching enabled with batch size %s and max wait %s ms",
+                    QUERY_EMBEDDING_BATCH_SIZE, QUERY_EMBEDDING_BATCH_MAX_WAIT_MS)
+        embedder = BatchedQueryEmbeddings(embedder, max_batch_size=QUERY_EMBEDDING_BATCH_SIZE,
+                                          max_wait_ms=QUERY_EMBEDDING_BATCH_MAX_WAIT_MS,
+                                          max_concurrent_batches=QUERY_EMBEDDING_BATCH_CONCURRENCY)
+    if ENABLE_QUERY_EMBEDDING_CACHE:
+        logger.info("Query embedding cache enabled with size %s and ttl %s seconds",
+                    QUERY_EMBEDDING_CACHE_SIZE, QUERY_EMBEDDING_CACHE_TTL)
+        return CachedQueryEmbeddings(embedder, model=model, url=url,
+                                     maxsize=QUERY_EMBEDDING_CACHE_SIZE, ttl=QUERY_EMBEDDING_CACHE_TTL)
+    return embedder
+
+
+def _get_embedding_model(model: str, url: str) -> Embeddings:
     """Create the embedding model."""
     model_kwargs = {"device": "cpu"}
     if torch.cuda.is_available():
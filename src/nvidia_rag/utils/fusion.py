@@ -0,0 +1,121 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Fusion of the documents retrieved from multiple collections.
+1. fuse_results: Merge per-collection result lists into one ranked list.
+2. merge_candidates: Prune and merge the candidates of all collections for reranking.
+"""
+
+import os
+import logging
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+from nvidia_rag.utils.common import get_config
+from nvidia_rag.utils.pruning import prune_candidate_lists
+
+logger = logging.getLogger(__name__)
+
+CONFIG = get_config()
+
+# Fusion of the results of multiple collections, either "rrf" (reciprocal rank fusion) or "score" (normalized distances)
+RETRIEVAL_FUSION_METHOD = os.getenv("RETRIEVAL_FUSION_METHOD", "rrf").lower()
+RETRIEVAL_FUSION_RRF_K = int(os.getenv("RETRIEVAL_FUSION_RRF_K", 60))
+# Number of fused candidates from multiple collections passed to the reranker, 0 reranks all candidates
+RERANKER_MAX_FUSED_CANDIDATES = int(os.getenv("RERANKER_MAX_FUSED_CANDIDATES", 0))
+
+
+def fuse_results(
+    result_lists: List[List[Document]],
+    top_k: Optional[int] = None,
+    method: str = RETRIEVAL_FUSION_METHOD,
+    rrf_k: int = RETRIEVAL_FUSION_RRF_K,
+    search_type: str = CONFIG.vector_store.search_type
+) -> List[Document]:
+    """Merge the ranked result lists of several collections into one list of at most top_k documents.
+
+    With "rrf", a document scores 1 / (rrf_k + rank) in each list containing it and the scores are summed.
+    With "score", the milvus distances of each list are min-max normalized to 0-1, higher being more
+    relevant, and a document keeps its best score. Dense search distances are L2 distances, lower being
+    more relevant, while hybrid search returns ranker scores, higher being more relevant. Lists whose
+    documents have no distance are normalized by rank. Documents with the same content in several lists are returned once, and the fused score is stored
+    as their relevance_score.
+    """
+    result_lists = [results for results in result_lists if results]
+    if not result_lists:
+        return []
+    if len(result_lists) == 1:
+        return result_lists[0][:top_k]
+    if method not in ("rrf", "score"):
+        raise ValueError(f"Unsupported retrieval fusion method: {method}. Use 'rrf' or 'score'.")
+
+    docs = [doc for results in result_lists for doc in results]
+    lengths = np.array([len(results) for results in result_lists])
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    list_ids = np.repeat(np.arange(len(result_lists)), lengths)
+    ranks = np.arange(len(docs)) - starts[list_ids]
+
+    if method == "rrf":
+        scores = 1.0 / (rrf_k + ranks + 1)
+    else:
+        distances = np.array([doc.metadata.get("distance") for doc in docs], dtype=np.float64)
+        if search_type != "dense":
+            # Hybrid search ranker scores are higher for more relevant documents
+            distances = -distances
+        # Lower milvus L2 distances are more relevant, fall back to the rank in lists without distances
+        has_distance = ~np.isnan(distances)
+        lists_with_distance = np.logical_and.reduceat(has_distance, starts)
+        distances = np.where(lists_with_distance[list_ids], distances, ranks)
+        lowest = np.minimum.reduceat(distances, starts)[list_ids]
+        spread = np.maximum.reduceat(distances, starts)[list_ids] - lowest
+        scores = np.where(spread > 0, 1.0 - (distances - lowest) / np.where(spread > 0, spread, 1.0), 1.0)
+
+    # Identify documents by content, so that chunks ingested in several collections are merged
+    keys = {}
+    inverse = np.array([keys.setdefault(doc.page_content, len(keys)) for doc in docs])
+    first_index = np.full(len(keys), len(docs))
+    np.minimum.at(first_index, inverse, np.arange(len(docs)))
+    fused_scores = np.zeros(len(keys))
+    if method == "rrf":
+        np.add.at(fused_scores, inverse, scores)
+    else:
+        np.maximum.at(fused_scores, inverse, scores)
+
+    # Highest fused score first, ties keep the retrieval order
+    order = np.lexsort((first_index, -fused_scores))[:top_k]
+    fused_docs = []
+    for key in order:
+        doc = docs[first_index[key]]
+        doc.metadata["relevance_score"] = float(fused_scores[key])
+        fused_docs.append(doc)
+
+    logger.debug("Fused %d documents from %d collections into %d documents with %s",
+                 len(docs), len(result_lists), len(fused_docs), method)
+    return fused_docs
+
+
+def merge_candidates(result_lists: List[List[Document]], min_candidates: int) -> List[Document]:
+    """Prune and merge the candidates of all collections for reranking.
+
+    With ENABLE_CANDIDATE_PRUNING, candidates below the score threshold or past a distance gap are dropped,
+    keeping at least min_candidates per collection. If RERANKER_MAX_FUSED_CANDIDATES is set, only the best
+    fused candidates of multiple collections are reranked.
+    """
+    result_lists = prune_candidate_lists(result_lists, min_candidates=min_candidates)
+    if RERANKER_MAX_FUSED_CANDIDATES > 0 and len(result_lists) > 1:
+        return fuse_results(result_lists, top_k=RERANKER_MAX_FUSED_CANDIDATES)
+    return [doc for results in result_lists for doc in results]
@@ -17,6 +17,7 @@
 1. get_prompts: Get the prompts from the YAML file.
 2. get_llm: Get the LLM model. Uses the NVIDIA AI Endpoints or OpenAI.
 3. streaming_filter_think: Filter the think tokens from the LLM response.
+3a. ThinkTagFilter: Incremental filter removing the content between think tags from a stream of text.
 4. get_streaming_filter_think_parser: Get the parser for filtering the think tokens from the LLM response.
 """
 
@@ -144,10 +145,81 @@ def get_llm(**kwargs) -> LLM | SimpleChatModel:
         "Unable to find any supported Large Language Model server. Supported engine name is nvidia-ai-endpoints.")
 
 
+class ThinkTagFilter:
+    """
+    Incremental filter removing the content between think tags from a stream of text.
+
+    Each chunk is processed in time linear in its length, and tags may be split at any character
+    boundary across chunks. Text is released as soon as it is known not to be part of a tag, so
+    only a trailing partial tag, at most len("</think>") - 1 characters, is held back between chunks.
+    A think block which is never closed removes the rest of the stream.
+    """
+
+    START_TAG = "<think>"
+    END_TAG = "</think>"
+
+    def __init__(self):
+        self.in_think = False
+        # Length of the prefix of the current tag matched at the end of the previous chunks
+        self.pending = 0
+
+    def feed(self, text: str) -> str:
+        """Process a chunk of text and return the text which can be emitted."""
+        output = []
+        position = 0
+        while position < len(text):
+            tag = self.END_TAG if self.in_think else self.START_TAG
+
+            if self.pending:
+                # Continue matching the partial tag held back from the previous chunks
+                remainder = tag[self.pending:]
+                segment = text[position:position + len(remainder)]
+                if remainder.startswith(segment):
+                    position += len(segment)
+                    if len(segment) == len(remainder):
+                        self.pending = 0
+                        self.in_think = not self.in_think
+                    else:
+                        self.pending += len(segment)
+                    continue
+                # Not a tag after all. The tags only contain "<" as their first character, so no
+                # part of the held back text can start another tag and it is released as is.
+                if not self.in_think:
+                    output.append(tag[:self.pending])
+                self.pending = 0
+                continue
+
+            index = text.find(tag, position)
+            if index >= 0:
+                if not self.in_think:
+                    output.append(text[position:index])
+                position = index + len(tag)
+                self.in_think = not self.in_think
+                continue
+
+            # Hold back a trailing partial tag, which can only start at the last "<" near the end
+            end = len(text)
+            partial_start = text.rfind("<", max(position, len(text) - len(tag) + 1))
+            if partial_start >= 0 and tag.startswith(text[partial_start:]):
+                end = partial_start
+                self.pending = len(text) - partial_start
+            if not self.in_think:
+                output.append(text[position:end])
+            position = len(text)
+
+        return "".join(output)
+
+    def flush(self) -> str:
+        """Return the text held back at the end of the stream."""
+        held_back = "" if self.in_think else self.START_TAG[:self.pending]
+        self.pending = 0
+        return held_back
+
+
 def streaming_filter_think(chunks: Iterable[str]) -> Iterable[str]:
     """
     This generator filters content between think tags in streaming LLM responses.
-    It handles both complete tags in a single chunk and tags split across multiple tokens.
+    It handles tags split across chunks at any character boundary, see ThinkTagFilter.
 
     Args:
         chunks (Iterable[str]): Chunks from a streaming LLM response
@@ -155,130 +227,18 @@ def streaming_filter_think(chunks: Iterable[str]) -> Iterable[str]:
     Yields:
         str: Filtered content with think blocks removed
     """
-    # Complete tags
-    FULL_START_TAG = "<think>"
-    FULL_END_TAG = "</think>"
-
-    # Multi-token tags - core parts without newlines for more robust matching
-    START_TAG_PARTS = ["<th", "ink", ">"]
-    END_TAG_PARTS = ["</", "think", ">"]
-
-    # States
-    NORMAL = 0
-    IN_THINK = 1
-    MATCHING_START = 2
-    MATCHING_END = 3
-
-    state = NORMAL
-    match_position = 0
-    buffer = ""
-    output_buffer = ""
+    think_filter = ThinkTagFilter()
     chunk_count = 0
 
     for chunk in chunks:
-        content = chunk.content
         chunk_count += 1
+        output = think_filter.feed(chunk.content)
+        if output:
+            yield output
 
-        # Let's first check for full tags - this is the most reliable approach
-        buffer += content
-
-        # Check for complete tags first - most efficient case
-        while state == NORMAL and FULL_START_TAG in buffer:
-            start_idx = buffer.find(FULL_START_TAG)
-            # Extract content before tag
-            before_tag = buffer[:start_idx]
-            output_buffer += before_tag
-
-            # Skip over the tag
-            buffer = buffer[start_idx + len(FULL_START_TAG):]
-            state = IN_THINK
-
-        while state == IN_THINK and FULL_END_TAG in buffer:
-            end_idx = buffer.find(FULL_END_TAG)
-            # Discard everything up to and including end tag
-            buffer = buffer[end_idx + len(FULL_END_TAG):]
-            content = buffer
-            state = NORMAL
-
-        # For token-by-token matching, use the core content without worrying about exact whitespace
-        # Strip whitespace for comparison to make matching more robust
-        content_stripped = content.strip()
-
-        if state == NORMAL:
-            if content_stripped == START_TAG_PARTS[0].strip():
-                # Save everything except this start token
-                to_output = buffer[:-len(content)]
-                output_buffer += to_output
-
-                buffer = content  # Keep only the start token in buffer
-                state = MATCHING_START
-                match_position = 1
-            else:
-                output_buffer += content  # Regular content, save it
-                buffer = ""  # Clear buffer, we've processed this chunk
-
-        elif state == MATCHING_START:
-            expected_part = START_TAG_PARTS[match_position].strip()
-            if content_stripped == expected_part:
-                match_position += 1
-                if match_position >= len(START_TAG_PARTS):
-                    # Complete start tag matched
-                    state = IN_THINK
-                    match_position = 0
-                    buffer = ""  # Clear the buffer
-            else:
-                # False match, revert to normal and recover the partial match
-                state = NORMAL
-                output_buffer += buffer  # Recover saved tokens
-                buffer = ""
-
-                # Check if this content is a new start tag
-                if content_stripped == START_TAG_PARTS[0].strip():
-                    state = MATCHING_START
-                    match_position = 1
-                    buffer = content  # Keep this token in buffer
-                else:
-                    output_buffer += content  # Regular content
-
-        elif state == IN_THINK:
-            if content_stripped == END_TAG_PARTS[0].strip():
-                state = MATCHING_END
-                match_position = 1
-                buffer = content  # Keep this token in buffer
-            else:
-                buffer = ""  # Discard content inside think block
-
-        elif state == MATCHING_END:
-            expected_part = END_TAG_PARTS[match_position].strip()
-            if content_stripped == expected_part:
-                match_position += 1
-                if match_position >= len(END_TAG_PARTS):
-                    # Complete end tag matched
-                    state = NORMAL
-                    match_position = 0
-                    buffer = ""  # Clear buffer
-            else:
-                # False match, revert to IN_THINK
-                state = IN_THINK
-                buffer = ""  # Discard content
-
-                # Check if this is a new end tag start
-                if content_stripped == END_TAG_PARTS[0].strip():
-                    state = MATCHING_END
-                    match_position = 1
-                    buffer = content  # Keep this token in buffer
-
-        # Yield accumulated output before processing next chunk
-        if output_buffer:
-            yield output_buffer
-            output_buffer = ""
-
-    # Yield any remaining content if not in a think block
-    if state == NORMAL:
-        if buffer:
-            yield buffer
-        if output_buffer:
-            yield output_buffer
+    output = think_filter.flush()
+    if output:
+        yield output
 
     logger.info("Finished streaming_filter_think processing after %d chunks", chunk_count)
 
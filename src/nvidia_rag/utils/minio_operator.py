@@ -15,26 +15,55 @@
 
 """Minio operator Module to store metadata and assocated utilities.
 1. MinioOperator: Class to store metadata using Minio-client.
-2. get_minio_operator: Get the MinioOperator object.
+2. get_minio_operator: Get the MinioOperator object shared by the process.
 3. get_unique_thumbnail_id_collection_prefix: Get the unique thumbnail id collection prefix.
 4. get_unique_thumbnail_id_file_name_prefix: Get the unique thumbnail id file name prefix.
 5. get_unique_thumbnail_id: Get the unique thumbnail id.
+6. get_thumbnail_contents: Get the content of thumbnails through the process-wide thumbnail cache.
+7. invalidate_thumbnail_cache: Drop the cached thumbnails under a unique thumbnail id prefix.
 """
 
 import os
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
 from typing import Dict, List
 from io import BytesIO
 
+import urllib3
 from minio import Minio
 from minio.commonconfig import SnowballObject
 
+from nvidia_rag.utils.cache import CACHE_SHARED_BACKEND, ByteBudgetCache, get_collection_version
 from nvidia_rag.utils.common import get_config
 
 logger = logging.getLogger(__name__)
 CONFIG = get_config()
 
+# Bulk payload fetch configuration, used to pull citation content concurrently
+MINIO_MAX_CONNECTIONS = int(os.getenv("MINIO_MAX_CONNECTIONS", 32))
+MINIO_FETCH_MAX_WORKERS = int(os.getenv("MINIO_FETCH_MAX_WORKERS", 16))
+MINIO_FETCH_TIMEOUT = float(os.getenv("MINIO_FETCH_TIMEOUT", 2))
+
+_MINIO_FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=MINIO_FETCH_MAX_WORKERS, thread_name_prefix="minio-fetch")
+
+# Thumbnail cache configuration, bounded by the total size of the cached base64 content.
+# Deletions only bump the collection version seen by this process through the redis backend, so the cache is off by default without it
+ENABLE_THUMBNAIL_CACHE = os.getenv(
+    "ENABLE_THUMBNAIL_CACHE", str(CACHE_SHARED_BACKEND == "redis")
+).lower() in ["true", "True"]
+THUMBNAIL_CACHE_MAX_BYTES = int(os.getenv("THUMBNAIL_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+THUMBNAIL_CACHE_TTL = float(os.getenv("THUMBNAIL_CACHE_TTL", 3600))
+
+# Entries are (collection version, content) so that deletions made by the ingestor process are seen here through the shared backend
+THUMBNAIL_CACHE = ByteBudgetCache(
+    name="thumbnail",
+    maxbytes=THUMBNAIL_CACHE_MAX_BYTES,
+    ttl=THUMBNAIL_CACHE_TTL,
+    sizeof=lambda entry: len(entry[1])
+)
+
 class MinioOperator:
     """Minio operator Class to store metadata using Minio-client"""
 
@@ -45,11 +74,18 @@ class MinioOperator:
         secret_key: str,
         default_bucket_name: str = "default-bucket"
     ):
+        # Same settings as the default minio http client, with a connection pool sized for concurrent fetches
+        http_client = urllib3.PoolManager(
+            timeout=urllib3.Timeout(connect=300, read=300),
+            maxsize=MINIO_MAX_CONNECTIONS,
+            retries=urllib3.Retry(total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504])
+        )
         self.client = Minio(
             endpoint,
             access_key=access_key,
             secret_key=secret_key,
-            secure=False
+            secure=False,
+            http_client=http_client
         )
         self.default_bucket_name = default_bucket_name
         self._make_bucket(bucket_name=self.default_bucket_name)
@@ -115,6 +151,36 @@ class MinioOperator:
             logger.debug(f"Error while getting object from Minio: {e}")
             return {}
 
+    def get_payloads(
+        self,
+        object_names: List[str],
+        timeout: float = MINIO_FETCH_TIMEOUT
+    ) -> Dict[str, Dict]:
+        """Get dictionaries for multiple objects concurrently from S3 storage using minio client.
+
+        Objects which fail to load, or are not loaded within timeout seconds, map to an empty dictionary.
+        """
+        unique_object_names = list(dict.fromkeys(object_names))
+        if not unique_object_names:
+            return {}
+
+        futures = {
+            object_name: _MINIO_FETCH_EXECUTOR.submit(self.get_payload, object_name)
+            for object_name in unique_object_names
+        }
+        _, not_done = wait(futures.values(), timeout=timeout)
+        if not_done:
+            logger.warning("Timed out getting %d of %d objects from Minio", len(not_done), len(futures))
+
+        payloads = {}
+        for object_name, future in futures.items():
+            if future in not_done:
+                future.cancel()
+                payloads[object_name] = {}
+            else:
+                payloads[object_name] = future.result()
+        return payloads
+
     def list_payloads(
         self,
         prefix: str = ""
@@ -133,9 +199,11 @@ class MinioOperator:
         for object_name in object_names:
             self.client.remove_object(self.default_bucket_name, object_name)
 
+@lru_cache
 def get_minio_operator():
     """
-    Prepares and return MinioOperator object
+    Prepares and return MinioOperator object, shared by the process so that the client
+    connection pool is reused and the bucket is only checked once
 
     Returns:
         - minio_operator: MinioOperator
@@ -188,4 +256,52 @@ def get_unique_thumbnail_id(
     # Create a string representation
     unique_thumbnail_id = f"{prefix}_{page_number}_" + \
                           "_".join(map(str, rounded_bbox))
-    return unique_thumbnail_id
\ No newline at end of file
+    return unique_thumbnail_id
+
+def get_thumbnail_contents(
+        unique_thumbnail_ids: List[str],
+    ) -> Dict[str, str]:
+    """
+    Get the base64 content of thumbnails, serving repeated thumbnails from the thumbnail cache
+    and fetching the rest concurrently from Minio. A cached thumbnail is only used while the
+    version of its collection is unchanged, so deleted or re-ingested documents are refetched.
+    Returns:
+        - contents: Dict[str, str], empty string for thumbnails which could not be loaded
+    """
+    contents = {}
+    missing = {}
+    collection_versions = {}
+    for unique_thumbnail_id in dict.fromkeys(unique_thumbnail_ids):
+        # Collection names can not contain ':', so the collection prefix is unambiguous
+        collection_name = unique_thumbnail_id.split("_::", 1)[0]
+        if collection_name not in collection_versions:
+            collection_versions[collection_name] = get_collection_version(collection_name)
+        version = collection_versions[collection_name]
+
+        entry = THUMBNAIL_CACHE.get(unique_thumbnail_id) if ENABLE_THUMBNAIL_CACHE else None
+        if entry is not None and entry[0] == version:
+            contents[unique_thumbnail_id] = entry[1]
+        else:
+            missing[unique_thumbnail_id] = version
+
+    if missing:
+        payloads = get_minio_operator().get_payloads(list(missing))
+        for unique_thumbnail_id, version in missing.items():
+            content = payloads.get(unique_thumbnail_id, {}).get("content", "")
+            contents[unique_thumbnail_id] = content
+            # Failed and timed out fetches are not cached so that they are retried
+            if content and ENABLE_THUMBNAIL_CACHE:
+                THUMBNAIL_CACHE.set(unique_thumbnail_id, (version, content))
+    return contents
+
+def invalidate_thumbnail_cache(
+        prefix: str,
+    ) -> int:
+    """
+    Drops the cached thumbnails whose unique thumbnail id starts with the given prefix
+    Returns:
+        - removed: int, number of thumbnails dropped
+    """
+    removed = THUMBNAIL_CACHE.delete_matching(lambda key, _: key.startswith(prefix))
+    logger.debug("Dropped %d cached thumbnails with prefix %s", removed, prefix)
+    return removed
@@ -0,0 +1,102 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Pruning of the retrieved candidates before reranking.
+1. prune_candidates: Drop the candidates of one collection below the score threshold or past a distance gap.
+2. prune_candidate_lists: Prune the candidates of every collection and report the pruned count.
+"""
+
+import os
+import logging
+from typing import List
+
+import numpy as np
+from langchain_core.documents import Document
+
+from nvidia_rag.utils.common import get_config, get_otel_metrics
+
+logger = logging.getLogger(__name__)
+
+CONFIG = get_config()
+
+# Pruning of the candidates sent to the reranker, based on their milvus distances
+ENABLE_CANDIDATE_PRUNING = os.getenv("ENABLE_CANDIDATE_PRUNING", "False").lower() in ["true", "True"]
+# Relative size of the largest distance gap, as a fraction of the distance spread, at which candidates are cut off. 0 disables it
+CANDIDATE_PRUNING_GAP_RATIO = float(os.getenv("CANDIDATE_PRUNING_GAP_RATIO", 0.25))
+
+
+def prune_candidates(
+    docs: List[Document],
+    min_candidates: int,
+    score_threshold: float = CONFIG.retriever.score_threshold,
+    gap_ratio: float = CANDIDATE_PRUNING_GAP_RATIO
+) -> List[Document]:
+    """Drop the candidates of one collection which are unlikely to survive reranking.
+
+    The milvus L2 metric is the squared euclidean distance, which is 2 - 2 * cosine similarity for
+    normalized embeddings. Candidates whose similarity is below score_threshold are dropped. Of the rest,
+    if the largest gap between consecutive distances is at least gap_ratio of the distance spread, the
+    candidates past the gap are dropped too, but never below min_candidates. Candidates without a
+    distance are returned unchanged, in their original order.
+    """
+    if not docs:
+        return docs
+    distances = np.array([doc.metadata.get("distance") for doc in docs], dtype=np.float64)
+    if np.isnan(distances).any():
+        return docs
+
+    order = np.argsort(distances, kind="stable")
+    sorted_distances = distances[order]
+    keep = len(docs)
+    if score_threshold > 0:
+        similarities = 1.0 - sorted_distances / 2
+        keep = int(np.count_nonzero(similarities >= score_threshold))
+
+    min_candidates = max(1, min_candidates)
+    if gap_ratio > 0 and keep > min_candidates:
+        spread = sorted_distances[keep - 1] - sorted_distances[0]
+        # gaps[i] is the gap after the first min_candidates + i candidates
+        gaps = np.diff(sorted_distances[:keep])[min_candidates - 1:]
+        largest = int(np.argmax(gaps))
+        if spread > 0 and gaps[largest] >= gap_ratio * spread:
+            keep = min_candidates + largest
+
+    if keep == len(docs):
+        return docs
+    return [docs[i] for i in np.sort(order[:keep])]
+
+
+def prune_candidate_lists(
+    result_lists: List[List[Document]],
+    min_candidates: int,
+    search_type: str = CONFIG.vector_store.search_type
+) -> List[List[Document]]:
+    """Prune the candidates retrieved from every collection before reranking.
+
+    Each collection keeps at least min_candidates past the gap cutoff, usually the reranker top_n.
+    Hybrid search scores are not L2 distances, so candidates are only pruned for dense search.
+    """
+    if not ENABLE_CANDIDATE_PRUNING or search_type != "dense":
+        return result_lists
+
+    pruned_lists = [prune_candidates(results, min_candidates) for results in result_lists]
+    total = sum(len(results) for results in result_lists)
+    kept = sum(len(results) for results in pruned_lists)
+    logger.info("Pruned %d of %d candidates before reranking", total - kept, total)
+
+    metrics = get_otel_metrics()
+    if metrics:
+        metrics.update_candidate_pruning(pruned=total - kept, kept=kept)
+    return pruned_lists
@@ -14,20 +14,315 @@
 # limitations under the License.
 
 """The wrapper for interacting with reranking models.
-1. _get_ranking_model: Creates the ranking model instance.
-2. get_ranking_model: Returns the ranking model instance if it doesn't exist in cache.
+1. LocalCrossEncoderReranker: Document compressor scoring documents with an in-process cross-encoder.
+2. RerankingService: Concurrency-safe reranking service shared by all requests to a ranking model.
+3. _get_ranking_model: Creates the ranking model client, or a local cross-encoder running on CPU.
+4. get_reranking_service: Returns the reranking service of a ranking model if it doesn't exist in cache.
+5. TopNReranker: Document compressor returning the top_n documents ranked by a RerankingService.
+6. get_ranking_model: Returns a document compressor for the ranking model and top_n.
 """
 
+import os
+import asyncio
+import hashlib
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
+from typing import Any, ClassVar, Dict, List, Optional, Sequence, Tuple
+from langchain_core.callbacks import Callbacks
+from langchain_core.documents import Document
 from langchain_core.documents.compressor import BaseDocumentCompressor
 from langchain_nvidia_ai_endpoints import NVIDIARerank
+from pydantic import ConfigDict
 
 from nvidia_rag.utils.common import get_config, sanitize_nim_url
+from nvidia_rag.utils.cache import TTLCache, make_cache_key
+from nvidia_rag.utils.batching import MicroBatcher
 
 logger = logging.getLogger(__name__)
 
-@lru_cache
+# Reranker score cache configuration
+ENABLE_RERANKER_SCORE_CACHE = os.getenv("ENABLE_RERANKER_SCORE_CACHE", "True").lower() in ["true", "True"]
+RERANKER_SCORE_CACHE_SIZE = int(os.getenv("RERANKER_SCORE_CACHE_SIZE", 65536))
+RERANKER_SCORE_CACHE_TTL = float(os.getenv("RERANKER_SCORE_CACHE_TTL", 3600))
+
+# Reranker request configuration, larger candidate lists are split into parallel requests
+RERANKER_MAX_PASSAGES_PER_REQUEST = int(os.getenv("RERANKER_MAX_PASSAGES_PER_REQUEST", 64))
+RERANKER_MAX_PARALLEL_REQUESTS = int(os.getenv("RERANKER_MAX_PARALLEL_REQUESTS", 8))
+
+# Cross-request reranker batching configuration, disabled by default
+ENABLE_RERANKER_BATCHING = os.getenv("ENABLE_RERANKER_BATCHING", "False").lower() in ["true", "True"]
+RERANKER_BATCH_SIZE = int(os.getenv("RERANKER_BATCH_SIZE", 16))
+RERANKER_BATCH_MAX_WAIT_MS = float(os.getenv("RERANKER_BATCH_MAX_WAIT_MS", 5))
+
+# Local cross-encoder configuration, used with the huggingface ranking model engine
+RERANKER_LOCAL_BACKEND = os.getenv("RERANKER_LOCAL_BACKEND", "torch").lower()
+RERANKER_LOCAL_QUANTIZE = os.getenv("RERANKER_LOCAL_QUANTIZE", "").lower()
+RERANKER_LOCAL_ONNX_FILE = os.getenv("RERANKER_LOCAL_ONNX_FILE", "")
+RERANKER_LOCAL_MAX_LENGTH = int(os.getenv("RERANKER_LOCAL_MAX_LENGTH", 512))
+RERANKER_LOCAL_NUM_THREADS = int(os.getenv("RERANKER_LOCAL_NUM_THREADS", 0))
+
+RERANKER_SCORE_CACHE = TTLCache(name="reranker_score", maxsize=RERANKER_SCORE_CACHE_SIZE, ttl=RERANKER_SCORE_CACHE_TTL)
+
+# A batch item is a query along with the (chunk id, text) pairs to score against it
+_Passages = List[Tuple[str, str]]
+# A request to the ranking model is a list of (query, chunk id, text) to score
+_Request = List[Tuple[str, str, str]]
+
+
+class LocalCrossEncoderReranker(BaseDocumentCompressor):
+    """Document compressor scoring documents with a cross-encoder running on CPU in-process.
+
+    Unlike the ranking NIM, a cross-encoder scores (query, passage) pairs of any number of queries in a
+    single forward pass, so the reranking service batches passages of concurrent requests together.
+    Scores are the raw logits of the model, on the same scale as the scores of the ranking NIM.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    # Scale of the relevance scores, see RerankingService.score_scale
+    score_scale: ClassVar[str] = "logit"
+
+    cross_encoder: Any
+    top_n: int = 4
+    batch_size: int = 32
+
+    def score_pairs(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """Get the relevance score of (query, passage) pairs."""
+        scores = self.cross_encoder.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+        return [float(score) for score in scores]
+
+    def compress_documents(
+        self,
+        documents: Sequence[Document],
+        query: str,
+        callbacks: Optional[Callbacks] = None,
+    ) -> Sequence[Document]:
+        """Score the documents against the query and return the top_n."""
+        scores = self.score_pairs([(query, doc.page_content) for doc in documents])
+        ranked_docs = []
+        for doc, score in sorted(zip(documents, scores), key=lambda pair: pair[1], reverse=True)[:self.top_n]:
+            doc.metadata["relevance_score"] = score
+            ranked_docs.append(doc)
+        return ranked_docs
+
+
+class RerankingService:
+    """Concurrency-safe reranking service shared by all requests to a ranking model.
+
+    The number of documents to return is passed with every call, so the shared ranking model client is
+    never mutated. Relevance scores are cached per (query, chunk) pair when the score cache is enabled,
+    and only chunks without a cached score are sent to the ranking model. Candidate lists larger than
+    `max_passages_per_request` are split into requests sent in parallel, and their scores are merged.
+
+    With batching enabled, concurrent calls are collected for up to `batch_max_wait_ms`. The ranking
+    NIM scores a single query per request, so passages of calls sharing a query are coalesced into
+    the same requests while different queries are sent in parallel. A LocalCrossEncoderReranker scores
+    pairs of any query, so the passages of all calls are packed into the same requests.
+    """
+
+    def __init__(
+        self,
+        ranker: BaseDocumentCompressor,
+        model_id: str,
+        max_passages_per_request: int = 64,
+        max_parallel_requests: int = 8,
+        enable_score_cache: bool = True,
+        enable_batching: bool = False,
+        batch_size: int = 16,
+        batch_max_wait_ms: float = 5.0
+    ):
+        self.ranker = ranker
+        self.model_id = model_id
+        self.max_passages_per_request = max(1, max_passages_per_request)
+        self.enable_score_cache = enable_score_cache
+        self._request_executor = ThreadPoolExecutor(max_workers=max_parallel_requests, thread_name_prefix="rerank")
+        self._batcher = None
+        if enable_batching:
+            self._batcher = MicroBatcher(
+                name="reranker",
+                process_batch=self._score_batch,
+                max_batch_size=batch_size,
+                max_wait_ms=batch_max_wait_ms,
+                max_concurrent_batches=max_parallel_requests
+            )
+
+    @property
+    def score_scale(self) -> Optional[str]:
+        """Scale of the relevance scores of the ranking model, "logit" for raw logits, or None if unknown."""
+        if isinstance(self.ranker, NVIDIARerank):
+            return "logit"
+        return getattr(self.ranker, "score_scale", None)
+
+    @staticmethod
+    def _chunk_id(doc: Document) -> str:
+        """Identify a chunk by its collection and primary key, or by its content if it has no primary key."""
+        pk = doc.metadata.get("pk")
+        if pk is not None:
+            return f"{doc.metadata.get('collection_name', '')}:{pk}"
+        return hashlib.sha256(doc.page_content.encode("utf-8")).hexdigest()
+
+    def _score_cache_key(self, query: str, chunk_id: str) -> str:
+        return make_cache_key("reranker_score", self.model_id, hashlib.sha256(query.encode("utf-8")).hexdigest(), chunk_id)
+
+    def _split(self, passages: List[Any]) -> List[List[Any]]:
+        """Split passages into lists of at most max_passages_per_request."""
+        size = self.max_passages_per_request
+        return [passages[i:i + size] for i in range(0, len(passages), size)]
+
+    def _prepare(self, query: str, documents: Sequence[Document]) -> Tuple[List[str], Dict[str, float], List[Tuple[str, _Passages]]]:
+        """Get the chunk ids and cached scores of the documents, and the batch items still to be scored."""
+        chunk_ids = [self._chunk_id(doc) for doc in documents]
+        scores, pending = {}, {}
+        for chunk_id, doc in zip(chunk_ids, documents):
+            if chunk_id in scores or chunk_id in pending:
+                continue
+            score = RERANKER_SCORE_CACHE.get(self._score_cache_key(query, chunk_id)) if self.enable_score_cache else None
+            if score is None:
+                pending[chunk_id] = doc.page_content
+            else:
+                scores[chunk_id] = score
+        if pending:
+            logger.debug("Reranking %d of %d documents, the rest have cached scores", len(pending), len(documents))
+        items = [(query, passages) for passages in self._split(list(pending.items()))]
+        return chunk_ids, scores, items
+
+    def _finish(self, query: str, chunk_ids: List[str], scores: Dict[str, float], results: List[Dict[str, float]]) -> List[float]:
+        """Merge and cache fresh scores, and return the score of every document."""
+        for result in results:
+            for chunk_id, score in result.items():
+                scores[chunk_id] = score
+                if self.enable_score_cache:
+                    RERANKER_SCORE_CACHE.set(self._score_cache_key(query, chunk_id), score)
+        # Documents dropped by the ranking model are ranked last
+        return [scores.get(chunk_id, float("-inf")) for chunk_id in chunk_ids]
+
+    def _score_batch(self, items: List[Tuple[str, _Passages]]) -> List[Dict[str, float]]:
+        """Score a batch of items, coalescing passages which share a query and splitting oversized requests."""
+        passages_by_query: Dict[str, Dict[str, str]] = {}
+        for query, passages in items:
+            passages_by_query.setdefault(query, {}).update(passages)
+
+        if isinstance(self.ranker, LocalCrossEncoderReranker):
+            pairs = [
+                (query, chunk_id, text)
+                for query, query_passages in passages_by_query.items()
+                for chunk_id, text in query_passages.items()
+            ]
+            requests = self._split(pairs)
+            score_request = self._score_pairs
+        else:
+            requests = [
+                [(query, chunk_id, text) for chunk_id, text in passages]
+                for query, query_passages in passages_by_query.items()
+                for passages in self._split(list(query_passages.items()))
+            ]
+            score_request = self._score_passages
+
+        if len(requests) == 1:
+            results = [score_request(requests[0])]
+        else:
+            results = list(self._request_executor.map(score_request, requests))
+
+        scores = {}
+        for result in results:
+            scores.update(result)
+        return [
+            {chunk_id: scores[(query, chunk_id)] for chunk_id, _ in passages if (query, chunk_id) in scores}
+            for query, passages in items
+        ]
+
+    def _score_passages(self, request: _Request) -> Dict[Tuple[str, str], float]:
+        """Score passages sharing a query with a single request to the ranking model."""
+        query = request[0][0]
+        documents = [Document(page_content=text, metadata={"chunk_id": chunk_id}) for _, chunk_id, text in request]
+        ranked_docs = self.ranker.compress_documents(documents=documents, query=query)
+        return {(query, doc.metadata["chunk_id"]): doc.metadata["relevance_score"] for doc in ranked_docs}
+
+    def _score_pairs(self, request: _Request) -> Dict[Tuple[str, str], float]:
+        """Score passages of any query with a single forward pass of a local cross-encoder."""
+        scores = self.ranker.score_pairs([(query, text) for query, _, text in request])
+        return {(query, chunk_id): score for (query, chunk_id, _), score in zip(request, scores)}
+
+    def score(self, query: str, documents: Sequence[Document]) -> List[float]:
+        """Get the relevance score of every document for the query."""
+        chunk_ids, scores, items = self._prepare(query, documents)
+        results = []
+        if items:
+            if self._batcher is not None:
+                futures = [self._batcher.submit(item) for item in items]
+                results = [future.result() for future in futures]
+            else:
+                results = self._score_batch(items)
+        return self._finish(query, chunk_ids, scores, results)
+
+    async def ascore(self, query: str, documents: Sequence[Document]) -> List[float]:
+        """Async version of score."""
+        chunk_ids, scores, items = self._prepare(query, documents)
+        results = []
+        if items:
+            if self._batcher is not None:
+                results = await asyncio.gather(*[asyncio.wrap_future(self._batcher.submit(item)) for item in items])
+            else:
+                results = await asyncio.to_thread(self._score_batch, items)
+        return self._finish(query, chunk_ids, scores, results)
+
+    @staticmethod
+    def _top_n(documents: Sequence[Document], scores: List[float], top_n: int) -> List[Document]:
+        """Set the relevance score of the top_n documents and return them in decreasing order of score."""
+        ranked_docs = []
+        for doc, score in sorted(zip(documents, scores), key=lambda pair: pair[1], reverse=True)[:top_n]:
+            if score == float("-inf"):
+                break
+            doc.metadata["relevance_score"] = score
+            ranked_docs.append(doc)
+        return ranked_docs
+
+    def rerank(self, query: str, documents: Sequence[Document], top_n: int) -> List[Document]:
+        """Return the top_n documents ranked by relevance to the query."""
+        if not documents:
+            return []
+        return self._top_n(documents, self.score(query, documents), top_n)
+
+    async def arerank(self, query: str, documents: Sequence[Document], top_n: int) -> List[Document]:
+        """Async version of rerank."""
+        if not documents:
+            return []
+        return self._top_n(documents, await self.ascore(query, documents), top_n)
+
+
+class TopNReranker(BaseDocumentCompressor):
+    """Document compressor returning the top_n documents ranked by a shared RerankingService."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    service: RerankingService
+    top_n: int = 4
+
+    @property
+    def score_scale(self) -> Optional[str]:
+        """Scale of the relevance scores set on the returned documents."""
+        return self.service.score_scale
+
+    def compress_documents(
+        self,
+        documents: Sequence[Document],
+        query: str,
+        callbacks: Optional[Callbacks] = None,
+    ) -> Sequence[Document]:
+        """Rerank the documents and return the top_n."""
+        return self.service.rerank(query, documents, top_n=self.top_n)
+
+    async def acompress_documents(
+        self,
+        documents: Sequence[Document],
+        query: str,
+        callbacks: Optional[Callbacks] = None,
+    ) -> Sequence[Document]:
+        """Async version of compress_documents."""
+        return await self.service.arerank(query, documents, top_n=self.top_n)
+
+
 def _get_ranking_model(model="", url="", top_n=4) -> BaseDocumentCompressor:
     """Create the ranking model.
 
@@ -51,18 +346,74 @@ def _get_ranking_model(model="", url="", top_n=4) -> BaseDocumentCompressor:
             if model:
                 logger.info("Using ranking model %s hosted at api catalog", model)
                 return NVIDIARerank(model=model, top_n=top_n, truncate="END")
+        elif settings.ranking.model_engine == "huggingface":
+            return _get_local_ranking_model(model, top_n=top_n)
         else:
-            logger.warning("Unable to find any supported ranking model. Supported engine is nvidia-ai-endpoints.")
+            logger.warning("Unable to find any supported ranking model. Supported engines are nvidia-ai-endpoints and huggingface.")
     except Exception as e:
         logger.error("An error occurred while initializing ranking_model: %s", e)
     return None
 
 
-def get_ranking_model(model="", url="", top_n=4) -> BaseDocumentCompressor:
-    """Create the ranking model."""
-    ranker = _get_ranking_model(model, url, top_n)
+def _get_local_ranking_model(model: str, top_n: int = 4) -> LocalCrossEncoderReranker:
+    """Load a sentence-transformers cross-encoder on CPU, optionally as ONNX or with int8 weights."""
+    # sentence-transformers>=4.0 is an optional dependency, installed with the local-reranker extra
+    import torch
+    from sentence_transformers import CrossEncoder
+
+    # Single label cross-encoders apply a sigmoid by default, keep the logits like the ranking NIM returns
+    kwargs = {"device": "cpu", "max_length": RERANKER_LOCAL_MAX_LENGTH, "activation_fn": torch.nn.Identity()}
+    if RERANKER_LOCAL_BACKEND == "onnx":
+        kwargs["backend"] = "onnx"
+        if RERANKER_LOCAL_ONNX_FILE:
+            # e.g. onnx/model_qint8_avx512_vnni.onnx for int8 weights
+            kwargs["model_kwargs"] = {"file_name": RERANKER_LOCAL_ONNX_FILE}
+    logger.info("Using local ranking model %s with the %s backend", model, RERANKER_LOCAL_BACKEND)
+    cross_encoder = CrossEncoder(model, **kwargs)
+
+    if RERANKER_LOCAL_BACKEND == "torch":
+        if RERANKER_LOCAL_NUM_THREADS > 0:
+            torch.set_num_threads(RERANKER_LOCAL_NUM_THREADS)
+        if RERANKER_LOCAL_QUANTIZE == "int8":
+            logger.info("Quantizing the linear layers of the local ranking model to int8")
+            cross_encoder.model = torch.quantization.quantize_dynamic(
+                cross_encoder.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+    return LocalCrossEncoderReranker(cross_encoder=cross_encoder, top_n=top_n)
+
+
+@lru_cache
+def get_reranking_service(model="", url="") -> Optional[RerankingService]:
+    """Create the reranking service of a ranking model, or None if the ranking model is unavailable."""
+    # Every request sends at most RERANKER_MAX_PASSAGES_PER_REQUEST passages, so all of them are returned
+    ranker = _get_ranking_model(model, url, top_n=RERANKER_MAX_PASSAGES_PER_REQUEST)
     if ranker is None:
+        return None
+    # A local cross-encoder packs passages of concurrent requests into the same forward pass, so it always batches
+    local_ranker = isinstance(ranker, LocalCrossEncoderReranker)
+    return RerankingService(
+        ranker=ranker,
+        model_id=f"{model}@{url}",
+        max_passages_per_request=RERANKER_MAX_PASSAGES_PER_REQUEST,
+        max_parallel_requests=RERANKER_MAX_PARALLEL_REQUESTS,
+        enable_score_cache=ENABLE_RERANKER_SCORE_CACHE,
+        enable_batching=ENABLE_RERANKER_BATCHING or local_ranker,
+        batch_size=RERANKER_BATCH_SIZE,
+        batch_max_wait_ms=RERANKER_BATCH_MAX_WAIT_MS
+    )
+
+
+def get_ranking_model(model="", url="", top_n=4) -> BaseDocumentCompressor:
+    """Create a document compressor returning the top_n documents ranked by the ranking model.
+
+    The compressor is cheap to create and never mutated, the ranking model client is shared through
+    the reranking service.
+    """
+    service = get_reranking_service(model, url)
+    if service is None:
         logger.warning("Cached ranking model was None — clearing cache and retrying.")
-        _get_ranking_model.cache_clear()
-        ranker = _get_ranking_model(model, url, top_n)
-    return ranker
\ No newline at end of file
+        get_reranking_service.cache_clear()
+        service = get_reranking_service(model, url)
+    if service is None:
+        return None
+    return TopNReranker(service=service, top_n=top_n)
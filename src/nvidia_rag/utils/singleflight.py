@@ -0,0 +1,222 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Coalescing of identical concurrent requests.
+1. SingleFlight: Shares the result of one in-flight computation among identical concurrent calls.
+2. StreamBroadcaster: Shares one in-flight stream among identical concurrent calls, replaying it to late joiners.
+3. Subscription: A reader of a broadcast stream, counted until it is closed.
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from nvidia_rag.utils.common import get_otel_metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _report(flight: str, shared: bool) -> None:
+    """Report whether a call started a computation or joined an in-flight one."""
+    metrics = get_otel_metrics()
+    if metrics:
+        metrics.update_request_coalescing(flight=flight, shared=shared)
+
+
+class _Call:
+    """An in-flight computation and the number of callers waiting for it."""
+
+    def __init__(self, task: "asyncio.Task"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Shares the result of one in-flight computation among identical concurrent calls.
+
+    The first call for a key runs the computation in its own task and later calls with the same key
+    await that task instead of starting another. The key is forgotten once the computation finishes,
+    so only concurrent calls are coalesced. If every caller is cancelled, the computation is cancelled.
+    Callers share the returned object, which must not be mutated.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, _Call] = {}
+
+    async def do(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the result of compute(), or of the identical computation already in flight."""
+        call = self._calls.get(key)
+        shared = call is not None
+        if call is None:
+            call = _Call(asyncio.ensure_future(compute()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        _report(self.name, shared)
+        if shared:
+            logger.debug("Joining in-flight %s request", self.name)
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+
+class _Broadcast:
+    """The chunks of an in-flight stream and the number of callers reading it."""
+
+    def __init__(self):
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.condition = asyncio.Condition()
+        self.started: "asyncio.Future" = asyncio.get_running_loop().create_future()
+        self.subscribers = 0
+        self.task: Optional["asyncio.Task"] = None
+
+    def unsubscribe(self) -> None:
+        """Release a reader, cancelling the stream once no reader is left."""
+        self.subscribers -= 1
+        if self.subscribers == 0 and not self.done and self.task is not None:
+            self.task.cancel()
+
+
+class Subscription:
+    """A reader of a broadcast stream, iterating the buffered chunks from the start and then the live ones.
+
+    The reader is counted from subscribe() until close(), whether or not it is ever iterated. It is closed
+    when the stream ends or fails, by close() or aclose(), on leaving an async with block, and as a last
+    resort when it is garbage collected, for example if the client disconnects before the response starts.
+    """
+
+    def __init__(self, broadcast: _Broadcast):
+        self._broadcast = broadcast
+        self._loop = asyncio.get_running_loop()
+        self._index = 0
+        self._closed = False
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> Any:
+        broadcast = self._broadcast
+        if self._closed:
+            raise StopAsyncIteration
+        if self._index >= len(broadcast.chunks):
+            try:
+                async with broadcast.condition:
+                    await broadcast.condition.wait_for(lambda: self._index < len(broadcast.chunks) or broadcast.done)
+            except BaseException:
+                self.close()
+                raise
+        if self._index < len(broadcast.chunks):
+            self._index += 1
+            return broadcast.chunks[self._index - 1]
+        self.close()
+        if broadcast.error is not None:
+            raise broadcast.error
+        raise StopAsyncIteration
+
+    def close(self) -> None:
+        """Stop reading the stream. Calling it again has no effect."""
+        if not self._closed:
+            self._closed = True
+            self._broadcast.unsubscribe()
+
+    async def aclose(self) -> None:
+        """Stop reading the stream, like the aclose() of async generators."""
+        self.close()
+
+    async def __aenter__(self) -> "Subscription":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def __del__(self):
+        if not self._closed:
+            self._closed = True
+            if not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._broadcast.unsubscribe)
+
+
+class StreamBroadcaster:
+    """Shares one in-flight stream among identical concurrent calls.
+
+    The first call for a key awaits open_stream() for an async iterator, which a background task reads
+    into a buffer. Every call, including ones joining while the stream is being read, gets a Subscription
+    replaying the buffered chunks from the start and then the live ones. Errors raised by open_stream()
+    are raised to all callers, errors raised while streaming end every subscription with that error. If
+    every subscription is closed before the stream ends, reading the stream is cancelled.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._broadcasts: Dict[str, _Broadcast] = {}
+
+    async def subscribe(self, key: str, open_stream: Callable[[], Awaitable[AsyncIterator[Any]]]) -> Subscription:
+        """Return a subscription to the stream opened by open_stream(), or to the identical stream already in flight."""
+        broadcast = self._broadcasts.get(key)
+        shared = broadcast is not None
+        if broadcast is None:
+            broadcast = _Broadcast()
+            self._broadcasts[key] = broadcast
+            broadcast.task = asyncio.ensure_future(self._pump(key, broadcast, open_stream))
+        _report(self.name, shared)
+        if shared:
+            logger.debug("Joining in-flight %s stream", self.name)
+
+        broadcast.subscribers += 1
+        subscription = Subscription(broadcast)
+        try:
+            await asyncio.shield(broadcast.started)
+        except BaseException:
+            subscription.close()
+            raise
+        return subscription
+
+    async def _pump(self, key: str, broadcast: _Broadcast, open_stream: Callable[[], Awaitable[AsyncIterator[Any]]]) -> None:
+        """Open the stream and buffer its chunks, waking up the readers after each one."""
+        try:
+            stream = await open_stream()
+            broadcast.started.set_result(None)
+            async for chunk in stream:
+                async with broadcast.condition:
+                    broadcast.chunks.append(chunk)
+                    broadcast.condition.notify_all()
+        except asyncio.CancelledError as e:
+            if not broadcast.started.done():
+                broadcast.started.cancel()
+            broadcast.error = e
+            raise
+        except Exception as e:
+            if not broadcast.started.done():
+                broadcast.started.set_exception(e)
+            else:
+                logger.error("Error while broadcasting %s stream: %s", self.name, e)
+            broadcast.error = e
+        finally:
+            if self._broadcasts.get(key) is broadcast:
+                del self._broadcasts[key]
+            async with broadcast.condition:
+                broadcast.done = True
+                broadcast.condition.notify_all()
@@ -15,20 +15,29 @@
 
 """The wrapper for interacting with milvus vectorstore and associated functions.
 1. create_vectorstore_langchain: Create the vector db index for langchain.
-2. get_vectorstore: Get the vectorstore object.
+2. get_vectorstore: Get the vectorstore object, reusing it from the process-wide registry when possible.
 3. create_collections: Create multiple collections in the Milvus vector database.
 4. get_collection: Get the list of all collection in vectorstore along with the number of rows in each collection.
 5. delete_collections: Delete a list of collections from the Milvus vector database.
 6. get_docs_vectorstore_langchain: Retrieve filenames stored in the vector store implemented in LangChain.
+7. VectorStoreRegistry: Process-wide registry of long-lived vectorstore objects used on the query path.
+8. invalidate_vectorstore: Drop registry entries for a collection after it is deleted or recreated.
+9. retreive_docs_from_retriever: Retrieve documents for a query, using the retrieval result cache if enabled.
+10. aretreive_docs_from_retriever: Async version of retreive_docs_from_retriever.
 """
 
 import os
+import asyncio
 import time
 import logging
-from typing import List, Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 from urllib.parse import urlparse
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_core.vectorstores import VectorStore
 from pymilvus import connections, utility, Collection, MilvusClient, DataType, MilvusException
 from pymilvus.orm.types import CONSISTENCY_STRONG
@@ -37,6 +46,7 @@ from langchain_core.runnables import RunnableAssign, RunnableLambda
 from opentelemetry import context as otel_context
 
 from nvidia_rag.utils.common import get_config
+from nvidia_rag.utils.cache import TTLCache, get_collection_version, make_cache_key
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +54,25 @@ CONFIG = get_config()
 
 DEFAULT_METADATA_SCHEMA_COLLECTION = "metadata_schema"
 
+# Vectorstore registry configuration
+ENABLE_VECTORSTORE_REGISTRY = os.getenv("ENABLE_VECTORSTORE_REGISTRY", "True").lower() in ["true", "True"]
+VECTORSTORE_REGISTRY_IDLE_TTL = float(os.getenv("VECTORSTORE_REGISTRY_IDLE_TTL", 900))
+VECTORSTORE_REGISTRY_VALIDATE_INTERVAL = float(os.getenv("VECTORSTORE_REGISTRY_VALIDATE_INTERVAL", 30))
+
+# Retrieval result cache configuration, disabled by default
+ENABLE_RETRIEVAL_CACHE = os.getenv("ENABLE_RETRIEVAL_CACHE", "False").lower() in ["true", "True"]
+RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", 2048))
+RETRIEVAL_CACHE_TTL = float(os.getenv("RETRIEVAL_CACHE_TTL", 300))
+
+# Caches the primary keys and distances of retrieved chunks, not the documents themselves
+RETRIEVAL_CACHE = TTLCache(name="retrieval", maxsize=RETRIEVAL_CACHE_SIZE, ttl=RETRIEVAL_CACHE_TTL)
+
+# Shared pool used by the synchronous search, generate and reflection paths to retrieve from multiple collections in parallel
+RETRIEVAL_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("RETRIEVAL_THREAD_POOL_SIZE", 32)),
+    thread_name_prefix="retrieval"
+)
+
 try:
     from nv_ingest_client.util.milvus import create_nvingest_collection
 except Exception:
@@ -122,16 +151,138 @@ def create_vectorstore_langchain(document_embedder, collection_name: str = "", v
     return vectorstore
 
 
+def _get_collection_id(collection_name: str, vdb_endpoint: str) -> Optional[int]:
+    """Get the milvus collection id, or None if the collection does not exist.
+
+    The collection id changes whenever a collection is dropped and created again with the same name,
+    which lets the registry detect recreated collections.
+    """
+    url = urlparse(vdb_endpoint)
+    connection_alias = f"milvus_{url.hostname}_{url.port}"
+    connections.connect(connection_alias, host=url.hostname, port=url.port)
+    if not utility.has_collection(collection_name, using=connection_alias):
+        return None
+    return Collection(collection_name, using=connection_alias).describe().get("collection_id")
+
+
+@dataclass
+class _RegistryEntry:
+    """A registered vectorstore along with the bookkeeping needed to refresh and evict it."""
+    vectorstore: VectorStore
+    collection_id: Optional[int]
+    last_used: float = field(default_factory=time.monotonic)
+    last_validated: float = field(default_factory=time.monotonic)
+
+
+class VectorStoreRegistry:
+    """Process-wide registry of langchain vectorstore objects.
+
+    Creating a vectorstore connects to milvus, checks the collection, describes its schema and loads it.
+    The registry performs this once per (vdb_endpoint, collection, embedder, search_type) and reuses the
+    object across requests. Entries are re-validated against milvus at most every `validate_interval`
+    seconds so that dropped or recreated collections are picked up, and entries not used for
+    `idle_ttl` seconds are evicted.
+    """
+
+    def __init__(self, idle_ttl: float = 900, validate_interval: float = 30):
+        self.idle_ttl = idle_ttl
+        self.validate_interval = validate_interval
+        self._entries: Dict[Tuple[str, str, int, str], _RegistryEntry] = {}
+        self._lock = threading.Lock()
+        self._build_locks: Dict[Tuple[str, str, int, str], threading.Lock] = {}
+
+    def get(self, document_embedder: "Embeddings", collection_name: str, vdb_endpoint: str) -> Optional[VectorStore]:
+        """Return a registered vectorstore, creating or refreshing it if required."""
+        # The embedder objects are cached by get_embedding_model, and the registered vectorstore keeps a
+        # reference to its embedder, so the id is stable for the lifetime of the entry.
+        key = (vdb_endpoint, collection_name, id(document_embedder), CONFIG.vector_store.search_type)
+        now = time.monotonic()
+
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._entries.get(key)
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        if entry is not None and now - entry.last_validated < self.validate_interval:
+            entry.last_used = now
+            return entry.vectorstore
+
+        # Serialize creation per key so that concurrent requests do not all build the same object
+        with build_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry.last_validated < self.validate_interval:
+                entry.last_used = time.monotonic()
+                return entry.vectorstore
+
+            collection_id = _get_collection_id(collection_name, vdb_endpoint)
+            if entry is not None:
+                if collection_id is not None and collection_id == entry.collection_id:
+                    entry.last_validated = entry.last_used = time.monotonic()
+                    return entry.vectorstore
+                logger.info("Collection %s at %s was dropped or recreated. Refreshing vectorstore.",
+                            collection_name, vdb_endpoint)
+                self.invalidate(collection_name, vdb_endpoint)
+
+            if collection_id is None:
+                logger.debug("Collection '%s' does not exist in Milvus. Skipping vectorstore registration.", collection_name)
+                return None
+
+            vectorstore = create_vectorstore_langchain(document_embedder, collection_name, vdb_endpoint)
+            if vectorstore is not None:
+                with self._lock:
+                    self._entries[key] = _RegistryEntry(vectorstore=vectorstore, collection_id=collection_id)
+                logger.info("Registered vectorstore for collection %s at %s", collection_name, vdb_endpoint)
+            return vectorstore
+
+    def invalidate(self, collection_name: Optional[str] = None, vdb_endpoint: Optional[str] = None) -> None:
+        """Remove entries matching the collection and endpoint. Passing neither clears the registry."""
+        with self._lock:
+            for key in list(self._entries):
+                if collection_name is not None and key[1] != collection_name:
+                    continue
+                if vdb_endpoint is not None and key[0] != vdb_endpoint:
+                    continue
+                del self._entries[key]
+                self._build_locks.pop(key, None)
+
+    def _evict_idle(self, now: float) -> None:
+        """Evict entries which have not been used within the idle ttl. Caller must hold the lock."""
+        for key, entry in list(self._entries.items()):
+            if now - entry.last_used > self.idle_ttl:
+                logger.debug("Evicting idle vectorstore for collection %s at %s", key[1], key[0])
+                del self._entries[key]
+                self._build_locks.pop(key, None)
+
+
+VECTORSTORE_REGISTRY = VectorStoreRegistry(
+    idle_ttl=VECTORSTORE_REGISTRY_IDLE_TTL,
+    validate_interval=VECTORSTORE_REGISTRY_VALIDATE_INTERVAL
+)
+
+
 def get_vectorstore(
         document_embedder: "Embeddings",
         collection_name: str = "",
         vdb_endpoint: str = "") -> VectorStore:
     """
     Send a vectorstore object.
-    If a Vectorstore object already exists, the function returns that object.
-    Otherwise, it creates a new Vectorstore object and returns it.
+    If a Vectorstore object already exists in the registry, the function returns that object.
+    Otherwise, it creates a new Vectorstore object, registers it and returns it.
     """
-    return create_vectorstore_langchain(document_embedder, collection_name, vdb_endpoint)
+    if not ENABLE_VECTORSTORE_REGISTRY:
+        return create_vectorstore_langchain(document_embedder, collection_name, vdb_endpoint)
+
+    if vdb_endpoint == "":
+        vdb_endpoint = CONFIG.vector_store.url
+    if not collection_name:
+        collection_name = os.getenv('COLLECTION_NAME', "vector_db")
+    return VECTORSTORE_REGISTRY.get(document_embedder, collection_name, vdb_endpoint)
+
+
+def invalidate_vectorstore(collection_name: Optional[str] = None, vdb_endpoint: Optional[str] = None) -> None:
+    """Drop the registered vectorstores for a collection so that the next request recreates them."""
+    VECTORSTORE_REGISTRY.invalidate(collection_name, vdb_endpoint)
 
 
 def create_collection(collection_name: str, vdb_endpoint: str, dimension: int = 2048, collection_type: str = "text") -> None:
@@ -163,6 +314,7 @@ def create_collection(collection_name: str, vdb_endpoint: str, dimension: int =
             dense_dim = dimension
             )
         connections.disconnect(connection_alias)
+        invalidate_vectorstore(collection_name, vdb_endpoint)
     except Exception as e:
         logger.error(f"Failed to create collection {collection_name}: {str(e)}")
         raise Exception(f"Failed to create collection {collection_name}: {str(e)}")
@@ -304,6 +456,7 @@ def delete_collections(vdb_endpoint: str, collection_names: List[str]) -> dict:
             try:
                 if utility.has_collection(collection, using=connection_alias):
                     utility.drop_collection(collection, using=connection_alias)
+                    invalidate_vectorstore(collection, vdb_endpoint)
                     deleted_collections.append(collection)
                     logger.info(f"Deleted collection: {collection}")
                 else:
@@ -587,17 +740,79 @@ def retreive_docs_from_retriever(retriever, retriever_query: str, expr: str, ote
     start_time = time.time()
     retriever_docs = []
     docs = []
-    retriever_lambda = RunnableLambda(lambda x: retriever.invoke(x, expr=expr, consistency_level=CONFIG.vector_store.consistency_level))
+    collection_name = retriever.vectorstore.collection_name
+
+    cache_key = None
+    if ENABLE_RETRIEVAL_CACHE:
+        cache_key = _retrieval_cache_key(retriever, retriever_query, expr)
+        cached_docs = _get_cached_retrieval(retriever.vectorstore, cache_key)
+        if cached_docs is not None:
+            logger.info(f"Retrieval cache hit for collection {collection_name}, latency: {time.time() - start_time:.4f} seconds")
+            otel_context.detach(token)
+            return add_collection_name_to_retreived_docs(cached_docs, collection_name)
+
+    retriever_lambda = RunnableLambda(lambda x: _search_with_distance(retriever, x, expr))
     retriever_chain = {"context": retriever_lambda} | RunnableAssign({"context": lambda input: input["context"]})
-    retriever_docs = retriever_chain.invoke(retriever_query, config={'run_name':'retriever'})
+    try:
+        retriever_docs = retriever_chain.invoke(retriever_query, config={'run_name':'retriever'})
+    except MilvusException:
+        # The registered vectorstore may point to a dropped collection, recreate it on the next request
+        invalidate_vectorstore(collection_name)
+        otel_context.detach(token)
+        raise
     docs = retriever_docs.get("context", [])
-    collection_name = retriever.vectorstore.collection_name
+    if cache_key is not None:
+        _set_cached_retrieval(cache_key, docs)
     end_time = time.time()
     latency = end_time - start_time
     logger.info(f"Retriever latency: {latency:.4f} seconds")
     otel_context.detach(token)
     return add_collection_name_to_retreived_docs(docs, collection_name)
 
+async def aretreive_docs_from_retriever(retriever, retriever_query: str, expr: str) -> List[Document]:
+    """Retreive documents from the retriever without blocking the event loop.
+
+    The opentelemetry context propagates through asyncio tasks, so unlike retreive_docs_from_retriever
+    no context needs to be attached explicitly.
+
+    Args:
+        retriever (VectorStoreRetriever): The retriever to use.
+        retriever_query (str): The query to use.
+        expr (str): The expression to use.
+
+    Returns:
+        docs (List[Document]): The list of documents from the retriever.
+    """
+
+    start_time = time.time()
+    collection_name = retriever.vectorstore.collection_name
+
+    cache_key = None
+    if ENABLE_RETRIEVAL_CACHE:
+        cache_key = _retrieval_cache_key(retriever, retriever_query, expr)
+        if RETRIEVAL_CACHE.get(cache_key) is not None:
+            cached_docs = await asyncio.to_thread(_get_cached_retrieval, retriever.vectorstore, cache_key)
+            if cached_docs is not None:
+                logger.info(f"Retrieval cache hit for collection {collection_name}, latency: {time.time() - start_time:.4f} seconds")
+                return add_collection_name_to_retreived_docs(cached_docs, collection_name)
+
+    async def _asearch(x):
+        return await _asearch_with_distance(retriever, x, expr)
+
+    retriever_lambda = RunnableLambda(lambda x: _search_with_distance(retriever, x, expr), afunc=_asearch)
+    retriever_chain = {"context": retriever_lambda} | RunnableAssign({"context": lambda input: input["context"]})
+    try:
+        retriever_docs = await retriever_chain.ainvoke(retriever_query, config={'run_name':'retriever'})
+    except MilvusException:
+        # The registered vectorstore may point to a dropped collection, recreate it on the next request
+        invalidate_vectorstore(collection_name)
+        raise
+    docs = retriever_docs.get("context", [])
+    if cache_key is not None:
+        _set_cached_retrieval(cache_key, docs)
+    logger.info(f"Retriever latency: {time.time() - start_time:.4f} seconds")
+    return add_collection_name_to_retreived_docs(docs, collection_name)
+
 def add_collection_name_to_retreived_docs(docs: List[Document], collection_name: str) -> List[Document]:
     """Add the collection name to the retreived documents.
     This is done to ensure the collection name is available in the metadata of the documents for preparing citations.
@@ -612,3 +827,108 @@ def add_collection_name_to_retreived_docs(docs: List[Document], collection_name:
     for doc in docs:
         doc.metadata["collection_name"] = collection_name
     return docs
+
+def _search_with_distance(retriever, retriever_query: str, expr: str) -> List[Document]:
+    """Search the retriever's vectorstore and record the milvus distance of each document in its metadata."""
+    search_kwargs = dict(retriever.search_kwargs)
+    k = search_kwargs.pop("k", 4)
+    docs_and_scores = retriever.vectorstore.similarity_search_with_score(
+        retriever_query,
+        k=k,
+        expr=expr,
+        consistency_level=CONFIG.vector_store.consistency_level,
+        **search_kwargs
+    )
+    docs = []
+    for doc, distance in docs_and_scores:
+        doc.metadata["distance"] = distance
+        docs.append(doc)
+    return docs
+
+
+async def _asearch_with_distance(retriever, retriever_query: str, expr: str) -> List[Document]:
+    """Async version of _search_with_distance.
+
+    Recent langchain-milvus releases embed the query through the async embedding API and search through
+    the async milvus client. Older releases fall back to the default executor of the event loop.
+    """
+    search_kwargs = dict(retriever.search_kwargs)
+    k = search_kwargs.pop("k", 4)
+    docs_and_scores = await retriever.vectorstore.asimilarity_search_with_score(
+        retriever_query,
+        k=k,
+        expr=expr,
+        consistency_level=CONFIG.vector_store.consistency_level,
+        **search_kwargs
+    )
+    docs = []
+    for doc, distance in docs_and_scores:
+        doc.metadata["distance"] = distance
+        docs.append(doc)
+    return docs
+
+
+def _retrieval_cache_key(retriever, retriever_query: str, expr: str) -> str:
+    """Cache key for a retrieval based on the collection and its version, query, filter and top k."""
+    vectorstore = retriever.vectorstore
+    collection_name = vectorstore.collection_name
+    embedding_model = getattr(vectorstore.embedding_func, "model", "")
+    return make_cache_key(
+        "retrieval",
+        getattr(vectorstore, "alias", ""),
+        collection_name,
+        get_collection_version(collection_name),
+        CONFIG.vector_store.search_type,
+        embedding_model,
+        " ".join(retriever_query.split()),
+        expr,
+        retriever.search_kwargs.get("k", 4)
+    )
+
+
+def _set_cached_retrieval(cache_key: str, docs: List[Document]) -> None:
+    """Cache the primary keys and distances of the retrieved documents."""
+    pks = tuple(doc.metadata.get("pk") for doc in docs)
+    if any(pk is None for pk in pks):
+        logger.debug("Retrieved documents are missing primary keys, skipping retrieval cache")
+        return
+    RETRIEVAL_CACHE.set(cache_key, (pks, tuple(doc.metadata.get("distance") for doc in docs)))
+
+
+def _get_cached_retrieval(vectorstore: VectorStore, cache_key: str) -> List[Document] | None:
+    """Rehydrate cached retrieval results by fetching the cached primary keys from milvus.
+
+    Returns None on a cache miss, or if any of the chunks no longer exists in the collection.
+    """
+    cached = RETRIEVAL_CACHE.get(cache_key)
+    if cached is None:
+        return None
+    pks, distances = cached
+    if not pks:
+        return []
+
+    try:
+        text_field = getattr(vectorstore, "_text_field", "text")
+        output_fields = [f.name for f in vectorstore.col.schema.fields if "VECTOR" not in f.dtype.name]
+        rows = vectorstore.col.query(
+            expr=f"pk in {list(pks)}",
+            output_fields=output_fields,
+            consistency_level=CONFIG.vector_store.consistency_level
+        )
+    except Exception as e:
+        logger.warning("Failed to rehydrate cached retrieval results, querying the retriever instead: %s", e)
+        RETRIEVAL_CACHE.delete(cache_key)
+        return None
+
+    rows_by_pk = {row["pk"]: row for row in rows}
+    if len(rows_by_pk) != len(pks):
+        RETRIEVAL_CACHE.delete(cache_key)
+        return None
+
+    docs = []
+    for pk, distance in zip(pks, distances):
+        row = dict(rows_by_pk[pk])
+        page_content = row.pop(text_field, "")
+        row["distance"] = distance
+        docs.append(Document(page_content=page_content, metadata=row))
+    return docs
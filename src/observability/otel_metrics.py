@@ -48,6 +48,39 @@ class OtelMetrics:
             "token_usage_distribution",
             description="Token usage distribution per request",
         )
+        self.cache_lookup_counter = self.meter.create_counter(
+            "cache_lookups_total", description="Total cache lookups by cache name and result"
+        )
+        self.cache_hit_ratio_gauge = self.meter.create_gauge(
+            "cache_hit_ratio", description="Hit ratio of a cache since the process started"
+        )
+        self.cache_resident_bytes_gauge = self.meter.create_gauge(
+            "cache_resident_bytes", description="Total size of the values held by a cache in bytes"
+        )
+        self.stream_frame_counter = self.meter.create_counter(
+            "stream_frames_total", description="Number of frames sent in streamed responses"
+        )
+        self.stream_chunk_counter = self.meter.create_counter(
+            "stream_chunks_total", description="Number of LLM chunks sent in streamed responses, before coalescing"
+        )
+        self.speculative_retrieval_counter = self.meter.create_counter(
+            "speculative_retrieval_total", description="Speculative retrievals by whether their results were used"
+        )
+        self.batch_size_histogram = self.meter.create_histogram(
+            "batch_size_distribution", description="Number of requests coalesced per micro-batch"
+        )
+        self.request_coalescing_counter = self.meter.create_counter(
+            "coalesced_requests_total", description="Requests by whether they started a computation or joined an identical in-flight one"
+        )
+        self.relevance_judge_counter = self.meter.create_counter(
+            "reflection_relevance_checks_total", description="Reflection context relevance checks by judge, reranker scores or the reflection LLM"
+        )
+        self.candidates_pruned_histogram = self.meter.create_histogram(
+            "reranker_candidates_pruned", description="Number of retrieved candidates pruned before reranking per request"
+        )
+        self.candidates_reranked_histogram = self.meter.create_histogram(
+            "reranker_candidates", description="Number of retrieved candidates sent to the reranker per request"
+        )
         logging.info("OpenTelemetry Metrics Initialized")
 
     def update_api_requests(self, method: str = None, endpoint: str = None):
@@ -73,3 +106,50 @@ class OtelMetrics:
         if avg_words_per_chunk is not None:
             self.avg_words_per_chunk_gauge.set(avg_words_per_chunk)
             logging.info(f"Avg words per chunk: {avg_words_per_chunk}")
+
+    def update_cache_lookup(self, cache_name: str = None, hit: bool = None):
+        """Updates the cache hit/miss counter"""
+        if cache_name and hit is not None:
+            self.cache_lookup_counter.add(1, {"cache": cache_name, "result": "hit" if hit else "miss"})
+
+    def update_batch_size(self, batcher: str = None, size: int = None):
+        """Updates the micro-batch size distribution"""
+        if batcher and size is not None:
+            self.batch_size_histogram.record(size, {"batcher": batcher})
+
+    def update_cache_stats(self, cache_name: str = None, hit_ratio: float = None, resident_bytes: int = None):
+        """Updates the cache hit ratio and resident bytes gauges"""
+        if cache_name:
+            if hit_ratio is not None:
+                self.cache_hit_ratio_gauge.set(hit_ratio, {"cache": cache_name})
+            if resident_bytes is not None:
+                self.cache_resident_bytes_gauge.set(resident_bytes, {"cache": cache_name})
+
+    def update_stream_frames(self, frames: int = None, chunks: int = None):
+        """Updates the streamed frame and chunk counters"""
+        if frames:
+            self.stream_frame_counter.add(frames)
+        if chunks:
+            self.stream_chunk_counter.add(chunks)
+
+    def update_request_coalescing(self, flight: str = None, shared: bool = None):
+        """Updates the request coalescing counter"""
+        if flight and shared is not None:
+            self.request_coalescing_counter.add(1, {"flight": flight, "result": "shared" if shared else "leader"})
+
+    def update_relevance_judge(self, judge: str = None):
+        """Updates the reflection relevance check counter"""
+        if judge:
+            self.relevance_judge_counter.add(1, {"judge": judge})
+
+    def update_candidate_pruning(self, pruned: int = None, kept: int = None):
+        """Updates the pruned and reranked candidate distributions"""
+        if pruned is not None:
+            self.candidates_pruned_histogram.record(pruned)
+        if kept is not None:
+            self.candidates_reranked_histogram.record(kept)
+
+    def update_speculative_retrieval(self, accepted: bool = None):
+        """Updates the speculative retrieval counter"""
+        if accepted is not None:
+            self.speculative_retrieval_counter.add(1, {"result": "accepted" if accepted else "rejected"})
@@ -0,0 +1,84 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Microbenchmark of the streamed token frames, comparing StreamFrameTemplate with the ChainResponse models.
+
+Usage: python tests/benchmarks/bench_stream_frames.py [--frames N]
+"""
+
+import argparse
+import random
+import time
+
+from nvidia_rag.rag_server.response_generator import (
+    ChainResponse,
+    ChainResponseChoices,
+    Message,
+    StreamFrameTemplate,
+)
+
+RESP_ID = "3f1a6c9e-7a52-4c6b-9d0f-2b8e5f0c1d34"
+MODEL = "meta/llama-3.1-70b-instruct"
+
+
+def _tokens(count: int, markup_ratio: float) -> list:
+    """Generate LLM-like token chunks, a fraction of which contain characters sanitized by bleach."""
+    rng = random.Random(0)
+    words = ["the", " answer", " is", " in", " table", " 3", ",", " see", " section", " 2.1", ".", "\n"]
+    markup = [" <b>", "</b>", " a < b", " &", " x > y"]
+    return [rng.choice(markup) if rng.random() < markup_ratio else rng.choice(words) for _ in range(count)]
+
+
+def _model_frame(chunk: str, created: int) -> str:
+    chain_response = ChainResponse()
+    chain_response.id = RESP_ID
+    chain_response.choices.append(ChainResponseChoices(
+        index=0,
+        message=Message(role="assistant", content=chunk),
+        delta=Message(role=None, content=chunk),
+        finish_reason=None
+    ))
+    chain_response.model = MODEL
+    chain_response.object = "chat.completion.chunk"
+    chain_response.created = created
+    return "data: " + str(chain_response.json()) + "\n\n"
+
+
+def _time_frames(build, tokens: list) -> float:
+    created = int(time.time())
+    start = time.perf_counter()
+    for token in tokens:
+        build(token, created)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=20000, help="Number of frames serialized per run")
+    args = parser.parse_args()
+
+    for markup_ratio in (0.0, 0.05, 0.5):
+        tokens = _tokens(args.frames, markup_ratio)
+        template = StreamFrameTemplate(RESP_ID, MODEL)
+        models = _time_frames(_model_frame, tokens)
+        spliced = _time_frames(template.frame, tokens)
+        print(
+            f"markup {markup_ratio:4.0%}: models {models / args.frames * 1e6:7.2f} us/frame, "
+            f"template {spliced / args.frames * 1e6:7.2f} us/frame, speedup {models / spliced:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
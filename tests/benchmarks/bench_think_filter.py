@@ -0,0 +1,68 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Microbenchmark of the streaming think tag filter for token sized and large chunks.
+
+Usage: python tests/benchmarks/bench_think_filter.py [--chars N]
+"""
+
+import argparse
+import random
+import time
+
+from nvidia_rag.utils.llm import ThinkTagFilter
+
+
+def _response(chars: int) -> str:
+    """Generate a reasoning model response with a long think block followed by the answer."""
+    rng = random.Random(0)
+    words = ["the", "table", "shows", "a", "<", "b", "so", "we", "check", "section", "2.1", "\n"]
+    text = []
+    length = 0
+    while length < chars:
+        word = rng.choice(words)
+        text.append(word)
+        length += len(word) + 1
+    body = " ".join(text)
+    split = len(body) * 3 // 4
+    return "<think>" + body[:split] + "</think>" + body[split:]
+
+
+def _chunks(text: str, chunk_chars: int) -> list:
+    return [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chars", type=int, default=1_000_000, help="Length of the filtered response")
+    args = parser.parse_args()
+
+    text = _response(args.chars)
+    for chunk_chars in (1, 4, 64, 4096, len(text)):
+        chunks = _chunks(text, chunk_chars)
+        think_filter = ThinkTagFilter()
+        start = time.perf_counter()
+        for chunk in chunks:
+            think_filter.feed(chunk)
+        think_filter.flush()
+        elapsed = time.perf_counter() - start
+        print(
+            f"{len(chunks):8d} chunks of {chunk_chars:8d} chars: {elapsed * 1e3:8.2f} ms, "
+            f"{len(text) / elapsed / 1e6:7.2f} M chars/s, {elapsed / len(chunks) * 1e6:8.3f} us/chunk"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the VLM answer cache."""
+
+from langchain_core.documents import Document
+
+from nvidia_rag.rag_server.answer_cache import VLMAnswerCache
+
+THUMBNAILS = ["collection_::doc.pdf_1_100_200_300_400", "collection_::doc.pdf_2_0_0_50_50"]
+
+
+def _cache():
+    return VLMAnswerCache(maxsize=16, ttl=60, similarity_threshold=0.95, name="test_vlm_answer")
+
+
+def test_scope_key_ignores_thumbnail_order_and_depends_on_models():
+    cache = _cache()
+    scope = cache.scope_key(THUMBNAILS, vlm_model="vlm", model="llm")
+    assert cache.scope_key(list(reversed(THUMBNAILS)), model="llm", vlm_model="vlm") == scope
+    assert cache.scope_key(THUMBNAILS, vlm_model="vlm", model="other-llm") != scope
+
+
+def test_context_key_depends_on_the_text_context_only():
+    context = [Document(page_content="Revenue grew 10%", metadata={"relevance_score": 0.9}),
+               Document(page_content="See figure 2")]
+    rescored = [Document(page_content="Revenue grew 10%", metadata={"relevance_score": 0.4}),
+                Document(page_content="See figure 2")]
+    other = [Document(page_content="Revenue fell 5%"), Document(page_content="See figure 2")]
+    assert VLMAnswerCache.context_key(context) == VLMAnswerCache.context_key(rescored)
+    assert VLMAnswerCache.context_key(context) != VLMAnswerCache.context_key(other)
+
+
+def test_lookup_returns_the_response_to_a_similar_question():
+    cache = _cache()
+    scope = cache.scope_key(THUMBNAILS, vlm_model="vlm", model="llm")
+    cache.store(scope, [1.0, 0.0], "The chart shows growth")
+
+    hit = cache.lookup(scope, [0.999, 0.01])
+    assert hit.response == "The chart shows growth"
+    assert cache.lookup(scope, [0.0, 1.0]) is None
+
+
+class _Models:
+    """Stub VLM and LLM judge counting their calls."""
+
+    def __init__(self, response="The chart shows growth"):
+        self.response = response
+        self.analyze_calls = 0
+        self.judge_calls = []
+
+    def analyze(self):
+        self.analyze_calls += 1
+        return self.response
+
+    def judge(self, context):
+        def judge_response(response):
+            self.judge_calls.append(context)
+            return context == "A"
+        return judge_response
+
+
+def test_verdicts_are_cached_per_text_context():
+    cache = _cache()
+    models = _Models()
+    scope = cache.scope_key(THUMBNAILS, vlm_model="vlm", model="llm")
+    contexts = {name: VLMAnswerCache.context_key([Document(page_content=f"context {name}")]) for name in "AB"}
+
+    results = [
+        cache.get_or_analyze(scope, [1.0, 0.0], contexts[name], analyze=models.analyze, judge=models.judge(name))
+        for name in ("A", "B", "B", "A")
+    ]
+    assert results == [("The chart shows growth", True), ("The chart shows growth", False),
+                       ("The chart shows growth", False), ("The chart shows growth", True)]
+    # The VLM is called once, and the LLM once per text context
+    assert models.analyze_calls == 1
+    assert models.judge_calls == ["A", "B"]
+
+
+def test_empty_vlm_responses_are_never_judged_nor_cached():
+    cache = _cache()
+    models = _Models(response="")
+    scope = cache.scope_key(THUMBNAILS, vlm_model="vlm", model="llm")
+    context_key = VLMAnswerCache.context_key([Document(page_content="context A")])
+    for _ in range(2):
+        assert cache.get_or_analyze(scope, [1.0, 0.0], context_key, analyze=models.analyze, judge=models.judge("A")) == ("", False)
+    assert models.analyze_calls == 2
+    assert models.judge_calls == []
@@ -0,0 +1,104 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the fusion of the results of multiple collections."""
+
+import pytest
+from langchain_core.documents import Document
+
+from nvidia_rag.utils import fusion
+from nvidia_rag.utils.fusion import fuse_results, merge_candidates
+
+
+def _docs(*results):
+    return [Document(page_content=content, metadata={"distance": distance}) for content, distance in results]
+
+
+def _contents(docs):
+    return [doc.page_content for doc in docs]
+
+
+def test_score_fusion_ranks_low_dense_distances_first():
+    result_lists = [
+        _docs(("a1", 0.2), ("a2", 0.6), ("a3", 1.0)),
+        _docs(("b1", 0.4), ("b2", 0.5), ("b3", 1.2)),
+    ]
+    fused = fuse_results(result_lists, method="score", search_type="dense")
+    assert _contents(fused) == ["a1", "b1", "b2", "a2", "a3", "b3"]
+    assert fused[0].metadata["relevance_score"] == 1.0
+    assert fused[-1].metadata["relevance_score"] == 0.0
+
+
+def test_score_fusion_ranks_high_hybrid_scores_first():
+    # Hybrid search returns ranker scores, for example from the milvus RRFRanker, higher being more relevant
+    result_lists = [
+        _docs(("a1", 0.0325), ("a2", 0.0310), ("a3", 0.0160)),
+        _docs(("b1", 0.0330), ("b2", 0.0320), ("b3", 0.0150)),
+    ]
+    fused = fuse_results(result_lists, method="score", search_type="hybrid")
+    assert _contents(fused) == ["a1", "b1", "b2", "a2", "a3", "b3"]
+    assert fused[0].metadata["relevance_score"] == 1.0
+    assert fused[-1].metadata["relevance_score"] == 0.0
+
+
+def test_score_fusion_keeps_retrieval_order_of_each_list():
+    for search_type, results in (("dense", [0.1, 0.5, 0.9]), ("hybrid", [0.9, 0.5, 0.1])):
+        result_lists = [
+            _docs(*zip(["a1", "a2", "a3"], results)),
+            _docs(*zip(["b1", "b2", "b3"], results)),
+        ]
+        fused = _contents(fuse_results(result_lists, method="score", search_type=search_type))
+        assert fused.index("a1") < fused.index("a2") < fused.index("a3")
+        assert fused.index("b1") < fused.index("b2") < fused.index("b3")
+
+
+def test_score_fusion_falls_back_to_rank_without_distances():
+    result_lists = [
+        [Document(page_content="a1"), Document(page_content="a2")],
+        _docs(("b1", 0.9), ("b2", 0.1)),
+    ]
+    fused = fuse_results(result_lists, method="score", search_type="hybrid")
+    assert _contents(fused) == ["a1", "b1", "a2", "b2"]
+
+
+def test_rrf_fusion_merges_duplicates_and_truncates():
+    result_lists = [
+        _docs(("shared", 0.1), ("a2", 0.2), ("a3", 0.3)),
+        _docs(("b1", 0.1), ("shared", 0.2), ("b3", 0.3)),
+    ]
+    fused = fuse_results(result_lists, top_k=3, method="rrf", rrf_k=60)
+    assert _contents(fused) == ["shared", "b1", "a2"]
+    assert fused[0].metadata["relevance_score"] == pytest.approx(1 / 61 + 1 / 62)
+
+
+def test_fusion_of_a_single_list_is_unchanged():
+    results = _docs(("a1", 0.9), ("a2", 0.1), ("a3", 0.5))
+    assert fuse_results([results, []], top_k=2, method="score") == results[:2]
+
+
+def test_fusion_rejects_unknown_methods():
+    with pytest.raises(ValueError):
+        fuse_results([_docs(("a1", 0.1)), _docs(("b1", 0.1))], method="max")
+
+
+def test_merge_candidates_caps_fused_candidates(monkeypatch):
+    result_lists = [
+        _docs(("a1", 0.1), ("a2", 0.2), ("a3", 0.3)),
+        _docs(("b1", 0.1), ("b2", 0.2), ("b3", 0.3)),
+    ]
+    monkeypatch.setattr(fusion, "RERANKER_MAX_FUSED_CANDIDATES", 0)
+    assert _contents(merge_candidates(result_lists, min_candidates=2)) == ["a1", "a2", "a3", "b1", "b2", "b3"]
+    monkeypatch.setattr(fusion, "RERANKER_MAX_FUSED_CANDIDATES", 2)
+    assert _contents(merge_candidates(result_lists, min_candidates=2)) == ["a1", "b1"]
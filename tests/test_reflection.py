@@ -0,0 +1,233 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the reflection helpers, with stubbed chains instead of the reflection LLM."""
+
+import threading
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda
+
+from nvidia_rag.rag_server import reflection
+from nvidia_rag.rag_server.reflection import ReflectionCounter
+
+
+class _RewriteChain:
+    """Returns fixed rewrites, exceptions included, like chain.batch(return_exceptions=True)."""
+
+    def __init__(self, rewrites):
+        self.rewrites = rewrites
+        self.batches = []
+
+    def batch(self, inputs, config=None, return_exceptions=False):
+        self.batches.append(inputs)
+        return self.rewrites[:len(inputs)]
+
+
+@pytest.fixture
+def scored_queries(monkeypatch):
+    """Stub _score_context with a fixed relevance score per query, recording the scored queries."""
+    scores = {}
+    scored = []
+    lock = threading.Lock()
+
+    def score_context(query, retrievers, ranker, filter_expr, relevance_chain, otel_ctx):
+        with lock:
+            scored.append(query)
+        return [Document(page_content=f"context of {query}")], scores[query]
+
+    monkeypatch.setattr(reflection, "_score_context", score_context)
+    monkeypatch.setattr(reflection, "REFLECTION_PARALLEL_REWRITES", 3)
+    return scores, scored
+
+
+def _check_parallel(rewrites, counter=None, threshold=1):
+    counter = counter or ReflectionCounter(max_loops=3)
+    docs, is_relevant = reflection._check_context_relevance_parallel(
+        "original", retrievers=[], ranker=None, reflection_counter=counter, filter_expr="",
+        relevance_chain=None, rewrite_chain=_RewriteChain(rewrites), relevance_threshold=threshold, otel_ctx=None
+    )
+    return docs[0].page_content, is_relevant, counter
+
+
+def test_parallel_reflection_keeps_the_most_relevant_context(scored_queries):
+    scores, scored = scored_queries
+    scores.update({"original": 0, "rewrite a": 1, "rewrite b": 2, "rewrite c": 0})
+    context, is_relevant, _ = _check_parallel(["rewrite a", "rewrite b", "rewrite c"])
+    assert context == "context of rewrite b"
+    assert is_relevant
+    assert sorted(scored) == ["original", "rewrite a", "rewrite b", "rewrite c"]
+
+
+def test_parallel_reflection_prefers_the_original_query_on_ties(scored_queries):
+    scores, _ = scored_queries
+    scores.update({"original": 1, "rewrite a": 1, "rewrite b": 1})
+    context, is_relevant, _ = _check_parallel(["rewrite a", "rewrite b", "rewrite a"])
+    assert context == "context of original"
+    assert is_relevant
+
+
+def test_parallel_reflection_skips_failed_and_duplicate_rewrites(scored_queries):
+    scores, scored = scored_queries
+    scores.update({"original": 0, "rewrite a": 0})
+    context, is_relevant, _ = _check_parallel([RuntimeError("rewrite failed"), " rewrite a ", "original"])
+    assert context == "context of original"
+    assert not is_relevant
+    assert sorted(scored) == ["original", "rewrite a"]
+
+
+def test_parallel_reflection_scores_the_original_query_when_every_rewrite_fails(scored_queries):
+    scores, scored = scored_queries
+    scores.update({"original": 2})
+    context, is_relevant, _ = _check_parallel([RuntimeError("a"), RuntimeError("b"), RuntimeError("c")])
+    assert context == "context of original"
+    assert is_relevant
+    assert scored == ["original"]
+
+
+def test_parallel_reflection_counts_as_one_iteration(scored_queries):
+    scores, _ = scored_queries
+    scores.update({"original": 0, "rewrite a": 0, "rewrite b": 0, "rewrite c": 0})
+    counter = ReflectionCounter(max_loops=3)
+    _check_parallel(["rewrite a", "rewrite b", "rewrite c"], counter=counter)
+    assert counter.current_count == 1
+    assert counter.remaining == 2
+
+
+def _reranked(*scores):
+    return [Document(page_content=f"doc {i}", metadata={"relevance_score": score}) for i, score in enumerate(scores)]
+
+
+@pytest.mark.parametrize("docs, expected", [
+    (_reranked(5.0, 3.2, 2.0), 2),
+    (_reranked(4.1, -1.0, -3.0), None),
+    (_reranked(4.1), 2),
+    (_reranked(-7.5, -9.0, -6.0), 0),
+    (_reranked(1.5, -2.0, -8.0), None),
+    (_reranked(-5.0, -9.0), None),
+    (_reranked(5.0, 3.2) + [Document(page_content="unscored")], None),
+    ([], None),
+], ids=["all-above-accept", "too-few-accepted", "fewer-docs-than-min", "all-below-reject", "ambiguous",
+        "one-above-reject", "missing-score", "no-docs"])
+def test_reranker_relevance_score(monkeypatch, docs, expected):
+    monkeypatch.setattr(reflection, "RERANKER_RELEVANCE_ACCEPT_SCORE", 2.0)
+    monkeypatch.setattr(reflection, "RERANKER_RELEVANCE_ACCEPT_MIN_DOCS", 2)
+    monkeypatch.setattr(reflection, "RERANKER_RELEVANCE_REJECT_SCORE", -6.0)
+    assert reflection._reranker_relevance_score(docs) == expected
+
+
+class _Ranker:
+    def __init__(self, score_scale=None):
+        if score_scale:
+            self.score_scale = score_scale
+
+
+class _RelevanceChain:
+    """Judges every context as somewhat relevant, counting the calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, inputs, config=None):
+        self.calls += 1
+        return "1"
+
+
+@pytest.mark.parametrize("ranker, expected_score, expected_llm_calls", [
+    (_Ranker("logit"), 2, 0),
+    (_Ranker("probability"), 1, 1),
+    (_Ranker(), 1, 1),
+], ids=["logits", "other-scale", "unknown-scale"])
+def test_reranker_fast_path_only_applies_to_logits(monkeypatch, ranker, expected_score, expected_llm_calls):
+    monkeypatch.setattr(reflection, "ENABLE_RERANKER_RELEVANCE_FAST_PATH", True)
+    monkeypatch.setattr(reflection, "_retrieve_context", lambda *args: _reranked(5.0, 3.2))
+    relevance_chain = _RelevanceChain()
+    docs, relevance_score = reflection._score_context("query", [], ranker, "", relevance_chain, None)
+    assert relevance_score == expected_score
+    assert relevance_chain.calls == expected_llm_calls
+    assert len(docs) == 2
+
+
+class _ResponseChain:
+    """Returns fixed candidate responses, exceptions included, like chain.batch(return_exceptions=True)."""
+
+    def __init__(self, responses):
+        self.responses = responses
+
+    def batch(self, inputs, config=None, return_exceptions=False):
+        assert len(inputs) == len(self.responses)
+        return self.responses
+
+
+@pytest.fixture
+def judged_responses(monkeypatch):
+    """Stub the reflection LLM with a groundedness judge, recording the judged prompts."""
+    judged = []
+    lock = threading.Lock()
+
+    def judge(prompt):
+        with lock:
+            judged.append(prompt.to_string())
+        return "2" if "per the report" in prompt.to_string() else "0"
+
+    monkeypatch.setattr(reflection, "_get_reflection_llm", lambda max_tokens, temperature=0.2: RunnableLambda(judge))
+    monkeypatch.delenv("RESPONSE_GROUNDEDNESS_THRESHOLD", raising=False)
+    return judged
+
+
+def _best_of_n(responses, counter=None):
+    counter = counter or ReflectionCounter(max_loops=3)
+    response, is_grounded = reflection.generate_best_grounded_response(
+        _ResponseChain(responses), {"question": "How did revenue change?"}, ["Revenue grew 10% in 2024."],
+        counter, num_candidates=len(responses)
+    )
+    return response, is_grounded, counter
+
+
+def test_best_of_n_returns_the_most_grounded_response(judged_responses):
+    response, is_grounded, counter = _best_of_n([
+        "Revenue probably grew.", "Revenue grew 10% in 2024 per the report.", "Revenue probably grew."
+    ])
+    assert response == "Revenue grew 10% in 2024 per the report."
+    assert is_grounded
+    # Duplicate candidates are judged once, and the round counts as one iteration
+    assert len(judged_responses) == 2
+    assert counter.current_count == 1
+
+
+def test_best_of_n_skips_failed_candidates(judged_responses):
+    response, is_grounded, _ = _best_of_n([RuntimeError("generation failed"), "Revenue grew per the report."])
+    assert response == "Revenue grew per the report."
+    assert is_grounded
+    assert len(judged_responses) == 1
+
+
+def test_best_of_n_keeps_the_first_candidate_when_every_judge_fails(monkeypatch):
+    def failing_judge(prompt):
+        raise RuntimeError("reflection LLM unavailable")
+
+    monkeypatch.setattr(reflection, "_get_reflection_llm", lambda max_tokens, temperature=0.2: RunnableLambda(failing_judge))
+    monkeypatch.delenv("RESPONSE_GROUNDEDNESS_THRESHOLD", raising=False)
+    response, is_grounded, counter = _best_of_n(["First answer.", "Second answer per the report."])
+    assert response == "First answer."
+    assert not is_grounded
+    assert counter.current_count == 1
+
+
+def test_best_of_n_raises_when_every_generation_fails(judged_responses):
+    with pytest.raises(RuntimeError, match="first"):
+        _best_of_n([RuntimeError("first"), RuntimeError("second")])
+    assert judged_responses == []
@@ -0,0 +1,117 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the local cross-encoder reranker and the reranking service."""
+
+import sys
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.documents import Document
+
+from nvidia_rag.utils import reranker
+from nvidia_rag.utils.reranker import LocalCrossEncoderReranker, RerankingService
+
+SCORES = {
+    ("q1", "t1"): 3.5, ("q1", "t2"): -2.0, ("q1", "t5"): 7.25,
+    ("q2", "t3"): 0.5, ("q2", "t4"): -9.0,
+}
+
+
+class _StubCrossEncoder:
+    """Returns fixed logits for (query, passage) pairs and records the pairs of every forward pass."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=True):
+        self.calls.append(list(pairs))
+        return [SCORES[pair] for pair in pairs]
+
+
+def _local_ranker(top_n=4):
+    return LocalCrossEncoderReranker(cross_encoder=_StubCrossEncoder(), top_n=top_n)
+
+
+def test_score_pairs_returns_float_logits():
+    ranker = _local_ranker()
+    scores = ranker.score_pairs([("q1", "t1"), ("q2", "t4")])
+    assert scores == [3.5, -9.0]
+    assert all(type(score) is float for score in scores)
+
+
+def test_compress_documents_returns_top_n_by_score():
+    ranker = _local_ranker(top_n=2)
+    docs = [Document(page_content=text) for text in ("t1", "t2", "t5")]
+    ranked = ranker.compress_documents(docs, query="q1")
+    assert [doc.page_content for doc in ranked] == ["t5", "t1"]
+    assert [doc.metadata["relevance_score"] for doc in ranked] == [7.25, 3.5]
+
+
+def test_score_batch_packs_passages_of_different_queries_into_the_same_request():
+    ranker = _local_ranker()
+    service = RerankingService(ranker=ranker, model_id="local", max_passages_per_request=4, enable_score_cache=False)
+    items = [
+        ("q1", [("c1", "t1"), ("c2", "t2")]),
+        ("q2", [("c3", "t3"), ("c4", "t4")]),
+        ("q1", [("c5", "t5")]),
+    ]
+    results = service._score_batch(items)
+
+    assert results == [
+        {"c1": 3.5, "c2": -2.0},
+        {"c3": 0.5, "c4": -9.0},
+        {"c5": 7.25},
+    ]
+    # Passages of calls sharing a query are coalesced, and requests are filled with pairs of any query
+    assert sorted(len(call) for call in ranker.cross_encoder.calls) == [1, 4]
+    assert any({query for query, _ in call} == {"q1", "q2"} for call in ranker.cross_encoder.calls)
+    assert sorted(pair for call in ranker.cross_encoder.calls for pair in call) == sorted(SCORES)
+
+
+def test_service_reranks_with_the_local_cross_encoder():
+    service = RerankingService(ranker=_local_ranker(), model_id="local", max_passages_per_request=2, enable_score_cache=False)
+    docs = [Document(page_content=text, metadata={"pk": i}) for i, text in enumerate(("t1", "t2", "t5"))]
+    ranked = service.rerank("q1", docs, top_n=2)
+    assert [doc.page_content for doc in ranked] == ["t5", "t1"]
+    assert [doc.metadata["relevance_score"] for doc in ranked] == [7.25, 3.5]
+
+
+def test_local_ranking_model_keeps_logits(monkeypatch):
+    torch = pytest.importorskip("torch")
+    created = {}
+
+    class _CrossEncoder:
+        def __init__(self, model, **kwargs):
+            created.update(kwargs, model=model)
+
+    monkeypatch.setitem(sys.modules, "sentence_transformers", SimpleNamespace(CrossEncoder=_CrossEncoder))
+    monkeypatch.setattr(reranker, "RERANKER_LOCAL_BACKEND", "onnx")
+    monkeypatch.setattr(reranker, "RERANKER_LOCAL_ONNX_FILE", "onnx/model_qint8_avx512_vnni.onnx")
+    local_ranker = reranker._get_local_ranking_model("cross-encoder/ms-marco-MiniLM-L-6-v2", top_n=3)
+
+    assert isinstance(local_ranker, LocalCrossEncoderReranker)
+    assert local_ranker.top_n == 3
+    assert created["model"] == "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    assert isinstance(created["activation_fn"], torch.nn.Identity)
+    assert created["backend"] == "onnx"
+    assert created["model_kwargs"] == {"file_name": "onnx/model_qint8_avx512_vnni.onnx"}
+
+
+def test_rankers_report_logit_scores():
+    assert _local_ranker().score_scale == "logit"
+    service = RerankingService(ranker=_local_ranker(), model_id="local", enable_score_cache=False)
+    assert service.score_scale == "logit"
+    assert reranker.TopNReranker(service=service, top_n=2).score_scale == "logit"
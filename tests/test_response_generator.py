@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the streaming helpers of the response generator."""
+
+import asyncio
+import time
+
+import pytest
+
+from nvidia_rag.rag_server.response_generator import iterate_in_thread
+
+ITEMS = 5
+DELAY = 0.1
+
+
+def _slow_generator(name: str):
+    """A blocking generator which sleeps before yielding each item, like chain.stream()."""
+    for i in range(ITEMS):
+        time.sleep(DELAY)
+        yield f"{name}{i}"
+
+
+def test_iterate_in_thread_interleaves_blocking_generators():
+    order = []
+
+    async def consume(name: str):
+        async for item in iterate_in_thread(_slow_generator(name)):
+            order.append(item)
+
+    async def main():
+        await asyncio.gather(consume("a"), consume("b"))
+
+    start = time.monotonic()
+    asyncio.run(main())
+    elapsed = time.monotonic() - start
+
+    assert sorted(order) == sorted([f"a{i}" for i in range(ITEMS)] + [f"b{i}" for i in range(ITEMS)])
+    # Each stream keeps its own order
+    assert [item for item in order if item[0] == "a"] == [f"a{i}" for i in range(ITEMS)]
+    assert [item for item in order if item[0] == "b"] == [f"b{i}" for i in range(ITEMS)]
+    # The streams make progress together instead of one after the other
+    first_b = next(i for i, item in enumerate(order) if item[0] == "b")
+    assert first_b < ITEMS
+    serial = 2 * ITEMS * DELAY
+    assert elapsed < 0.75 * serial
+
+
+def test_iterate_in_thread_does_not_block_event_loop():
+    ticks = []
+
+    async def ticker():
+        for _ in range(ITEMS):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(DELAY / 4)
+
+    async def consume():
+        return [item async for item in iterate_in_thread(_slow_generator("a"))]
+
+    async def main():
+        items, _ = await asyncio.gather(consume(), ticker())
+        return items
+
+    assert asyncio.run(main()) == [f"a{i}" for i in range(ITEMS)]
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < DELAY
+
+
+def test_iterate_in_thread_reraises_generator_errors():
+    def failing():
+        yield "a0"
+        raise ValueError("boom")
+
+    async def main():
+        items = []
+        with pytest.raises(ValueError, match="boom"):
+            async for item in iterate_in_thread(failing()):
+                items.append(item)
+        return items
+
+    assert asyncio.run(main()) == ["a0"]
@@ -0,0 +1,162 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the coalescing of identical concurrent requests and streams."""
+
+import asyncio
+import gc
+
+import pytest
+
+from nvidia_rag.utils.singleflight import SingleFlight, StreamBroadcaster
+
+
+class _Stream:
+    """A stream of chunks released one at a time, which records whether it was cancelled."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.release = asyncio.Event()
+        self.opened = 0
+        self.cancelled = False
+
+    async def open(self):
+        self.opened += 1
+        return self._read()
+
+    async def _read(self):
+        try:
+            for chunk in self.chunks:
+                await self.release.wait()
+                self.release.clear()
+                yield chunk
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+def test_single_flight_shares_one_computation():
+    async def main():
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        flight = SingleFlight("test")
+        results = await asyncio.gather(*(flight.do("key", compute) for _ in range(5)))
+        return calls, results
+
+    calls, results = asyncio.run(main())
+    assert calls == [1]
+    assert results == ["result"] * 5
+
+
+def test_broadcast_replays_the_stream_to_late_joiners():
+    async def main():
+        stream = _Stream(["a", "b", "c"])
+        broadcaster = StreamBroadcaster("test")
+        first = await broadcaster.subscribe("key", stream.open)
+        stream.release.set()
+        assert await first.__anext__() == "a"
+        second = await broadcaster.subscribe("key", stream.open)
+
+        async def read(subscription):
+            async with subscription:
+                return [chunk async for chunk in subscription]
+
+        readers = asyncio.gather(read(first), read(second))
+        for _ in range(2):
+            await asyncio.sleep(0.01)
+            stream.release.set()
+        return stream.opened, await readers
+
+    opened, (first_chunks, second_chunks) = asyncio.run(main())
+    assert opened == 1
+    assert first_chunks == ["b", "c"]
+    assert second_chunks == ["a", "b", "c"]
+
+
+def test_closing_a_subscription_which_never_started_cancels_the_stream():
+    async def main():
+        stream = _Stream(["a", "b"])
+        broadcaster = StreamBroadcaster("test")
+        subscription = await broadcaster.subscribe("key", stream.open)
+        await asyncio.sleep(0.01)
+        await subscription.aclose()
+        await subscription.aclose()
+        await asyncio.sleep(0.01)
+        return stream.cancelled
+
+    assert asyncio.run(main())
+
+
+def test_dropping_a_subscription_which_never_started_cancels_the_stream():
+    async def main():
+        stream = _Stream(["a", "b"])
+        broadcaster = StreamBroadcaster("test")
+        subscription = await broadcaster.subscribe("key", stream.open)
+        await asyncio.sleep(0.01)
+        del subscription
+        gc.collect()
+        await asyncio.sleep(0.01)
+        return stream.cancelled
+
+    assert asyncio.run(main())
+
+
+def test_stream_continues_while_another_subscription_reads_it():
+    async def main():
+        stream = _Stream(["a", "b"])
+        broadcaster = StreamBroadcaster("test")
+        reader = await broadcaster.subscribe("key", stream.open)
+        dropped = await broadcaster.subscribe("key", stream.open)
+        dropped.close()
+
+        async def read():
+            return [chunk async for chunk in reader]
+
+        task = asyncio.ensure_future(read())
+        for _ in range(2):
+            await asyncio.sleep(0.01)
+            stream.release.set()
+        return stream.cancelled, await task
+
+    cancelled, chunks = asyncio.run(main())
+    assert not cancelled
+    assert chunks == ["a", "b"]
+
+
+def test_stream_errors_end_every_subscription():
+    async def main():
+        broadcaster = StreamBroadcaster("test")
+
+        async def failing():
+            yield "a"
+            raise ValueError("boom")
+
+        async def open_stream():
+            return failing()
+
+        subscriptions = [await broadcaster.subscribe("key", open_stream) for _ in range(2)]
+        for subscription in subscriptions:
+            chunks = []
+            with pytest.raises(ValueError, match="boom"):
+                async for chunk in subscription:
+                    chunks.append(chunk)
+            assert chunks == ["a"]
+
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests that the frames of StreamFrameTemplate match the ChainResponse frames of generate_answer."""
+
+import random
+
+import pytest
+
+from nvidia_rag.rag_server.response_generator import (
+    ChainResponse,
+    ChainResponseChoices,
+    Message,
+    StreamFrameTemplate,
+)
+
+RESP_ID = "3f1a6c9e-7a52-4c6b-9d0f-2b8e5f0c1d34"
+MODEL = "meta/llama-3.1-70b-instruct"
+CREATED = 1735689600
+
+CHUNKS = [
+    "Hello",
+    " world",
+    "",
+    " ",
+    "\n\n",
+    "tabs\tand\nnewlines\r\n",
+    'quotes " and \' and back\\slash',
+    "a < b and c > d",
+    "fish & chips &amp; &lt;",
+    "<b>bold</b>",
+    "<script>alert('x')</script>",
+    "<not closed",
+    "x<y>z",
+    "unicode: é ü ß 中文 日本語 한국어",
+    "emoji: \U0001f680\U0001f525 and astral \U0001d518\U0001d52b",
+    "control \x00\x01\x08\x0b\x0c\x1f\x7f chars",
+    "c1 \x85\x9f chars",
+    "noncharacters \ufdd0\ufffe\uffff",
+    "line\u2028separator\u2029paragraph",
+    "zero\u200bwidth\ufeffbom",
+    "```python\nprint('<html>')\n```",
+]
+
+
+def _reference_frame(chunk: str, created: int) -> str:
+    """Build the frame the way generate_answer does for chunks after the first."""
+    chain_response = ChainResponse()
+    response_choice = ChainResponseChoices(
+        index=0,
+        message=Message(role="assistant", content=chunk),
+        delta=Message(role=None, content=chunk),
+        finish_reason=None
+    )
+    chain_response.id = RESP_ID
+    chain_response.choices.append(response_choice)
+    chain_response.model = MODEL
+    chain_response.object = "chat.completion.chunk"
+    chain_response.created = created
+    return "data: " + str(chain_response.json()) + "\n\n"
+
+
+@pytest.mark.parametrize("chunk", CHUNKS)
+def test_frame_matches_chain_response(chunk):
+    template = StreamFrameTemplate(RESP_ID, MODEL)
+    assert template.frame(chunk, CREATED) == _reference_frame(chunk, CREATED)
+
+
+def test_frame_matches_chain_response_for_random_text():
+    alphabet = "ab <>&\"'\\/\n\r\t\x00\x1f\x7f\x85\u00e9\u4e2d\U0001f680\u2028\ufffe"
+    rng = random.Random(0)
+    template = StreamFrameTemplate(RESP_ID, MODEL)
+    for _ in range(2000):
+        chunk = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 24)))
+        assert template.frame(chunk, CREATED) == _reference_frame(chunk, CREATED), repr(chunk)
+
+
+def test_frame_escapes_ids_and_model_names():
+    resp_id = 'id "with" quotes'
+    model = "model\\with\nescapes"
+    template = StreamFrameTemplate(resp_id, model)
+    chain_response = ChainResponse(id=resp_id, model=model, object="chat.completion.chunk", created=CREATED)
+    chain_response.choices.append(ChainResponseChoices(
+        index=0,
+        message=Message(role="assistant", content="x"),
+        delta=Message(role=None, content="x"),
+    ))
+    assert template.frame("x", CREATED) == "data: " + chain_response.json() + "\n\n"
+
+
+def test_frame_falls_back_to_models_for_oversized_and_non_text_chunks():
+    template = StreamFrameTemplate(RESP_ID, MODEL)
+    assert template.frame("x" * 131073, CREATED) is None
+    assert template.frame(None, CREATED) is None
+    assert template.frame(42, CREATED) is None
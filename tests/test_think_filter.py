@@ -0,0 +1,102 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Fuzz tests of the streaming think tag filter against a regex reference."""
+
+import random
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from nvidia_rag.utils.llm import ThinkTagFilter, streaming_filter_think
+
+# A think block ends at the first end tag, or at the end of the text if it is never closed
+_THINK_BLOCK = re.compile(r"<think>(?:.*?</think>|.*\Z)", re.DOTALL)
+
+# Fragments which often form tags, partial tags and near misses when concatenated
+_FRAGMENTS = [
+    "<think>", "</think>", "<", "</", "<th", "ink", ">", "think", "<thi", "nk>", "</th",
+    "<<", "<t", "h", "a", " ", "\n", "x<y", "<b>", "</b>", "é", "中",
+]
+
+
+def _reference(text: str) -> str:
+    return _THINK_BLOCK.sub("", text)
+
+
+def _random_text(rng: random.Random) -> str:
+    return "".join(rng.choice(_FRAGMENTS) for _ in range(rng.randint(0, 40)))
+
+
+def _random_split(rng: random.Random, text: str) -> list:
+    cuts = sorted(rng.sample(range(len(text) + 1), rng.randint(0, min(len(text), 12))))
+    bounds = [0] + cuts + [len(text)]
+    return [text[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def _filter(chunks: list) -> str:
+    think_filter = ThinkTagFilter()
+    return "".join(think_filter.feed(chunk) for chunk in chunks) + think_filter.flush()
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("<think>reasoning</think>Answer", "Answer"),
+    ("Before<think>a</think> middle <think>b</think>after", "Before middle after"),
+    ("<think>never closed", ""),
+    ("no tags at all", "no tags at all"),
+    ("a < b and <thinking> is not a tag", "a < b and <thinking> is not a tag"),
+    ("</think>stray end tag", "</think>stray end tag"),
+    ("<thi<think>x</think>nk>", "<think>"),
+    ("trailing partial <thi", "trailing partial <thi"),
+])
+def test_filter_examples(text, expected):
+    assert _reference(text) == expected
+    assert _filter([text]) == expected
+    assert _filter(list(text)) == expected
+
+
+def test_filter_matches_reference_for_random_splits():
+    rng = random.Random(0)
+    for _ in range(5000):
+        text = _random_text(rng)
+        chunks = _random_split(rng, text)
+        assert _filter(chunks) == _reference(text), repr(chunks)
+
+
+def test_filter_holds_back_at_most_a_partial_tag():
+    rng = random.Random(1)
+    for _ in range(1000):
+        text = _random_text(rng)
+        think_filter = ThinkTagFilter()
+        emitted = ""
+        for index, char in enumerate(text):
+            emitted += think_filter.feed(char)
+            assert think_filter.pending < len(ThinkTagFilter.END_TAG)
+            # Everything outside think blocks is released except a partial tag at the end
+            if not think_filter.in_think:
+                released = _reference(text[:index + 1])
+                assert released.startswith(emitted)
+                assert len(released) - len(emitted) == think_filter.pending
+
+
+def test_streaming_filter_think_matches_reference():
+    rng = random.Random(2)
+    for _ in range(500):
+        text = _random_text(rng)
+        chunks = [SimpleNamespace(content=chunk) for chunk in _random_split(rng, text)]
+        output = list(streaming_filter_think(chunks))
+        assert all(output)
+        assert "".join(output) == _reference(text)